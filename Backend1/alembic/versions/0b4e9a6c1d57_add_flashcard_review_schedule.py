@@ -0,0 +1,47 @@
+"""add spaced-repetition scheduling columns and due-card index to Flashcards
+
+Revision ID: 0b4e9a6c1d57
+Revises: f38c5d2a9e41
+Create Date: 2026-10-18 02:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b4e9a6c1d57'
+down_revision: Union[str, Sequence[str], None] = 'f38c5d2a9e41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+NEW_COLUMNS = [
+    sa.Column('interval_days', sa.Float(), nullable=False, server_default='0'),
+    sa.Column('ease', sa.Float(), nullable=False, server_default='2.5'),
+    sa.Column('repetitions', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('lapses', sa.Integer(), nullable=False, server_default='0'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The legacy schema already has next_review_date / last_reviewed_date.
+    existing = {c['name'] for c in sa.inspect(op.get_bind()).get_columns('Flashcards')}
+    for name in ('next_review_date', 'last_reviewed_date'):
+        if name not in existing:
+            op.add_column('Flashcards', sa.Column(name, sa.DateTime(timezone=True), nullable=True))
+    # Plain ALTER TABLE: a batch rebuild would drop the FTS and version triggers.
+    for column in NEW_COLUMNS:
+        op.add_column('Flashcards', column)
+    # Cards that were never scheduled are due right away.
+    op.execute('UPDATE "Flashcards" SET next_review_date = creation_date WHERE next_review_date IS NULL')
+    op.create_index('ix_Flashcards_user_id_next_review_date', 'Flashcards', ['user_id', 'next_review_date'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_Flashcards_user_id_next_review_date', table_name='Flashcards', if_exists=True)
+    for column in reversed(NEW_COLUMNS):
+        op.drop_column('Flashcards', column.name)
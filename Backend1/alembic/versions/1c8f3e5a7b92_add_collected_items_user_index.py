@@ -0,0 +1,28 @@
+"""add user index to CollectedItems for the workspace snapshot's recent items
+
+Revision ID: 1c8f3e5a7b92
+Revises: 0b4e9a6c1d57
+Create Date: 2026-10-18 04:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1c8f3e5a7b92'
+down_revision: Union[str, Sequence[str], None] = '0b4e9a6c1d57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_CollectedItems_user_id_item_id', 'CollectedItems', ['user_id', 'item_id'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_CollectedItems_user_id_item_id', table_name='CollectedItems', if_exists=True)
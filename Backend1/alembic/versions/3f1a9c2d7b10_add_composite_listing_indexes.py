@@ -0,0 +1,34 @@
+"""add composite indexes for user-scoped listing queries
+
+Revision ID: 3f1a9c2d7b10
+Revises: 
+Create Date: 2026-10-17 22:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1a9c2d7b10'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_Notes_user_id_last_modified_date', 'Notes', ['user_id', 'last_modified_date'], unique=False, if_not_exists=True)
+    op.create_index('ix_Folders_user_id_folder_name', 'Folders', ['user_id', 'folder_name'], unique=False, if_not_exists=True)
+    op.create_index('ix_Stacks_user_id_creation_date', 'Stacks', ['user_id', 'creation_date'], unique=False, if_not_exists=True)
+    op.create_index('ix_Flashcards_stack_id_creation_date', 'Flashcards', ['stack_id', 'creation_date'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_Flashcards_stack_id_creation_date', table_name='Flashcards', if_exists=True)
+    op.drop_index('ix_Stacks_user_id_creation_date', table_name='Stacks', if_exists=True)
+    op.drop_index('ix_Folders_user_id_folder_name', table_name='Folders', if_exists=True)
+    op.drop_index('ix_Notes_user_id_last_modified_date', table_name='Notes', if_exists=True)
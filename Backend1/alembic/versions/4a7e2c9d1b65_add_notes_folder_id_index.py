@@ -0,0 +1,89 @@
+"""rebuild the Notes and Flashcards foreign keys for set-based deletes
+
+Revision ID: 4a7e2c9d1b65
+Revises: 7d2a5c9e4f13
+Create Date: 2026-10-18 06:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a7e2c9d1b65'
+down_revision: Union[str, Sequence[str], None] = '7d2a5c9e4f13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Names for the legacy schema's unnamed foreign keys, so batch mode can drop them.
+NAMING_CONVENTION = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+
+
+def _foreign_key(table: str, column: str):
+    for fk in sa.inspect(op.get_bind()).get_foreign_keys(table):
+        if fk['constrained_columns'] == [column]:
+            return fk
+    return None
+
+
+def _ondelete(fk) -> str:
+    return ((fk or {}).get('options', {}).get('ondelete') or '').upper()
+
+
+def _rebuild(table: str, alter):
+    """
+    Recreates `table` in batch mode. The rebuild drops the FTS, collection
+    version and sync triggers on it, so they are put back afterwards.
+    """
+    bind = op.get_bind()
+    triggers = bind.execute(
+        sa.text("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = :table"), {"table": table}
+    ).scalars().all()
+    table_sql = bind.execute(
+        sa.text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :table"), {"table": table}
+    ).scalar_one()
+    # Keep AUTOINCREMENT so deleted ids are never reused (SyncLog is keyed by id).
+    table_kwargs = {'sqlite_autoincrement': True} if 'AUTOINCREMENT' in table_sql.upper() else {}
+    with op.batch_alter_table(table, recreate='always', naming_convention=NAMING_CONVENTION, table_kwargs=table_kwargs) as batch:
+        alter(batch)
+    for sql in triggers:
+        op.execute(sql)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The legacy Notes table predates folders.
+    columns = {c['name']: c for c in sa.inspect(op.get_bind()).get_columns('Notes')}
+    if 'folder_id' not in columns or _ondelete(_foreign_key('Notes', 'folder_id')) != 'SET NULL':
+        def alter_notes(batch):
+            if 'folder_id' not in columns:
+                batch.add_column(sa.Column('folder_id', sa.Integer(), nullable=True))
+            elif _foreign_key('Notes', 'folder_id') is not None:
+                batch.drop_constraint('fk_Notes_folder_id_Folders', type_='foreignkey')
+            batch.create_foreign_key('fk_Notes_folder_id_Folders', 'Folders', ['folder_id'], ['folder_id'], ondelete='SET NULL')
+        _rebuild('Notes', alter_notes)
+    # ON DELETE SET NULL looks up a deleted folder's notes by folder_id.
+    op.create_index('ix_Notes_folder_id', 'Notes', ['folder_id'], unique=False, if_not_exists=True)
+
+    # The legacy Flashcards table un-files cards when their stack goes (SET NULL)
+    # and requires a collected item the models no longer write.
+    columns = {c['name']: c for c in sa.inspect(op.get_bind()).get_columns('Flashcards')}
+    stack_fk = _foreign_key('Flashcards', 'stack_id')
+    legacy_item = 'collected_item_id' in columns and not columns['collected_item_id']['nullable']
+    if _ondelete(stack_fk) != 'CASCADE' or legacy_item:
+        def alter_flashcards(batch):
+            if _ondelete(stack_fk) != 'CASCADE':
+                if stack_fk is not None:
+                    batch.drop_constraint('fk_Flashcards_stack_id_Stacks', type_='foreignkey')
+                batch.create_foreign_key('fk_Flashcards_stack_id_Stacks', 'Stacks', ['stack_id'], ['stack_id'], ondelete='CASCADE')
+            if legacy_item:
+                batch.alter_column('collected_item_id', existing_type=sa.Integer(), nullable=True)
+        _rebuild('Flashcards', alter_flashcards)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The rebuilt foreign keys are the ones the models declare; they stay.
+    op.drop_index('ix_Notes_folder_id', table_name='Notes', if_exists=True)
@@ -0,0 +1,29 @@
+"""add Notes.version for optimistic concurrency
+
+Revision ID: 5e0c8a3b91d7
+Revises: c47d19e8a2f5
+Create Date: 2026-10-17 23:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e0c8a3b91d7'
+down_revision: Union[str, Sequence[str], None] = 'c47d19e8a2f5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('Notes', sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Plain ALTER TABLE (SQLite >= 3.35): a batch rebuild would drop the FTS triggers on Notes.
+    op.drop_column('Notes', 'version')
@@ -0,0 +1,90 @@
+"""add SyncCounters, SyncLog and SyncOperations for offline sync
+
+Revision ID: 7d2a5c9e4f13
+Revises: 1c8f3e5a7b92
+Create Date: 2026-10-18 05:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2a5c9e4f13'
+down_revision: Union[str, Sequence[str], None] = '1c8f3e5a7b92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = {
+    "Notes": ("note", "note_id"),
+    "Folders": ("folder", "folder_id"),
+    "Stacks": ("stack", "stack_id"),
+    "Flashcards": ("flashcard", "flashcard_id"),
+}
+
+STAMP = """INSERT INTO "SyncCounters"(user_id, seq) VALUES ({row}.user_id, 1)
+        ON CONFLICT(user_id) DO UPDATE SET seq = seq + 1;
+        INSERT INTO "SyncLog"(entity, entity_id, user_id, seq, deleted)
+        VALUES ('{entity}', {row}.{pk}, {row}.user_id, (SELECT seq FROM "SyncCounters" WHERE user_id = {row}.user_id), {deleted})
+        ON CONFLICT(entity, entity_id) DO UPDATE SET user_id = excluded.user_id, seq = excluded.seq, deleted = excluded.deleted;"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'SyncCounters',
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('seq', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('user_id'),
+    )
+    op.create_table(
+        'SyncLog',
+        sa.Column('entity', sa.String(), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('seq', sa.Integer(), nullable=False),
+        sa.Column('deleted', sa.Boolean(), server_default='0', nullable=False),
+        sa.PrimaryKeyConstraint('entity', 'entity_id'),
+    )
+    op.create_index('ix_SyncLog_user_id_seq', 'SyncLog', ['user_id', 'seq'], unique=False)
+    op.create_table(
+        'SyncOperations',
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('op_id', sa.String(), nullable=False),
+        sa.Column('result', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.PrimaryKeyConstraint('user_id', 'op_id'),
+    )
+    op.create_index('ix_SyncOperations_created_at', 'SyncOperations', ['created_at'], unique=False)
+
+    # Existing rows get sequence numbers 1..n per user, so a first pull from 0 returns them.
+    rows = " UNION ALL ".join(
+        f"""SELECT '{entity}' AS entity, {pk} AS entity_id, user_id FROM "{table}\""""
+        for table, (entity, pk) in TABLES.items()
+    )
+    op.execute(f"""INSERT INTO "SyncLog"(entity, entity_id, user_id, seq, deleted)
+        SELECT entity, entity_id, user_id, ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY entity, entity_id), 0
+        FROM ({rows})""")
+    op.execute('INSERT INTO "SyncCounters"(user_id, seq) SELECT user_id, MAX(seq) FROM "SyncLog" GROUP BY user_id')
+
+    for table, (entity, pk) in TABLES.items():
+        name = f"{table.lower()}_sync"
+        new = STAMP.format(row="new", entity=entity, pk=pk, deleted=0)
+        old = STAMP.format(row="old", entity=entity, pk=pk, deleted=1)
+        op.execute(f'CREATE TRIGGER IF NOT EXISTS {name}_ai AFTER INSERT ON "{table}" BEGIN {new} END')
+        op.execute(f'CREATE TRIGGER IF NOT EXISTS {name}_au AFTER UPDATE ON "{table}" BEGIN {new} END')
+        op.execute(f'CREATE TRIGGER IF NOT EXISTS {name}_ad AFTER DELETE ON "{table}" BEGIN {old} END')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        for suffix in ("ai", "au", "ad"):
+            op.execute(f"DROP TRIGGER IF EXISTS {table.lower()}_sync_{suffix}")
+    op.drop_index('ix_SyncOperations_created_at', table_name='SyncOperations')
+    op.drop_table('SyncOperations')
+    op.drop_index('ix_SyncLog_user_id_seq', table_name='SyncLog')
+    op.drop_table('SyncLog')
+    op.drop_table('SyncCounters')
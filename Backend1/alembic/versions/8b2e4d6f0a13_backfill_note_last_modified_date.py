@@ -0,0 +1,32 @@
+"""backfill Notes.last_modified_date and give it a server default
+
+Revision ID: 8b2e4d6f0a13
+Revises: 3f1a9c2d7b10
+Create Date: 2026-10-17 22:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2e4d6f0a13'
+down_revision: Union[str, Sequence[str], None] = '3f1a9c2d7b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keyset pagination sorts on this column, so it must never be NULL.
+    op.execute('UPDATE "Notes" SET last_modified_date = creation_date WHERE last_modified_date IS NULL')
+    with op.batch_alter_table('Notes') as batch_op:
+        batch_op.alter_column('last_modified_date', server_default=sa.func.now())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('Notes') as batch_op:
+        batch_op.alter_column('last_modified_date', server_default=None)
@@ -0,0 +1,68 @@
+"""index user_id in the FTS5 search tables
+
+Revision ID: 9c5b1e7f2a38
+Revises: 4a7e2c9d1b65
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c5b1e7f2a38'
+down_revision: Union[str, Sequence[str], None] = '4a7e2c9d1b65'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FTS_TABLES = (
+    ("notes_fts", "Notes", "note_id", ("title", "content", "user_id")),
+    ("flashcards_fts", "Flashcards", "flashcard_id", ("front_text", "back_text", "user_id")),
+)
+
+
+def _index_ddl(fts, table, key, columns, user_id_options):
+    cols = ", ".join(columns)
+    new_vals = ", ".join(f"new.{c}" for c in (key, *columns))
+    old_vals = ", ".join(f"old.{c}" for c in (key, *columns))
+    return [
+        f"""CREATE VIRTUAL TABLE {fts} USING fts5(
+            {columns[0]}, {columns[1]}, user_id{user_id_options},
+            content='{table}', content_rowid='{key}', tokenize='unicode61 remove_diacritics 2'
+        )""",
+        f"""CREATE TRIGGER {fts}_ai AFTER INSERT ON "{table}" BEGIN
+            INSERT INTO {fts}(rowid, {cols}) VALUES ({new_vals});
+        END""",
+        f"""CREATE TRIGGER {fts}_ad AFTER DELETE ON "{table}" BEGIN
+            INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', {old_vals});
+        END""",
+        f"""CREATE TRIGGER {fts}_au AFTER UPDATE OF {cols} ON "{table}" BEGIN
+            INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', {old_vals});
+            INSERT INTO {fts}(rowid, {cols}) VALUES ({new_vals});
+        END""",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def _recreate(user_id_options: str):
+    # FTS5 columns cannot be altered, so the index is dropped and rebuilt from its content table.
+    for fts, table, key, columns in FTS_TABLES:
+        for suffix in ("ai", "ad", "au"):
+            op.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+        op.execute(f"DROP TABLE IF EXISTS {fts}")
+        for statement in _index_ddl(fts, table, key, columns, user_id_options):
+            op.execute(statement)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Searches match the user id inside the MATCH expression instead of
+    # filtering an UNINDEXED column after ranking every user's hits.
+    _recreate("")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _recreate(" UNINDEXED")
@@ -0,0 +1,53 @@
+"""add CollectionVersions counters for conditional GETs
+
+Revision ID: a9d3f6b2c8e4
+Revises: 5e0c8a3b91d7
+Create Date: 2026-10-18 00:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9d3f6b2c8e4'
+down_revision: Union[str, Sequence[str], None] = '5e0c8a3b91d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SCOPES = {
+    "Notes": "'notes:' || {row}.user_id",
+    "Folders": "'folders:' || {row}.user_id",
+    "Stacks": "'stacks:' || {row}.user_id",
+    "Flashcards": "'flashcards:' || coalesce({row}.stack_id, '')",
+}
+
+BUMP = """INSERT INTO "CollectionVersions"(scope, version, updated_at) VALUES ({scope}, 1, CURRENT_TIMESTAMP)
+        ON CONFLICT(scope) DO UPDATE SET version = version + 1, updated_at = CURRENT_TIMESTAMP;"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'CollectionVersions',
+        sa.Column('scope', sa.String(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.PrimaryKeyConstraint('scope'),
+    )
+    for table, scope in SCOPES.items():
+        name = f"{table.lower()}_collection_version"
+        old, new = BUMP.format(scope=scope.format(row="old")), BUMP.format(scope=scope.format(row="new"))
+        op.execute(f'CREATE TRIGGER IF NOT EXISTS {name}_ai AFTER INSERT ON "{table}" BEGIN {new} END')
+        op.execute(f'CREATE TRIGGER IF NOT EXISTS {name}_ad AFTER DELETE ON "{table}" BEGIN {old} END')
+        op.execute(f'CREATE TRIGGER IF NOT EXISTS {name}_au AFTER UPDATE ON "{table}" BEGIN {old} {new} END')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in SCOPES:
+        for suffix in ("ai", "ad", "au"):
+            op.execute(f"DROP TRIGGER IF EXISTS {table.lower()}_collection_version_{suffix}")
+    op.drop_table('CollectionVersions')
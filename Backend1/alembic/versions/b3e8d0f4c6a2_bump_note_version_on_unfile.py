@@ -0,0 +1,33 @@
+"""bump a note's version when its folder is removed
+
+Revision ID: b3e8d0f4c6a2
+Revises: 9c5b1e7f2a38
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e8d0f4c6a2'
+down_revision: Union[str, Sequence[str], None] = '9c5b1e7f2a38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ON DELETE SET NULL changes folder_id without touching version, which
+    # is the note's ETag; conditional GETs then kept the deleted folder.
+    op.execute("""CREATE TRIGGER IF NOT EXISTS notes_version_folder_au
+    AFTER UPDATE OF folder_id ON "Notes" WHEN new.version = old.version BEGIN
+        UPDATE "Notes" SET version = version + 1, last_modified_date = CURRENT_TIMESTAMP WHERE note_id = new.note_id;
+    END""")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS notes_version_folder_au")
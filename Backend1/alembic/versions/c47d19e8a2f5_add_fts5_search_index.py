@@ -0,0 +1,57 @@
+"""add FTS5 search index over notes and flashcards
+
+Revision ID: c47d19e8a2f5
+Revises: 8b2e4d6f0a13
+Create Date: 2026-10-17 23:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c47d19e8a2f5'
+down_revision: Union[str, Sequence[str], None] = '8b2e4d6f0a13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _index_ddl(fts, table, key, columns):
+    cols = ", ".join(columns)
+    new_vals = ", ".join(f"new.{c}" for c in (key, *columns))
+    old_vals = ", ".join(f"old.{c}" for c in (key, *columns))
+    return [
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+            {columns[0]}, {columns[1]}, user_id UNINDEXED,
+            content='{table}', content_rowid='{key}', tokenize='unicode61 remove_diacritics 2'
+        )""",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON "{table}" BEGIN
+            INSERT INTO {fts}(rowid, {cols}) VALUES ({new_vals});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON "{table}" BEGIN
+            INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', {old_vals});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON "{table}" BEGIN
+            INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', {old_vals});
+            INSERT INTO {fts}(rowid, {cols}) VALUES ({new_vals});
+        END""",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for statement in _index_ddl("notes_fts", "Notes", "note_id", ("title", "content", "user_id")):
+        op.execute(statement)
+    for statement in _index_ddl("flashcards_fts", "Flashcards", "flashcard_id", ("front_text", "back_text", "user_id")):
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for fts in ("flashcards_fts", "notes_fts"):
+        for suffix in ("ai", "ad", "au"):
+            op.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+        op.execute(f"DROP TABLE IF EXISTS {fts}")
@@ -0,0 +1,38 @@
+"""add TranslationCache table
+
+Revision ID: d2b7e41c9f06
+Revises: a9d3f6b2c8e4
+Create Date: 2026-10-18 00:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2b7e41c9f06'
+down_revision: Union[str, Sequence[str], None] = 'a9d3f6b2c8e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'TranslationCache',
+        sa.Column('backend', sa.String(), nullable=False),
+        sa.Column('source_lang', sa.String(), nullable=False),
+        sa.Column('target_lang', sa.String(), nullable=False),
+        sa.Column('text_hash', sa.String(), nullable=False),
+        sa.Column('source_text', sa.Text(), nullable=False),
+        sa.Column('translated_text', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.PrimaryKeyConstraint('backend', 'source_lang', 'target_lang', 'text_hash'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('TranslationCache')
@@ -0,0 +1,84 @@
+"""add Media catalog, transcript segments and their FTS5 indexes
+
+Revision ID: e61f0a7d3b28
+Revises: d2b7e41c9f06
+Create Date: 2026-10-18 01:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e61f0a7d3b28'
+down_revision: Union[str, Sequence[str], None] = 'd2b7e41c9f06'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _index_ddl(fts, table, key, columns):
+    cols = ", ".join(columns)
+    new_vals = ", ".join(f"new.{c}" for c in (key, *columns))
+    old_vals = ", ".join(f"old.{c}" for c in (key, *columns))
+    return [
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+            {cols},
+            content='{table}', content_rowid='{key}', tokenize='unicode61 remove_diacritics 2'
+        )""",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON "{table}" BEGIN
+            INSERT INTO {fts}(rowid, {cols}) VALUES ({new_vals});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON "{table}" BEGIN
+            INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', {old_vals});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON "{table}" BEGIN
+            INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', {old_vals});
+            INSERT INTO {fts}(rowid, {cols}) VALUES ({new_vals});
+        END""",
+    ]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'Media',
+        sa.Column('media_id', sa.Integer(), nullable=False),
+        sa.Column('external_id', sa.String(), nullable=False),
+        sa.Column('media_type', sa.String(), nullable=False),
+        sa.Column('title', sa.String(), nullable=False),
+        sa.Column('author', sa.String(), nullable=False),
+        sa.Column('url', sa.String(), nullable=False),
+        sa.Column('thumbnail_url', sa.String(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.PrimaryKeyConstraint('media_id'),
+        sa.UniqueConstraint('external_id'),
+    )
+    op.create_index('ix_Media_media_id', 'Media', ['media_id'], unique=False)
+    op.create_table(
+        'TranscriptSegments',
+        sa.Column('segment_id', sa.Integer(), nullable=False),
+        sa.Column('media_id', sa.Integer(), nullable=False),
+        sa.Column('start', sa.Float(), nullable=False),
+        sa.Column('end', sa.Float(), nullable=True),
+        sa.Column('text', sa.Text(), nullable=False),
+        sa.ForeignKeyConstraint(['media_id'], ['Media.media_id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('segment_id'),
+    )
+    op.create_index('ix_TranscriptSegments_segment_id', 'TranscriptSegments', ['segment_id'], unique=False)
+    op.create_index('ix_TranscriptSegments_media_id_start', 'TranscriptSegments', ['media_id', 'start'], unique=False)
+    for statement in _index_ddl("media_fts", "Media", "media_id", ("title", "author")):
+        op.execute(statement)
+    for statement in _index_ddl("transcript_fts", "TranscriptSegments", "segment_id", ("text",)):
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for fts in ("transcript_fts", "media_fts"):
+        for suffix in ("ai", "ad", "au"):
+            op.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+        op.execute(f"DROP TABLE IF EXISTS {fts}")
+    op.drop_table('TranscriptSegments')
+    op.drop_table('Media')
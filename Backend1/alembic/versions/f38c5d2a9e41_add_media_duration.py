@@ -0,0 +1,36 @@
+"""add Media.duration and Media.segment_count
+
+Revision ID: f38c5d2a9e41
+Revises: e61f0a7d3b28
+Create Date: 2026-10-18 01:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f38c5d2a9e41'
+down_revision: Union[str, Sequence[str], None] = 'e61f0a7d3b28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('Media', sa.Column('duration', sa.Float(), nullable=True))
+    op.add_column('Media', sa.Column('segment_count', sa.Integer(), nullable=False, server_default='0'))
+    op.execute("""
+        UPDATE "Media" SET
+            duration = (SELECT max(coalesce(s."end", s.start)) FROM "TranscriptSegments" s WHERE s.media_id = "Media".media_id),
+            segment_count = (SELECT count(*) FROM "TranscriptSegments" s WHERE s.media_id = "Media".media_id)
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Plain ALTER TABLE (SQLite >= 3.35): a batch rebuild would drop the FTS triggers on Media.
+    op.drop_column('Media', 'segment_count')
+    op.drop_column('Media', 'duration')
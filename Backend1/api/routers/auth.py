@@ -2,20 +2,32 @@
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 
 # Corrected, explicit imports for auth.py
 from Backend1 import models
 from Backend1 import schemas
 from Backend1 import security
-from Backend1.database import get_db
+from Backend1.database import get_async_db
+from Backend1.hashing import HashingBusyError
 
 router = APIRouter(tags=["Authentication"])
 
+def _hashing_busy_exception():
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication service is busy, please retry.",
+        headers={"Retry-After": "1"},
+    )
+
 @router.post("/token", response_model=schemas.Token)
-def login_for_access_token(db: Session = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()):
-    user = security.authenticate_user(db, email=form_data.username, password=form_data.password)
+async def login_for_access_token(db: AsyncSession = Depends(get_async_db), form_data: OAuth2PasswordRequestForm = Depends()):
+    try:
+        user = await security.authenticate_user(db, email=form_data.username, password=form_data.password)
+    except HashingBusyError:
+        raise _hashing_busy_exception()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -30,13 +42,16 @@ def login_for_access_token(db: Session = Depends(get_db), form_data: OAuth2Passw
 
 
 @router.post("/users", response_model=schemas.User)
-def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    db_user = db.query(models.User).filter(models.User.email == user.email).first()
+async def create_user(user: schemas.UserCreate, db: AsyncSession = Depends(get_async_db)):
+    db_user = await db.scalar(select(models.User).where(models.User.email == user.email))
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
-    hashed_password = security.get_password_hash(user.password)
+    try:
+        hashed_password = await security.password_hasher.hash_async(user.password)
+    except HashingBusyError:
+        raise _hashing_busy_exception()
     db_user = models.User(email=user.email, hashed_password=hashed_password)
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    return db_user
\ No newline at end of file
+    await db.commit()
+    await db.refresh(db_user)
+    return db_user
@@ -0,0 +1,41 @@
+# FILE: src/Backend1/api/routers/batch.py
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from Backend1 import schemas
+from Backend1.batch import BatchAborted, change_events, run_batch
+from Backend1.changefeed import Broker, get_change_feed
+from Backend1.database import get_async_db, run_write
+from Backend1.security import get_current_active_user
+
+router = APIRouter(
+    prefix="/batch",
+    tags=["Batch"]
+)
+
+
+@router.post("", response_model=schemas.BatchResult)
+async def run_operations(
+    batch: schemas.BatchRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.CurrentUser = Depends(get_current_active_user),
+    feed: Broker = Depends(get_change_feed),
+):
+    """
+    Runs a list of note, folder and stack-item operations in one transaction
+    and returns each operation's status as if it had been its own request.
+    With `atomic` (the default) a failed operation rolls the whole batch back
+    and the ones after it are reported as 424; otherwise failed operations
+    are skipped and the rest are committed.
+    """
+    user_id = str(current_user.id)
+    try:
+        results = await run_write(db, lambda session: run_batch(session, user_id, batch))
+    except BatchAborted as exc:
+        await db.rollback()  # release the write lock now, not when the session closes
+        return {"committed": False, "results": exc.results}
+
+    for entity, op, entity_id in change_events(batch, results):
+        await feed.publish(user_id, entity, op, entity_id)
+    return {"committed": True, "results": results}
@@ -0,0 +1,118 @@
+# FILE: src/Backend1/api/routers/changes.py
+
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, WebSocket, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import HTTPConnection
+
+from Backend1 import schemas
+from Backend1.changefeed import CHANGEFEED_KEEPALIVE_SECONDS, Broker, encode_event, format_sse, get_change_feed
+from Backend1.database import get_async_read_db
+from Backend1.security import get_current_active_user, get_current_user
+
+router = APIRouter(
+    prefix="/changes",
+    tags=["Changes"]
+)
+
+# Browsers reconnect an EventSource after this many milliseconds.
+SSE_RETRY_MS = 2000
+
+
+async def _feed_user(connection: HTTPConnection, access_token: Optional[str], db: AsyncSession) -> schemas.CurrentUser:
+    """
+    EventSource and WebSocket clients cannot set an Authorization header in
+    browsers, so the token may also come as ?access_token=.
+    """
+    scheme, _, credentials = connection.headers.get("authorization", "").partition(" ")
+    token = credentials if scheme.lower() == "bearer" and credentials else access_token
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    try:
+        return await get_current_active_user(await get_current_user(db, token))
+    finally:
+        # The stream outlives the request; do not hold a pooled connection for it.
+        await db.close()
+
+
+async def _event_stream(feed: Broker, user_id, cursor: Optional[str], keepalive: float):
+    # Subscribing here rather than in the endpoint ties the subscription to the
+    # generator: a client that disconnects before the body starts never
+    # subscribes, and every subscription made is closed in the finally.
+    subscription = await feed.subscribe(user_id, cursor)
+    try:
+        yield f"retry: {SSE_RETRY_MS}\n\n".encode()
+        while True:
+            event = await subscription.get(timeout=keepalive)
+            yield format_sse(event) if event is not None else b": keepalive\n\n"
+    finally:
+        subscription.close()
+
+
+@router.get("/stream")
+async def stream_changes(
+    request: Request,
+    after: Optional[str] = Query(None, description="Cursor of the last event seen; Last-Event-ID takes precedence."),
+    access_token: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_read_db),
+    feed: Broker = Depends(get_change_feed),
+):
+    """
+    Streams the current user's note, folder, stack and flashcard changes as
+    Server-Sent Events. Reconnecting with Last-Event-ID (or ?after=) replays
+    the events missed in between.
+    """
+    current_user = await _feed_user(request, access_token, db)
+    cursor = request.headers.get("last-event-id") or after
+    return StreamingResponse(
+        _event_stream(feed, current_user.id, cursor, CHANGEFEED_KEEPALIVE_SECONDS),
+        media_type="text/event-stream",
+        # X-Accel-Buffering: nginx would otherwise hold events back.
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/ws")
+async def change_socket(
+    websocket: WebSocket,
+    after: Optional[str] = Query(None, description="Cursor of the last event seen."),
+    access_token: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_read_db),
+    feed: Broker = Depends(get_change_feed),
+):
+    """
+    The same feed over a WebSocket: one JSON text message per event.
+    Messages sent by the client are ignored.
+    """
+    try:
+        current_user = await _feed_user(websocket, access_token, db)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await websocket.accept()
+    subscription = await feed.subscribe(current_user.id, after)
+
+    async def send_events():
+        while True:
+            await websocket.send_text(encode_event(await subscription.get()).decode())
+
+    async def wait_for_disconnect():
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+
+    tasks = [asyncio.ensure_future(send_events()), asyncio.ensure_future(wait_for_disconnect())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            task.exception()  # a send to a closed socket; nothing left to do
+    finally:
+        for task in tasks:
+            task.cancel()
+        subscription.close()
@@ -1,11 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Body
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Body
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 # --- CORRECTED IMPORTS ---
 from Backend1 import models
 from Backend1 import schemas
-from Backend1.database import get_db
+from Backend1 import conditional
+from Backend1.changefeed import Broker, get_change_feed
+from Backend1.database import get_async_db, get_async_read_db, run_write
+from Backend1.pagination import PageParams, fetch_page
+from Backend1.purge import Purger, get_purger
 # Assuming security is handled by a higher-level dependency or is not yet implemented for these specific routes
 # from Backend1.security import get_current_active_user
 
@@ -14,84 +19,109 @@ router = APIRouter(
     tags=["Collections & Stacks"]
 )
 
+# Listing orders; the trailing primary key makes keyset cursors unambiguous.
+STACK_ORDERING = [(models.Stack.creation_date, True), (models.Stack.stack_id, True)]
+FLASHCARD_ORDERING = [(models.Flashcard.creation_date, True), (models.Flashcard.flashcard_id, True)]
+
 @router.get("/users/{user_id}/stacks", response_model=List[schemas.StackResponseItem])
-def get_user_stacks(user_id: str, db: Session = Depends(get_db)):
+async def get_user_stacks(user_id: str, request: Request, response: Response, page: PageParams = Depends(), db: AsyncSession = Depends(get_async_read_db)):
     """
-    Gets all stacks for a given user.
+    Gets the stacks for a given user, optionally paginated and projected.
+    Answers 304 when If-None-Match still matches the stack list's ETag.
     """
     # Note: In a real app, you'd verify the user_id against the authenticated user.
-    stacks = db.query(models.Stack).filter(models.Stack.user_id == user_id).order_by(models.Stack.creation_date.desc()).all()
-    return stacks
+    validators = await conditional.collection_validators(db, f"stacks:{user_id}", request)
+    if validators.matches(request):
+        return validators.not_modified()
+    result = await fetch_page(db, models.Stack, [models.Stack.user_id == user_id], STACK_ORDERING, schemas.StackResponseItem, page, fast=True)
+    return result.to_response(response, validators.headers)
 
 @router.post("/stacks", response_model=schemas.StackResponseItem)
-def create_user_stack(stack: schemas.StackCreate, db: Session = Depends(get_db)):
+async def create_user_stack(stack: schemas.StackCreate, db: AsyncSession = Depends(get_async_db), feed: Broker = Depends(get_change_feed)):
     """
     Creates a new stack for the user.
     """
     # Corrected creation logic using the provided schema
-    db_stack = models.Stack(**stack.model_dump(), user_id="default-user") # Using placeholder user
-    db.add(db_stack)
-    db.commit()
-    db.refresh(db_stack)
+    async def _create(session):
+        db_stack = models.Stack(**stack.model_dump(), user_id="default-user") # Using placeholder user
+        session.add(db_stack)
+        await session.flush()
+        await session.refresh(db_stack)
+        return db_stack
+
+    db_stack = await run_write(db, _create)
+    await feed.publish(db_stack.user_id, "stack", "created", db_stack.stack_id, {"stack_name": db_stack.stack_name})
     return db_stack
 
 @router.post("/stacks/{stack_id}/items", response_model=schemas.GenericSuccessResponse)
-def add_item_to_stack(stack_id: int, item: schemas.TextItemCreate, db: Session = Depends(get_db)):
+async def add_item_to_stack(stack_id: int, item: schemas.TextItemCreate, db: AsyncSession = Depends(get_async_db), feed: Broker = Depends(get_change_feed)):
     """
     Adds a collected text item to a specific stack.
     This creates a CollectedItem and a linking Flashcard.
     """
-    # Verify stack exists for the user
-    stack = db.query(models.Stack).filter(models.Stack.stack_id == stack_id, models.Stack.user_id == "default-user").first()
-    if not stack:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Stack not found.")
+    async def _add(session):
+        # Verify stack exists for the user
+        stack = await session.scalar(select(models.Stack.stack_id).where(models.Stack.stack_id == stack_id, models.Stack.user_id == "default-user"))
+        if not stack:
+            return None
 
-    # Create the base CollectedItem
-    db_item = models.CollectedItem(
-        user_id="default-user",
-        selected_text=item.text,
-        source_url=item.source_url,
-        page_title=item.page_title
-    )
-    db.add(db_item)
-    db.flush() # Use flush to get the item_id before committing fully
+        # Create the base CollectedItem
+        db_item = models.CollectedItem(
+            user_id="default-user",
+            selected_text=item.text,
+            source_url=item.source_url,
+            page_title=item.page_title
+        )
+        session.add(db_item)
+
+        # Create the Flashcard for the item in the stack. The model has no
+        # collected_item_id column (see models.Flashcard), so it is not linked.
+        db_flashcard = models.Flashcard(
+            user_id="default-user",
+            stack_id=stack_id,
+            front_text=item.text
+        )
+        session.add(db_flashcard)
+        await session.flush()
+        return db_flashcard.flashcard_id
+
+    flashcard_id = await run_write(db, _add)
+    if flashcard_id is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Stack not found.")
+    await feed.publish("default-user", "flashcard", "created", flashcard_id, {"stack_id": stack_id, "front_text": item.text})
 
-    # Create the Flashcard that links the item to the stack
-    db_flashcard = models.Flashcard(
-        user_id="default-user",
-        collected_item_id=db_item.item_id,
-        stack_id=stack_id,
-        front_text=item.text
-    )
-    db.add(db_flashcard)
-    db.commit()
-    
     return schemas.GenericSuccessResponse(success=True, message="Item added to stack successfully.")
 
 
 # --- The following are other useful endpoints from your original file, kept for completeness ---
 
 @router.get("/stacks/{stack_id}/flashcards", response_model=List[schemas.FlashcardItem])
-def get_flashcards_in_stack(stack_id: int, db: Session = Depends(get_db)):
+async def get_flashcards_in_stack(stack_id: int, request: Request, response: Response, page: PageParams = Depends(), db: AsyncSession = Depends(get_async_read_db)):
     """
-    Gets all flashcards from a specific stack.
+    Gets the flashcards from a specific stack, optionally paginated and projected.
+    Answers 304 when If-None-Match still matches the stack's card-list ETag.
     """
-    stack = db.query(models.Stack).filter(models.Stack.stack_id == stack_id, models.Stack.user_id == "default-user").first()
+    stack = await db.scalar(select(models.Stack).where(models.Stack.stack_id == stack_id, models.Stack.user_id == "default-user"))
     if not stack:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Stack not found for this user.")
     
-    flashcards = db.query(models.Flashcard).filter(models.Flashcard.stack_id == stack_id).order_by(models.Flashcard.creation_date.desc()).all()
-    return flashcards
+    validators = await conditional.collection_validators(db, f"flashcards:{stack_id}", request)
+    if validators.matches(request):
+        return validators.not_modified()
+    result = await fetch_page(db, models.Flashcard, [models.Flashcard.stack_id == stack_id], FLASHCARD_ORDERING, schemas.FlashcardItem, page, fast=True)
+    return result.to_response(response, validators.headers)
     
-@router.delete("/stacks/{stack_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_stack(stack_id: int, db: Session = Depends(get_db)):
+@router.delete("/stacks/{stack_id}", status_code=status.HTTP_204_NO_CONTENT, responses={202: {"description": "Large stack; its flashcards are being deleted in the background."}})
+async def delete_stack(stack_id: int, db: AsyncSession = Depends(get_async_db), feed: Broker = Depends(get_change_feed), purger: Purger = Depends(get_purger)):
     """
-    Deletes a stack owned by the user.
+    Deletes a stack owned by the user, and its flashcards with it.
+    Answers 202 when the stack is large enough to be deleted in the background;
+    a "deleted" change-feed event follows once it is gone.
     """
-    stack_to_delete = db.query(models.Stack).filter(models.Stack.stack_id == stack_id, models.Stack.user_id == "default-user").first()
+    stack_to_delete = await db.scalar(select(models.Stack.stack_id).where(models.Stack.stack_id == stack_id, models.Stack.user_id == "default-user"))
     if not stack_to_delete:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Stack not found for this user.")
     
-    db.delete(stack_to_delete)
-    db.commit()
+    if not await purger.delete(db, "stack", "default-user", stack_id, feed):
+        return Response(status_code=status.HTTP_202_ACCEPTED)
     return
\ No newline at end of file
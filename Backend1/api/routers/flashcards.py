@@ -1,13 +1,26 @@
 # FILE: src/Backend1/api/routers/flashcards.py
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+import csv
+import json
+import tempfile
+import uuid
+from datetime import datetime, timezone
+from typing import AsyncIterator, Iterator, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
 # --- CORRECTED IMPORTS ---
 # Ensure that 'models' and 'schemas' are imported so they can be referenced
 from Backend1 import models
 from Backend1 import schemas
-from Backend1.database import get_db
+from Backend1.cache import TTLCache
+from Backend1.changefeed import Broker, get_change_feed
+from Backend1.database import get_async_db, get_async_read_db, run_write
+from Backend1.ndjson import NDJSON_MEDIA_TYPES, content_type, iter_json_lines, iter_lines
+from Backend1.pagination import MAX_PAGE_SIZE
+from Backend1.scheduler import schedule_review
 from Backend1.security import get_current_active_user
 
 router = APIRouter(
@@ -15,31 +28,237 @@ router = APIRouter(
     tags=["Flashcards"]
 )
 
+DEFAULT_BACK_TEXT = "(edit this definition)"
+# Rows per executemany() round trip during streamed imports.
+IMPORT_CHUNK_SIZE = 1000
+# Parsed import rows are kept in memory up to this many bytes, then spooled to a temp file.
+IMPORT_SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
+# Progress of recent imports by (user_id, import_id), polled through
+# GET /flashcards/imports/{import_id}.
+_import_progress = TTLCache(maxsize=1024, ttl=3600)
+
+async def _bulk_insert_cards(db: AsyncSession, stack_id: int, user_id, texts: List[str]):
+    """
+    Inserts flashcards with a single executemany() on the Core table, skipping
+    per-row ORM object construction and unit-of-work bookkeeping.
+    """
+    if not texts:
+        return
+    await db.execute(
+        insert(models.Flashcard.__table__),
+        [{"front_text": text, "back_text": DEFAULT_BACK_TEXT, "stack_id": stack_id, "user_id": user_id} for text in texts],
+    )
+
 @router.post("/decks-from-items", response_model=schemas.StackResponseItem)
-def create_deck_from_items(deck_data: schemas.DeckFromItemsCreate, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_active_user)):
+async def create_deck_from_items(deck_data: schemas.DeckFromItemsCreate, db: AsyncSession = Depends(get_async_db), current_user: schemas.CurrentUser = Depends(get_current_active_user), feed: Broker = Depends(get_change_feed)):
     """
     Creates a new deck (as a Stack) and populates it with flashcards 
     from a list of items for the currently authenticated user.
     """
-    # 1. Create the new deck/stack
-    new_deck = models.Stack(
-        stack_name=deck_data.deck_name,
-        user_id=current_user.id
-    )
-    db.add(new_deck)
-    db.commit()
-    db.refresh(new_deck)
-
-    # 2. Create flashcards for each item and associate with the new deck
-    for item in deck_data.items:
-        new_card = models.Flashcard(
-            front_text=item.text,
-            back_text="(edit this definition)",
-            stack_id=new_deck.stack_id,  # Link to the new stack
+    async def _create(session):
+        # 1. Create the new deck/stack
+        new_deck = models.Stack(
+            stack_name=deck_data.deck_name,
             user_id=current_user.id
         )
-        db.add(new_card)
-    
-    db.commit()
-    
-    return new_deck
\ No newline at end of file
+        session.add(new_deck)
+        await session.flush()
+
+        # 2. Bulk-insert the flashcards in the same transaction as the deck
+        await _bulk_insert_cards(session, new_deck.stack_id, current_user.id, [item.text for item in deck_data.items])
+        await session.refresh(new_deck)
+        return new_deck
+
+    new_deck = await run_write(db, _create)
+    await feed.publish(current_user.id, "stack", "created", new_deck.stack_id, {"stack_name": new_deck.stack_name, "card_count": len(deck_data.items)})
+
+    return new_deck
+
+# --- Streamed Imports ---
+
+async def _iter_ndjson_texts(request: Request) -> AsyncIterator[str]:
+    """
+    One item per line: either {"text": "..."} or a bare JSON string.
+    """
+    async for line_number, item in iter_json_lines(request):
+        text = item.get("text") if isinstance(item, dict) else item
+        if not isinstance(text, str):
+            raise ValueError(f"Line {line_number} has no 'text' string.")
+        yield text
+
+async def _iter_csv_texts(request: Request) -> AsyncIterator[str]:
+    """
+    Uses the "text" column when the first row is a header containing it,
+    otherwise the first column of every row.
+    """
+    column = None
+    pending = ""
+    async for line in iter_lines(request):
+        # A quoted field may contain newlines; keep reading until quotes balance.
+        pending = f"{pending}\n{line}" if pending else line
+        if pending.count('"') % 2:
+            continue
+        row, pending = next(csv.reader([pending]), []), ""
+        if not row:
+            continue
+        if column is None:
+            if "text" in row:
+                column = row.index("text")
+                continue
+            column = 0
+        if column < len(row):
+            yield row[column]
+    if pending:
+        raise ValueError("CSV body ends inside a quoted field.")
+
+def _spooled_chunks(spool) -> Iterator[List[str]]:
+    """
+    Reads back the texts spooled one JSON string per line, IMPORT_CHUNK_SIZE at a time.
+    """
+    spool.seek(0)
+    chunk = []
+    for line in spool:
+        chunk.append(json.loads(line))
+        if len(chunk) >= IMPORT_CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    yield chunk
+
+@router.post("/decks/import", response_model=schemas.DeckImportStatus, status_code=status.HTTP_201_CREATED)
+async def import_deck(
+    request: Request,
+    deck_name: str = Query(...),
+    import_id: Optional[str] = Query(None, description="Client-chosen id for polling progress while the upload runs."),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.CurrentUser = Depends(get_current_active_user),
+    feed: Broker = Depends(get_change_feed),
+):
+    """
+    Creates a deck from a streamed NDJSON (application/x-ndjson) or CSV (text/csv)
+    body. The body is parsed and spooled as it arrives; only then are the deck
+    and its cards inserted, in chunks, in one short transaction, so a slow
+    upload never holds the database's write lock.
+    """
+    body_type = content_type(request)
+    if body_type in NDJSON_MEDIA_TYPES:
+        texts = _iter_ndjson_texts(request)
+    elif body_type == "text/csv":
+        texts = _iter_csv_texts(request)
+    else:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail="Send application/x-ndjson or text/csv.")
+
+    import_id = import_id or uuid.uuid4().hex
+    progress = {"import_id": import_id, "status": "running", "received": 0, "inserted": 0, "stack_id": None, "detail": None}
+    _import_progress.set((current_user.id, import_id), progress)
+
+    async def _insert(session, spool):
+        new_deck = models.Stack(stack_name=deck_name, user_id=current_user.id)
+        session.add(new_deck)
+        await session.flush()
+        progress["inserted"] = 0
+        for chunk in _spooled_chunks(spool):
+            await _bulk_insert_cards(session, new_deck.stack_id, current_user.id, chunk)
+            progress["inserted"] += len(chunk)
+        return new_deck.stack_id
+
+    with tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_MAX_BYTES, mode="w+", encoding="utf-8") as spool:
+        try:
+            async for text in texts:
+                if not text.strip():
+                    continue
+                spool.write(json.dumps(text) + "\n")
+                progress["received"] += 1
+        except (ValueError, UnicodeDecodeError) as exc:
+            progress.update(status="failed", detail=str(exc))
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+        except Exception:
+            progress.update(status="failed", detail="Import failed.")
+            raise
+
+        try:
+            progress["stack_id"] = await run_write(db, lambda session: _insert(session, spool))
+        except Exception:
+            progress.update(status="failed", inserted=0, detail="Import failed.")
+            raise
+
+    progress["status"] = "completed"
+    await feed.publish(current_user.id, "stack", "created", progress["stack_id"], {"stack_name": deck_name, "card_count": progress["inserted"]})
+    return progress
+
+@router.get("/imports/{import_id}", response_model=schemas.DeckImportStatus)
+async def get_import_progress(import_id: str, current_user: schemas.CurrentUser = Depends(get_current_active_user)):
+    """
+    Reports how many cards an import has inserted so far.
+    """
+    progress = _import_progress.get((current_user.id, import_id))
+    if progress is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Import not found.")
+    return progress
+
+# --- Spaced-Repetition Reviews ---
+
+SCHEDULE_COLUMNS = ("interval_days", "ease", "repetitions", "lapses")
+
+def _as_utc(value: Optional[datetime], default: datetime) -> datetime:
+    # Timestamps are stored as naive UTC, like CURRENT_TIMESTAMP.
+    if value is None:
+        return default
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+@router.get("/due", response_model=List[schemas.FlashcardItem])
+async def get_due_flashcards(
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: schemas.CurrentUser = Depends(get_current_active_user),
+):
+    """
+    Returns the next cards to review across all of the user's stacks, most
+    overdue first. This is a range scan on (user_id, next_review_date) that
+    stops after `limit` rows, however many cards the user has.
+    """
+    now = datetime.now(timezone.utc)
+    cards = await db.scalars(
+        select(models.Flashcard)
+        .where(models.Flashcard.user_id == current_user.id, models.Flashcard.due_at <= now)
+        .order_by(models.Flashcard.due_at, models.Flashcard.flashcard_id)
+        .limit(limit)
+    )
+    return cards.all()
+
+@router.post("/reviews", response_model=List[schemas.ReviewResult])
+async def submit_reviews(
+    batch: schemas.ReviewBatch,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.CurrentUser = Depends(get_current_active_user),
+    feed: Broker = Depends(get_change_feed),
+):
+    """
+    Records a batch of reviews (e.g. a whole study session, possibly done
+    offline) and reschedules the cards with SM-2, all in one transaction.
+    Several reviews of the same card are applied in `reviewed_at` order.
+    """
+    now = datetime.now(timezone.utc)
+    card_ids = {review.flashcard_id for review in batch.reviews}
+
+    async def job(session: AsyncSession):
+        rows = await session.execute(
+            select(models.Flashcard.flashcard_id, *[getattr(models.Flashcard, c) for c in SCHEDULE_COLUMNS])
+            .where(models.Flashcard.flashcard_id.in_(card_ids), models.Flashcard.user_id == current_user.id)
+        )
+        states = {row.flashcard_id: dict(row._mapping) for row in rows}
+        missing = sorted(card_ids - states.keys())
+        if missing:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Flashcards not found: {missing}")
+
+        for review in sorted(batch.reviews, key=lambda r: _as_utc(r.reviewed_at, now)):
+            state = states[review.flashcard_id]
+            state.update(schedule_review(state, review.grade, _as_utc(review.reviewed_at, now)))
+        # ORM bulk UPDATE by primary key: one executemany for the whole batch.
+        await session.execute(update(models.Flashcard), list(states.values()))
+        return [states[card_id] for card_id in sorted(states)]
+
+    results = await run_write(db, job)
+    for state in results:
+        await feed.publish(current_user.id, "flashcard", "updated", state["flashcard_id"], {"due_at": state["due_at"]})
+    return results
@@ -1,7 +1,12 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from Backend1 import models, schemas, security
-from Backend1.database import get_db
+# FILE: src/Backend1/api/routers/history.py
+
+import os
+from datetime import datetime, timezone
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from Backend1 import models, schemas
+from Backend1.ingest import IngestBusyError, IngestPipeline, get_ingest, ingest_busy_exception
 from Backend1.security import get_current_active_user
 
 router = APIRouter(
@@ -9,14 +14,40 @@ router = APIRouter(
     tags=["History"]
 )
 
-@router.post("/log", response_model=schemas.GenericSuccessResponse)
-def log_history_item(item: schemas.TextItemCreate, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_active_user)):
+# Upper bound on items per /history/log/batch request.
+HISTORY_BATCH_MAX_ITEMS = int(os.getenv("HISTORY_BATCH_MAX_ITEMS", "1000"))
+
+def _history_row(item: schemas.TextItemCreate, user_id, collected_at: str) -> dict:
+    return {
+        "user_id": user_id,
+        "selected_text": item.text,
+        "source_url": item.source_url,
+        "page_title": item.page_title,
+        "timestamp_collected": collected_at,
+    }
+
+async def _queue_history(items: List[schemas.TextItemCreate], user_id, ingest: IngestPipeline):
+    collected_at = datetime.now(timezone.utc).isoformat()
+    try:
+        await ingest.submit(models.CollectedItem.__tablename__, [_history_row(item, user_id, collected_at) for item in items])
+    except IngestBusyError:
+        raise ingest_busy_exception()
+
+@router.post("/log", response_model=schemas.GenericSuccessResponse, status_code=status.HTTP_202_ACCEPTED)
+async def log_history_item(item: schemas.TextItemCreate, current_user: schemas.CurrentUser = Depends(get_current_active_user), ingest: IngestPipeline = Depends(get_ingest)):
+    """
+    Logs a collected item to the user's history (the CollectedItems table).
+    The item is queued and written by the background ingest writer.
+    """
+    await _queue_history([item], current_user.id, ingest)
+    return {"success": True, "message": "Item logged to history."}
+
+@router.post("/log/batch", response_model=schemas.GenericSuccessResponse, status_code=status.HTTP_202_ACCEPTED)
+async def log_history_batch(batch: schemas.TextItemBatch, current_user: schemas.CurrentUser = Depends(get_current_active_user), ingest: IngestPipeline = Depends(get_ingest)):
     """
-    Logs a collected item to the user's history.
-    This would typically save to a 'CollectedItems' table.
+    Logs many collected items in one request (e.g. a buffer flushed by the extension).
     """
-    # This is a simplified example. You would save the item to your database here.
-    # For example, creating a new models.CollectedItem
-    print(f"User {current_user.email} logged history item: '{item.text}'")
-    
-    return {"success": True, "message": "Item logged to history."}
\ No newline at end of file
+    if len(batch.items) > HISTORY_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=f"At most {HISTORY_BATCH_MAX_ITEMS} items per request.")
+    await _queue_history(batch.items, current_user.id, ingest)
+    return {"success": True, "message": f"{len(batch.items)} items logged to history."}
@@ -1,12 +1,15 @@
 # FILE: src/Backend1/api/routers/media_search.py
 
-from fastapi import APIRouter, Depends
-from typing import List
-import logging
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Tuple
 
 # Import models, schemas, and dependencies from their centralized locations
-from Backend1 import models
 from Backend1 import schemas
+from Backend1 import media_index
+from Backend1.database import get_async_read_db
+from Backend1.ndjson import NDJSON_MEDIA_TYPE, encode_line
 from Backend1.security import get_current_active_user
 
 router = APIRouter(
@@ -14,29 +17,88 @@ router = APIRouter(
     tags=["Media Search"]
 )
 
-logger = logging.getLogger(__name__)
-
 @router.get("/", response_model=List[schemas.MediaSearchResult])
-def search_media_mock(query: str = "", current_user: models.User = Depends(get_current_active_user)):
+async def search_media(
+    query: str = Query("", max_length=200),
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: schemas.CurrentUser = Depends(get_current_active_user),
+):
     """
-    A mock endpoint that returns a hard-coded but realistic search result
-    for a single YouTube video, including a sample transcript.
+    Searches the media catalog by title, author and transcript text. Each hit
+    lists the timestamps of its best-matching transcript segments in `matches`
+    (with <mark> tags around matched terms) so the player can jump to them.
+    Transcripts are not inlined; fetch them from each hit's `transcript_url`.
     This endpoint is protected and requires authentication.
     """
-    logger.info(f"Mock media search received for query: '{query}' from user: {current_user.email}")
-    
-    mock_video_data = {
-        "id": "Tk35942nI3o",
-        "media_type": "youtube",
-        "title": "The new FastAPI framework",
-        "author": "Sebastián Ramírez (tiangolo)",
-        "url": "https://www.youtube.com/watch?v=Tk35942nI3o",
-        "thumbnail_url": "https://i.ytimg.com/vi/Tk35942nI3o/hqdefault.jpg",
-        "transcript": [
-            {"start": 5.2, "text": "Hi everyone. Thank you for coming."},
-            {"start": 7.1, "text": "My name is Sebastián Ramírez, I'm the creator of FastAPI."},
-            {"start": 10.5, "text": "And today I'm going to show you a little bit about it."},
-            {"start": 13.0, "text": "So FastAPI is a modern web framework for building APIs."},
-        ]
-    }
-    return [mock_video_data]
\ No newline at end of file
+    return await media_index.search_media(db, query, limit)
+
+# --- Transcript Streaming ---
+
+# Transcripts are addressed by time: `Range: seconds=<from>-<to>` (both inclusive),
+# `seconds=<from>-` (to the end) or `seconds=-<n>` (the last n seconds).
+TRANSCRIPT_RANGE_UNIT = "seconds"
+
+def _parse_time_range(header: str, duration: float) -> Optional[Tuple[float, float]]:
+    """
+    Returns the requested (start, end) window, or None when the header should be
+    ignored (another unit, several ranges or bad syntax; RFC 9110 lets servers
+    then send the full representation). Raises ValueError when unsatisfiable.
+    """
+    unit, _, spec = header.partition("=")
+    first, dash, last = spec.strip().partition("-")
+    if unit.strip().lower() != TRANSCRIPT_RANGE_UNIT or "," in spec or not dash:
+        return None
+    try:
+        if not first:
+            start, end = max(duration - float(last), 0.0), duration
+        else:
+            start, end = float(first), (float(last) if last else duration)
+    except ValueError:
+        return None
+    if start < 0 or start > end or start > duration:
+        raise ValueError(header)
+    return start, min(end, duration)
+
+@router.get("/{media_id}/transcript")
+async def stream_transcript(
+    media_id: str,
+    request: Request,
+    start: float = Query(0.0, ge=0, description="Window start in seconds (ignored when a Range header is sent)."),
+    end: Optional[float] = Query(None, ge=0, description="Window end in seconds, inclusive."),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: schemas.CurrentUser = Depends(get_current_active_user),
+):
+    """
+    Streams a media item's transcript as NDJSON (`{"start", "end", "text"}` per
+    line), read and sent in chunks so long transcripts never sit in memory.
+    Players can request just the window around the playhead with
+    `Range: seconds=120-180`, answered with 206 and a Content-Range header.
+    """
+    media = await media_index.get_media(db, media_id)
+    if media is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Media not found.")
+    duration = media.duration or 0.0
+    headers = {"Accept-Ranges": TRANSCRIPT_RANGE_UNIT, "Cache-Control": "private, max-age=300"}
+    status_code = status.HTTP_200_OK
+
+    range_header = request.headers.get("range")
+    if range_header:
+        try:
+            window = _parse_time_range(range_header, duration)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_416_RANGE_NOT_SATISFIABLE,
+                detail="Requested time range is outside the transcript.",
+                headers={"Content-Range": f"{TRANSCRIPT_RANGE_UNIT} */{duration:g}"},
+            )
+        if window is not None:
+            start, end = window
+            status_code = status.HTTP_206_PARTIAL_CONTENT
+            headers["Content-Range"] = f"{TRANSCRIPT_RANGE_UNIT} {start:g}-{end:g}/{duration:g}"
+
+    async def body():
+        async for chunk in media_index.iter_transcript(db, media.media_id, start, end):
+            yield b"".join(encode_line(segment) for segment in chunk)
+
+    return StreamingResponse(body(), status_code=status_code, media_type=NDJSON_MEDIA_TYPE, headers=headers)
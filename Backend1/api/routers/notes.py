@@ -1,13 +1,19 @@
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 
 # --- CORRECTED IMPORTS ---
 # Ensure that 'models' and 'schemas' are imported so they can be referenced
 from Backend1 import models
 from Backend1 import schemas
-from Backend1.database import get_db
+from Backend1 import conditional
+from Backend1.changefeed import Broker, get_change_feed
+from Backend1.pagination import PageParams, fetch_page
+from Backend1.purge import Purger, get_purger
+from Backend1.database import get_async_db, get_async_read_db, run_write
+from Backend1.etags import make_etag, parse_etag_header
 from Backend1.security import get_current_active_user
 
 router = APIRouter(
@@ -15,95 +21,246 @@ router = APIRouter(
     tags=["Notes & Folders"]
 )
 
+# Listing orders; the trailing primary key makes keyset cursors unambiguous.
+FOLDER_ORDERING = [(models.Folder.folder_name, False), (models.Folder.folder_id, False)]
+NOTE_ORDERING = [(models.Note.last_modified_date, True), (models.Note.note_id, True)]
+
+def _note_change(note) -> dict:
+    """Change-feed payload for a note; clients fetch the content when they need it."""
+    return {"title": note.title, "folder_id": note.folder_id, "version": note.version, "last_modified_date": note.last_modified_date}
+
+async def _check_folder(session: AsyncSession, folder_id: Optional[int], user_id) -> None:
+    """
+    Rejects a folder_id that is not one of the user's folders, instead of
+    letting the foreign key fail the write.
+    """
+    if folder_id is not None and not await session.scalar(
+        select(models.Folder.folder_id).where(models.Folder.folder_id == folder_id, models.Folder.user_id == user_id)
+    ):
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"Folder {folder_id} not found.")
+
 # --- FOLDERS ---
 
 @router.post("/folders", response_model=schemas.FolderItem, status_code=status.HTTP_201_CREATED)
-def create_new_folder(folder: schemas.FolderCreate, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_active_user)):
+async def create_new_folder(folder: schemas.FolderCreate, db: AsyncSession = Depends(get_async_db), current_user: schemas.CurrentUser = Depends(get_current_active_user), feed: Broker = Depends(get_change_feed)):
     """
     Creates a new folder for the currently authenticated user.
     """
-    db_folder = models.Folder(**folder.dict(), user_id=current_user.id)
-    db.add(db_folder)
-    db.commit()
-    db.refresh(db_folder)
+    async def _create(session):
+        db_folder = models.Folder(**folder.dict(), user_id=current_user.id)
+        session.add(db_folder)
+        await session.flush()
+        await session.refresh(db_folder)
+        return db_folder
+
+    db_folder = await run_write(db, _create)
+    await feed.publish(current_user.id, "folder", "created", db_folder.folder_id, {"folder_name": db_folder.folder_name})
     return db_folder
 
 @router.get("/folders", response_model=List[schemas.FolderItem])
-def get_all_folders(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_active_user)):
+async def get_all_folders(request: Request, response: Response, page: PageParams = Depends(), db: AsyncSession = Depends(get_async_read_db), current_user: schemas.CurrentUser = Depends(get_current_active_user)):
     """
-    Retrieves all folders for the currently authenticated user.
+    Retrieves the folders for the currently authenticated user, optionally paginated and projected.
+    Answers 304 when If-None-Match still matches the folder list's ETag.
     """
-    return db.query(models.Folder).filter(models.Folder.user_id == current_user.id).order_by(models.Folder.folder_name).all()
+    validators = await conditional.collection_validators(db, f"folders:{current_user.id}", request)
+    if validators.matches(request):
+        return validators.not_modified()
+    result = await fetch_page(db, models.Folder, [models.Folder.user_id == current_user.id], FOLDER_ORDERING, schemas.FolderItem, page, fast=True)
+    return result.to_response(response, validators.headers)
 
-@router.delete("/folders/{folder_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_folder(folder_id: int, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_active_user)):
+@router.delete("/folders/{folder_id}", status_code=status.HTTP_204_NO_CONTENT, responses={202: {"description": "Large folder; its notes are being un-filed in the background."}})
+async def delete_folder(folder_id: int, db: AsyncSession = Depends(get_async_db), current_user: schemas.CurrentUser = Depends(get_current_active_user), feed: Broker = Depends(get_change_feed), purger: Purger = Depends(get_purger)):
     """
     Deletes a folder and un-links any notes within it for the currently authenticated user.
+    Answers 202 when the folder holds enough notes to be emptied in the background.
     """
-    folder_to_delete = db.query(models.Folder).filter(models.Folder.folder_id == folder_id, models.Folder.user_id == current_user.id).first()
+    folder_to_delete = await db.scalar(select(models.Folder.folder_id).where(models.Folder.folder_id == folder_id, models.Folder.user_id == current_user.id))
     if not folder_to_delete:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Folder not found.")
     
-    # The relationship in models.py with `ondelete="SET NULL"` will handle un-linking notes
-    db.delete(folder_to_delete)
-    db.commit()
+    # Subscribers un-file the folder's notes themselves on the "deleted" event; no per-note events.
+    if not await purger.delete(db, "folder", current_user.id, folder_id, feed):
+        return Response(status_code=status.HTTP_202_ACCEPTED)
     return
 
 # --- NOTES ---
 
 @router.post("/", response_model=schemas.NoteItem, status_code=status.HTTP_201_CREATED)
-def create_new_note(note: schemas.NoteCreate, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_active_user)):
+async def create_new_note(note: schemas.NoteCreate, db: AsyncSession = Depends(get_async_db), current_user: schemas.CurrentUser = Depends(get_current_active_user), feed: Broker = Depends(get_change_feed)):
     """
     Creates a new note for the currently authenticated user.
     """
-    db_note = models.Note(**note.dict(), user_id=current_user.id)
-    db.add(db_note)
-    db.commit()
-    db.refresh(db_note)
+    async def _create(session):
+        await _check_folder(session, note.folder_id, current_user.id)
+        db_note = models.Note(**note.dict(), user_id=current_user.id)
+        session.add(db_note)
+        await session.flush()
+        await session.refresh(db_note)
+        return db_note
+
+    db_note = await run_write(db, _create)
+    await feed.publish(current_user.id, "note", "created", db_note.note_id, _note_change(db_note))
     return db_note
 
 @router.get("/", response_model=List[schemas.NoteItem])
-def get_all_notes(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_active_user)):
+async def get_all_notes(request: Request, response: Response, page: PageParams = Depends(), db: AsyncSession = Depends(get_async_read_db), current_user: schemas.CurrentUser = Depends(get_current_active_user)):
     """
-    Retrieves all notes for the currently authenticated user.
+    Retrieves the notes for the currently authenticated user, most recently modified first.
+    Use `fields=note_id,title,last_modified_date` to list notes without loading their content.
+    Answers 304 when If-None-Match still matches the note list's ETag.
     """
-    return db.query(models.Note).filter(models.Note.user_id == current_user.id).order_by(models.Note.last_modified_date.desc()).all()
+    validators = await conditional.collection_validators(db, f"notes:{current_user.id}", request)
+    if validators.matches(request):
+        return validators.not_modified()
+    result = await fetch_page(db, models.Note, [models.Note.user_id == current_user.id], NOTE_ORDERING, schemas.NoteItem, page, fast=True)
+    return result.to_response(response, validators.headers)
 
 @router.get("/{note_id}", response_model=schemas.NoteItem)
-def get_note(note_id: int, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_active_user)):
+async def get_note(note_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_read_db), current_user: schemas.CurrentUser = Depends(get_current_active_user)):
     """
     Retrieves a specific note by its ID for the currently authenticated user.
+    The ETag is the note version; a matching If-None-Match gets a 304 without loading the content.
     """
-    note = db.query(models.Note).filter(models.Note.note_id == note_id, models.Note.user_id == current_user.id).first()
+    note_filter = (models.Note.note_id == note_id, models.Note.user_id == current_user.id)
+    if request.headers.get("if-none-match") or request.headers.get("if-modified-since"):
+        row = (await db.execute(select(models.Note.version, models.Note.last_modified_date).where(*note_filter))).first()
+        if row and conditional.note_validators(row.version, row.last_modified_date).matches(request):
+            return conditional.note_validators(row.version, row.last_modified_date).not_modified()
+
+    note = await db.scalar(select(models.Note).where(*note_filter))
     if not note:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Note not found.")
+    conditional.note_validators(note.version, note.last_modified_date).apply(response)
     return note
 
 @router.put("/{note_id}", response_model=schemas.NoteItem)
-def update_note(note_id: int, note_data: schemas.NoteCreate, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_active_user)):
+async def update_note(note_id: int, note_data: schemas.NoteCreate, db: AsyncSession = Depends(get_async_db), current_user: schemas.CurrentUser = Depends(get_current_active_user), feed: Broker = Depends(get_change_feed)):
     """
     Updates a specific note for the currently authenticated user.
     """
-    note_query = db.query(models.Note).filter(models.Note.note_id == note_id, models.Note.user_id == current_user.id)
-    db_note = note_query.first()
+    note_filter = (models.Note.note_id == note_id, models.Note.user_id == current_user.id)
+
+    async def _update(session):
+        db_note = await session.scalar(select(models.Note).where(*note_filter))
+        if not db_note:
+            return None
+        await _check_folder(session, note_data.folder_id, current_user.id)
+        await session.execute(
+            update(models.Note).where(*note_filter)
+            .values(**note_data.dict(), version=models.Note.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        await session.refresh(db_note)
+        return db_note
 
+    db_note = await run_write(db, _update)
     if not db_note:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Note not found.")
-    
-    note_query.update(note_data.dict(), synchronize_session=False)
-    db.commit()
-    db.refresh(db_note)
+    await feed.publish(current_user.id, "note", "updated", note_id, _note_change(db_note))
     return db_note
 
+def apply_text_edits(content: str, edits: List[schemas.TextEdit]) -> str:
+    """
+    Applies non-overlapping edits whose offsets refer to the original content.
+    Offsets are UTF-16 code units so they match the editor's JavaScript indices.
+    """
+    data = (content or "").encode("utf-16-le")
+    length = len(data) // 2
+    previous_start = length + 1
+    # Apply from the end so earlier offsets stay valid.
+    for edit in sorted(edits, key=lambda e: (e.start, e.end), reverse=True):
+        if not 0 <= edit.start <= edit.end <= length or edit.end > previous_start:
+            raise ValueError(f"Edit [{edit.start}, {edit.end}) is out of range or overlaps another edit.")
+        data = data[:edit.start * 2] + edit.text.encode("utf-16-le") + data[edit.end * 2:]
+        previous_start = edit.start
+    return data.decode("utf-16-le")
+
+@router.patch("/{note_id}", response_model=schemas.NoteVersion)
+async def patch_note(
+    note_id: int,
+    patch: schemas.NotePatch,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.CurrentUser = Depends(get_current_active_user),
+    feed: Broker = Depends(get_change_feed),
+):
+    """
+    Applies an autosave delta to a note. The base version comes from the
+    If-Match header (the note's ETag) or `base_version`; if the note has moved
+    on since then the request fails with 412 (If-Match) or 409 and the client
+    must re-fetch. Returns only the new version, not the note.
+    """
+    tags = parse_etag_header(if_match)
+    base_version = patch.base_version
+    if tags and tags != ["*"]:
+        try:
+            base_version = int(tags[0])
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail="Note has been modified.")
+    if base_version is None:
+        raise HTTPException(status_code=status.HTTP_428_PRECONDITION_REQUIRED, detail="Send If-Match or base_version.")
+    conflict_status = status.HTTP_412_PRECONDITION_FAILED if tags else status.HTTP_409_CONFLICT
+
+    note_filter = (models.Note.note_id == note_id, models.Note.user_id == current_user.id)
+
+    async def _patch(session):
+        row = (await session.execute(select(models.Note.version, models.Note.content).where(*note_filter))).first()
+        if row is None:
+            return "missing", None
+        if row.version != base_version:
+            return "conflict", row.version
+        if "folder_id" in patch.model_fields_set:
+            await _check_folder(session, patch.folder_id, current_user.id)
+
+        values = {"version": models.Note.version + 1}
+        if patch.edits:
+            values["content"] = apply_text_edits(row.content, patch.edits)
+        for field in ("title", "folder_id"):
+            if field in patch.model_fields_set:
+                values[field] = getattr(patch, field)
+        # The version predicate makes the write itself conditional, so a racing
+        # writer that slipped in after the SELECT cannot be overwritten.
+        stmt = (
+            update(models.Note)
+            .where(*note_filter, models.Note.version == base_version)
+            .values(**values)
+            .returning(models.Note.version, models.Note.last_modified_date)
+            .execution_options(synchronize_session=False)
+        )
+        updated = (await session.execute(stmt)).first()
+        if updated is None:
+            return "conflict", None
+        return "ok", {"note_id": note_id, "version": updated.version, "last_modified_date": updated.last_modified_date}
+
+    try:
+        outcome, result = await run_write(db, _patch)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc))
+    if outcome == "missing":
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Note not found.")
+    if outcome == "conflict":
+        headers = {"ETag": make_etag(result)} if result is not None else None
+        raise HTTPException(status_code=conflict_status, detail="Note has been modified.", headers=headers)
+    response.headers["ETag"] = make_etag(result["version"])
+    await feed.publish(current_user.id, "note", "updated", note_id, {
+        "version": result["version"],
+        "last_modified_date": result["last_modified_date"],
+        **{field: getattr(patch, field) for field in ("title", "folder_id") if field in patch.model_fields_set},
+    })
+    return result
+
 @router.delete("/{note_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_note(note_id: int, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_active_user)):
+async def delete_note(note_id: int, db: AsyncSession = Depends(get_async_db), current_user: schemas.CurrentUser = Depends(get_current_active_user), feed: Broker = Depends(get_change_feed)):
     """
     Deletes a specific note for the currently authenticated user.
     """
-    note_to_delete = db.query(models.Note).filter(models.Note.note_id == note_id, models.Note.user_id == current_user.id).first()
-    if not note_to_delete:
+    async def _delete(session):
+        result = await session.execute(delete(models.Note).where(models.Note.note_id == note_id, models.Note.user_id == current_user.id))
+        return result.rowcount
+
+    if not await run_write(db, _delete):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Note not found.")
-        
-    db.delete(note_to_delete)
-    db.commit()
+    await feed.publish(current_user.id, "note", "deleted", note_id)
     return
\ No newline at end of file
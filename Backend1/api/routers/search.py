@@ -0,0 +1,35 @@
+# FILE: src/Backend1/api/routers/search.py
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+
+from Backend1 import schemas
+from Backend1 import search as search_index
+from Backend1.database import get_async_read_db
+from Backend1.security import get_current_active_user
+
+router = APIRouter(
+    prefix="/search",
+    tags=["Search"]
+)
+
+@router.get("/", response_model=List[schemas.SearchHit])
+async def search_content(
+    q: str = Query(..., min_length=1, max_length=200),
+    types: str = Query("note,flashcard", description="Comma-separated: note, flashcard"),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: schemas.CurrentUser = Depends(get_current_active_user),
+):
+    """
+    Full-text search over the user's notes and flashcards. Supports prefix
+    terms (`gram*`; the last term is always a prefix), ranks hits with BM25 and
+    wraps matches in <mark> tags inside `title` and `snippet`. The matched text
+    is returned as stored, so clients must escape it before rendering as HTML.
+    """
+    requested = [t.strip() for t in types.split(",") if t.strip()]
+    unknown = [t for t in requested if t not in search_index.SEARCHABLE_TYPES]
+    if unknown or not requested:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown type(s): {', '.join(unknown) or types}.")
+    return await search_index.search(db, current_user.id, q, requested, limit)
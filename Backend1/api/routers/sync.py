@@ -0,0 +1,56 @@
+# FILE: src/Backend1/api/routers/sync.py
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from Backend1 import schemas
+from Backend1.changefeed import Broker, get_change_feed
+from Backend1.database import get_async_db, get_async_read_db, run_write
+from Backend1.security import get_current_active_user
+from Backend1.sync import CHANGE_OPS, MAX_SYNC_PAGE_SIZE, SYNC_PAGE_SIZE, WriteBatch, current_seq, fetch_delta
+
+router = APIRouter(
+    prefix="/sync",
+    tags=["Sync"]
+)
+
+
+@router.get("", response_model=schemas.SyncDelta)
+async def pull_changes(
+    since: int = Query(0, ge=0, description="The `seq` returned by the previous pull; 0 for a full download."),
+    limit: int = Query(SYNC_PAGE_SIZE, ge=1, le=MAX_SYNC_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: schemas.CurrentUser = Depends(get_current_active_user),
+):
+    """
+    Returns the notes, folders, stacks and flashcards changed since `since`,
+    and tombstones for the deleted ones, instead of re-downloading every
+    collection on reconnect.
+    """
+    return await fetch_delta(db, str(current_user.id), since, limit)
+
+
+@router.post("", response_model=schemas.SyncPushResult)
+async def push_changes(
+    push: schemas.SyncPush,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.CurrentUser = Depends(get_current_active_user),
+    feed: Broker = Depends(get_change_feed),
+):
+    """
+    Applies writes queued while offline, in order and in one transaction.
+    A note write whose `base_version` is stale is not applied; its result is
+    a "conflict" carrying the server's copy. Writes retried with an op_id that
+    was already applied return their original result.
+    """
+    user_id = str(current_user.id)
+
+    async def job(session: AsyncSession):
+        batch = WriteBatch(session, user_id)
+        results = await batch.apply(push.writes)
+        return batch, results, await current_seq(session, user_id)
+
+    batch, results, seq = await run_write(db, job)
+    for write, result in batch.applied:
+        await feed.publish(user_id, write.entity, CHANGE_OPS[write.action], result["entity_id"])
+    return {"seq": seq, "results": results}
@@ -1,13 +1,21 @@
 # FILE: src/Backend1/api/routers/translation.py
 
-from fastapi import APIRouter, Depends, Body
-from sqlalchemy.orm import Session
+import asyncio
+import os
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, Body, HTTPException, Query, Request, status
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 
 # Import models, schemas, and dependencies from their centralized locations
 from Backend1 import models
 from Backend1 import schemas
-from Backend1.database import get_db
+from Backend1.ingest import IngestBusyError, IngestPipeline, get_ingest, ingest_busy_exception
+from Backend1.ndjson import NDJSON_MEDIA_TYPE, NDJSON_MEDIA_TYPES, content_type, encode_line, iter_json_lines
 from Backend1.security import get_current_active_user
+from Backend1.translation import TranslationEngine, get_translator
 
 router = APIRouter(
     prefix="/translation",
@@ -15,37 +23,157 @@ router = APIRouter(
 )
 
 @router.post("/translate")
-def handle_translation_request(translate_request: schemas.TranslateRequest, current_user: models.User = Depends(get_current_active_user)):
+async def handle_translation_request(
+    translate_request: schemas.TranslateRequest,
+    current_user: schemas.CurrentUser = Depends(get_current_active_user),
+    translator: TranslationEngine = Depends(get_translator),
+):
     """
-    Accepts text and returns a mock translation for the authenticated user.
+    Translates text for the authenticated user. Repeated phrases are served from
+    cache, and concurrent requests are coalesced into batched backend calls.
     """
     original_text = translate_request.text
-    translated_text = f"[MOCK Translated: {original_text}]"
-    
-    # In a real application, you would call an external translation service here.
-    
+    translated_text = await translator.translate(original_text, translate_request.source_lang, translate_request.target_lang)
+
     return {"original_text": original_text, "translated_text": translated_text}
 
-@router.post("/logs", response_model=schemas.TranslationLogResponse)
-def create_translation_log(log_data: schemas.TranslationLogCreate, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_active_user)):
-    """
-    Logs a translation event to the database for the currently authenticated user.
-    
-    Note: This requires a `TranslationLog` table in `models.py` and corresponding
-    schemas in `schemas.py`.
-    """
-    # This assumes a `TranslationLog` model exists in `models.py`
-    db_log = models.TranslationLog(
-        user_id=current_user.id,
-        original_text=log_data.originalText,
-        translated_text=log_data.translatedText,
-        source_language=log_data.sourceLanguage,
-        target_language=log_data.targetLanguage,
-        source_url=log_data.sourceUrl,
-        timestamp=log_data.timestamp
+# --- Batch Translation ---
+
+# Upper bound on segments per batch request (a long subtitle track is a few thousand cues).
+TRANSLATION_BATCH_MAX_SEGMENTS = int(os.getenv("TRANSLATION_BATCH_MAX_SEGMENTS", "10000"))
+
+# (index in the request, client id, text)
+Segment = Tuple[int, Optional[object], str]
+
+
+def _too_many_segments():
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"At most {TRANSLATION_BATCH_MAX_SEGMENTS} segments per request.",
     )
-    db.add(db_log)
-    db.commit()
-    db.refresh(db_log)
-    
-    return {"success": True, "message": "Log created successfully", "logId": db_log.log_id}
\ No newline at end of file
+
+
+class _BatchTranslation:
+    """
+    Starts one translation per distinct text as segments are added, so work
+    begins while an NDJSON body is still arriving, then yields result lines in
+    completion order.
+    """
+
+    def __init__(self, translator: TranslationEngine, source_lang: str, target_lang: str):
+        self.translator = translator
+        self.source_lang = source_lang
+        self.target_lang = target_lang
+        self.segments: Dict[str, List[Segment]] = {}
+        self.tasks: Dict[asyncio.Task, str] = {}
+
+    def add(self, index: int, segment_id, text: str):
+        if index >= TRANSLATION_BATCH_MAX_SEGMENTS:
+            raise _too_many_segments()
+        if text not in self.segments:
+            self.segments[text] = []
+            task = asyncio.ensure_future(self.translator.translate(text, self.source_lang, self.target_lang))
+            self.tasks[task] = text
+        self.segments[text].append((index, segment_id, text))
+
+    def cancel(self):
+        for task in self.tasks:
+            task.cancel()
+
+    async def results(self) -> AsyncIterator[bytes]:
+        pending = set(self.tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    error = task.exception()
+                    for index, segment_id, _ in self.segments[self.tasks[task]]:
+                        line = {"index": index, "id": segment_id}
+                        if error is None:
+                            line["translated_text"] = task.result()
+                        else:
+                            line["error"] = "Translation failed."
+                        yield encode_line(line)
+        finally:
+            # Client went away: stop waiting on translations nobody will read.
+            self.cancel()
+
+
+def _segment_fields(segment) -> Tuple[Optional[object], str]:
+    if isinstance(segment, str):
+        return None, segment
+    return segment.id, segment.text
+
+
+@router.post("/translate/batch")
+async def translate_batch(
+    request: Request,
+    source_lang: str = Query("auto", description="Source language for NDJSON bodies."),
+    target_lang: str = Query("en", description="Target language for NDJSON bodies."),
+    current_user: schemas.CurrentUser = Depends(get_current_active_user),
+    translator: TranslationEngine = Depends(get_translator),
+):
+    """
+    Translates many segments (a page, a subtitle track) in one call.
+
+    Send either a JSON `BatchTranslateRequest`, or an NDJSON body
+    (application/x-ndjson) with one `{"id": ..., "text": ...}` object or bare
+    string per line and the languages as query parameters. Identical segments
+    are translated once. Results stream back as NDJSON in completion order:
+    `{"index": <position in the request>, "id": ..., "translated_text": ...}`,
+    or `"error"` instead of `translated_text` if that segment failed.
+    """
+    body_type = content_type(request)
+    if body_type in NDJSON_MEDIA_TYPES:
+        batch = _BatchTranslation(translator, source_lang, target_lang)
+        index = 0
+        try:
+            async for line_number, item in iter_json_lines(request):
+                segment_id, text = (item.get("id"), item.get("text")) if isinstance(item, dict) else (None, item)
+                if not isinstance(text, str):
+                    raise ValueError(f"Line {line_number} has no 'text' string.")
+                batch.add(index, segment_id, text)
+                index += 1
+        except (ValueError, UnicodeDecodeError) as exc:
+            batch.cancel()
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+        except BaseException:
+            batch.cancel()
+            raise
+    elif body_type in ("application/json", ""):
+        try:
+            payload = schemas.BatchTranslateRequest.model_validate_json(await request.body())
+        except ValidationError as exc:
+            raise RequestValidationError(exc.errors(include_url=False))
+        if len(payload.segments) > TRANSLATION_BATCH_MAX_SEGMENTS:
+            raise _too_many_segments()
+        batch = _BatchTranslation(translator, payload.source_lang, payload.target_lang)
+        for index, segment in enumerate(payload.segments):
+            batch.add(index, *_segment_fields(segment))
+    else:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail="Send application/json or application/x-ndjson.")
+
+    # The body is fully read before streaming starts; translations are already running.
+    return StreamingResponse(batch.results(), media_type=NDJSON_MEDIA_TYPE)
+
+@router.post("/logs", response_model=schemas.TranslationLogResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_translation_log(log_data: schemas.TranslationLogCreate, current_user: schemas.CurrentUser = Depends(get_current_active_user), ingest: IngestPipeline = Depends(get_ingest)):
+    """
+    Logs a translation event for the currently authenticated user. The event is
+    journaled and queued; the background writer inserts it in a batch shortly after.
+    """
+    row = {
+        "user_id": current_user.id,
+        "original_text": log_data.originalText,
+        "translated_text": log_data.translatedText,
+        "source_language": log_data.sourceLanguage,
+        "target_language": log_data.targetLanguage,
+        "source_url": log_data.sourceUrl,
+        "timestamp": log_data.timestamp,
+    }
+    try:
+        await ingest.submit(models.TranslationLog.__tablename__, [row])
+    except IngestBusyError:
+        raise ingest_busy_exception()
+
+    return {"success": True, "message": "Log queued."}
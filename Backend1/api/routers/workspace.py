@@ -0,0 +1,130 @@
+# FILE: src/Backend1/api/routers/workspace.py
+
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only, selectinload
+
+from Backend1 import models
+from Backend1 import schemas
+from Backend1.database import get_async_read_db
+from Backend1.security import get_current_active_user
+
+router = APIRouter(
+    prefix="/workspace",
+    tags=["Workspace"]
+)
+
+# Columns read for note and card summaries; note content is never loaded here.
+NOTE_SUMMARY_COLUMNS = [
+    models.Note.note_id, models.Note.title, models.Note.folder_id,
+    models.Note.last_modified_date, models.Note.version,
+]
+CARD_SUMMARY_COLUMNS = [
+    models.Flashcard.flashcard_id, models.Flashcard.stack_id, models.Flashcard.front_text,
+    models.Flashcard.back_text, models.Flashcard.due_at,
+]
+RECENT_ITEM_COLUMNS = [
+    models.CollectedItem.item_id, models.CollectedItem.selected_text, models.CollectedItem.source_url,
+    models.CollectedItem.page_title, models.CollectedItem.timestamp_collected,
+]
+MAX_RECENT = 50
+
+
+@router.get("", response_model=schemas.WorkspaceSnapshot)
+async def get_workspace(
+    recent: int = Query(10, ge=0, le=MAX_RECENT, description="Number of recent notes and collected items."),
+    include_cards: bool = Query(False, description="Also return every stack's cards."),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: schemas.CurrentUser = Depends(get_current_active_user),
+):
+    """
+    Everything the app needs on a cold load, in one round trip: folders with
+    their note summaries, notes outside any folder, stacks with card and due
+    counts (and optionally their cards), and the most recent notes and
+    collected items. Built from a fixed handful of set-based queries however
+    many folders and stacks the user has, instead of one request per folder
+    and per stack.
+    """
+    user_id = current_user.id
+    now = datetime.now(timezone.utc)
+
+    # Folders, then all their notes in one SELECT ... WHERE folder_id IN (...).
+    folders = (await db.scalars(
+        select(models.Folder)
+        .where(models.Folder.user_id == user_id)
+        .options(selectinload(models.Folder.notes).load_only(*NOTE_SUMMARY_COLUMNS))
+        .order_by(models.Folder.folder_name, models.Folder.folder_id)
+    )).all()
+
+    unfiled_notes = (await db.scalars(
+        select(models.Note)
+        .options(load_only(*NOTE_SUMMARY_COLUMNS))
+        .where(models.Note.user_id == user_id, models.Note.folder_id.is_(None))
+        .order_by(models.Note.last_modified_date.desc(), models.Note.note_id.desc())
+    )).all()
+
+    stack_query = (
+        select(models.Stack)
+        .where(models.Stack.user_id == user_id)
+        .order_by(models.Stack.creation_date, models.Stack.stack_id)
+    )
+    if include_cards:
+        stack_query = stack_query.options(selectinload(models.Stack.flashcards).load_only(*CARD_SUMMARY_COLUMNS))
+    stacks = (await db.scalars(stack_query)).all()
+
+    # Card and due counts for every stack in one grouped scan of the stack_id index.
+    counts = {
+        row.stack_id: (row.card_count, row.due_count or 0)
+        for row in await db.execute(
+            select(
+                models.Flashcard.stack_id,
+                func.count().label("card_count"),
+                func.sum(case((models.Flashcard.due_at <= now, 1), else_=0)).label("due_count"),
+            )
+            .where(models.Flashcard.stack_id.in_([stack.stack_id for stack in stacks]))
+            .group_by(models.Flashcard.stack_id)
+        )
+    } if stacks else {}
+
+    recent_notes, recent_items = [], []
+    if recent:
+        recent_notes = (await db.scalars(
+            select(models.Note)
+            .options(load_only(*NOTE_SUMMARY_COLUMNS))
+            .where(models.Note.user_id == user_id)
+            .order_by(models.Note.last_modified_date.desc(), models.Note.note_id.desc())
+            .limit(recent)
+        )).all()
+        recent_items = (await db.scalars(
+            select(models.CollectedItem)
+            .options(load_only(*RECENT_ITEM_COLUMNS))
+            .where(models.CollectedItem.user_id == user_id)
+            .order_by(models.CollectedItem.item_id.desc())
+            .limit(recent)
+        )).all()
+
+    workspace_folders = []
+    for folder in folders:
+        item = schemas.WorkspaceFolder.model_validate(folder)
+        item.notes.sort(key=lambda note: (note.last_modified_date, note.note_id), reverse=True)
+        workspace_folders.append(item)
+
+    workspace_stacks = []
+    for stack in stacks:
+        item = schemas.WorkspaceStack.model_validate(stack)
+        item.card_count, item.due_count = counts.get(stack.stack_id, (0, 0))
+        if include_cards:
+            item.cards = [schemas.CardSummary.model_validate(card) for card in stack.flashcards]
+        workspace_stacks.append(item)
+
+    return schemas.WorkspaceSnapshot(
+        folders=workspace_folders,
+        unfiled_notes=unfiled_notes,
+        stacks=workspace_stacks,
+        recent_notes=recent_notes,
+        recent_items=recent_items,
+        generated_at=now,
+    )
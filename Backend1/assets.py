@@ -0,0 +1,189 @@
+# FILE: Backend1/assets.py
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import posixpath
+import re
+import shutil
+import sys
+from typing import Dict, Optional
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from .compression import accepts, brotli
+
+# --- Asset Build ---
+# `python -m Backend1.assets` copies every static file to a content-hashed name
+# (css/main_style.css -> css/main_style.3f2a9c1d04be.css) under ASSET_BUILD_DIR,
+# writes .br/.gz variants next to the compressible ones and records the mapping
+# in manifest.json. Templates link assets through asset_url(), so a deploy that
+# changes a file changes its URL and the old one can be cached forever.
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+STATIC_DIR = os.path.join(ROOT_DIR, "Frontend1", "static")
+ASSET_BUILD_DIR = os.getenv("ASSET_BUILD_DIR", os.path.join(ROOT_DIR, "Frontend1", "build"))
+MANIFEST_NAME = "manifest.json"
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Unhashed paths may change in place, so clients revalidate them (ETag / Last-Modified).
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+COMPRESSIBLE_SUFFIXES = {".css", ".js", ".mjs", ".map", ".json", ".svg", ".html", ".txt"}
+PRECOMPRESS_MIN_BYTES = 256
+# Precompressed variants, in order of preference.
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+# Relative ES module specifiers: import x from './a.js', import './b.js', import('./c.js').
+_IMPORT_RE = re.compile(r"""(\bfrom\s*|\bimport\s*\(?\s*)(['"])(\.\.?/[^'"]+)\2""")
+
+
+def _hashed_name(path: str, content: bytes) -> str:
+    stem, ext = posixpath.splitext(path)
+    return f"{stem}.{hashlib.sha256(content).hexdigest()[:12]}{ext}"
+
+
+class _Builder:
+    def __init__(self, source_dir: str, build_dir: str):
+        self.source_dir = source_dir
+        self.build_dir = build_dir
+        self.sources = {}
+        for directory, dirs, files in os.walk(source_dir):
+            dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+            for name in sorted(files):
+                if not name.startswith("."):
+                    full = os.path.join(directory, name)
+                    self.sources[os.path.relpath(full, source_dir).replace(os.sep, "/")] = full
+        self.manifest: Dict[str, str] = {}
+        self._visiting = set()
+
+    def build(self) -> Dict[str, str]:
+        for path in self.sources:
+            self.hash(path)
+        return self.manifest
+
+    def hash(self, path: str) -> str:
+        if path in self.manifest:
+            return self.manifest[path]
+        with open(self.sources[path], "rb") as file:
+            content = file.read()
+        if path.endswith((".js", ".mjs")):
+            # A module imported under two URLs runs twice, so imports must point at
+            # the hashed files too; hash dependencies first.
+            self._visiting.add(path)
+            content = _IMPORT_RE.sub(lambda m: self._rewrite_import(path, m), content.decode("utf-8")).encode("utf-8")
+            self._visiting.discard(path)
+        hashed = _hashed_name(path, content)
+        self._write(hashed, content)
+        self.manifest[path] = hashed
+        return hashed
+
+    def _rewrite_import(self, importer: str, match: re.Match) -> str:
+        prefix, quote, specifier = match.groups()
+        directory = posixpath.dirname(importer)
+        target = posixpath.normpath(posixpath.join(directory, specifier))
+        if target not in self.sources or target in self._visiting:
+            return match.group(0)  # unknown file or import cycle: keep the plain URL
+        relative = posixpath.relpath(self.hash(target), directory or ".")
+        if not relative.startswith("."):
+            relative = "./" + relative
+        return f"{prefix}{quote}{relative}{quote}"
+
+    def _write(self, path: str, content: bytes):
+        target = os.path.join(self.build_dir, *path.split("/"))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "wb") as file:
+            file.write(content)
+        if posixpath.splitext(path)[1] in COMPRESSIBLE_SUFFIXES and len(content) >= PRECOMPRESS_MIN_BYTES:
+            with open(target + ".gz", "wb") as file:
+                file.write(gzip.compress(content, compresslevel=9, mtime=0))
+            if brotli is not None:
+                with open(target + ".br", "wb") as file:
+                    file.write(brotli.compress(content, quality=11))
+
+
+def build_assets(source_dir: str = STATIC_DIR, build_dir: str = ASSET_BUILD_DIR) -> Dict[str, str]:
+    """
+    Rebuilds `build_dir` from `source_dir` and returns the manifest
+    (source path -> hashed path, both relative and using "/").
+    """
+    shutil.rmtree(build_dir, ignore_errors=True)
+    manifest = _Builder(source_dir, build_dir).build()
+    with open(os.path.join(build_dir, MANIFEST_NAME), "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+    return manifest
+
+
+def load_manifest(build_dir: str = ASSET_BUILD_DIR) -> Dict[str, str]:
+    try:
+        with open(os.path.join(build_dir, MANIFEST_NAME), encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+
+
+# --- Serving ---
+
+class AssetFiles(StaticFiles):
+    """
+    StaticFiles for the source directory plus the asset build, if there is one.
+    Hashed files are served with an immutable Cache-Control and, when the
+    client accepts it, from their precompressed variant. Without a build every
+    asset is served from the source directory as before.
+    """
+
+    def __init__(self, directory: str, build_directory: str = ASSET_BUILD_DIR, url_prefix: str = "/static", **kwargs):
+        super().__init__(directory=directory, **kwargs)
+        self.url_prefix = url_prefix
+        self.manifest = load_manifest(build_directory)
+        self.hashed = set(self.manifest.values())
+        if self.manifest:
+            self.all_directories = [build_directory, *self.all_directories]
+
+    def url(self, path: str) -> str:
+        """
+        The URL to link `path` (relative to the source directory) with.
+        """
+        return f"{self.url_prefix}/{self.manifest.get(path, path)}"
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        path = self.get_path(scope).replace(os.sep, "/")
+        if path not in self.hashed:
+            response = super().file_response(full_path, stat_result, scope, status_code)
+            response.headers["Cache-Control"] = REVALIDATE_CACHE_CONTROL
+            return response
+
+        response = self._precompressed(str(full_path), scope, status_code)
+        if response is None:
+            response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
+
+    @staticmethod
+    def _precompressed(full_path: str, scope: Scope, status_code: int) -> Optional[Response]:
+        for encoding, suffix in ENCODINGS:
+            variant = full_path + suffix
+            if accepts(scope, encoding) and os.path.isfile(variant):
+                response = FileResponse(
+                    variant,
+                    status_code=status_code,
+                    stat_result=os.stat(variant),
+                    media_type=mimetypes.guess_type(full_path)[0],
+                )
+                response.headers["Content-Encoding"] = encoding
+                response.headers["Vary"] = "Accept-Encoding"
+                return response
+        return None
+
+
+if __name__ == "__main__":
+    # python -m Backend1.assets [source_dir] [build_dir]
+    built = build_assets(*sys.argv[1:3])
+    print(f"Built {len(built)} assets into {sys.argv[2] if len(sys.argv) > 2 else ASSET_BUILD_DIR}.")
@@ -0,0 +1,112 @@
+# FILE: Backend1/batch.py
+"""
+Generic write batches (POST /batch): typed note, folder and stack operations
+applied in order on one session, so a bulk move or delete costs one request,
+one auth check and one commit instead of one of each per row. Note and folder
+operations run through the offline-sync WriteBatch (sync.py), so both APIs
+enforce the same ownership, version and reference rules.
+"""
+
+from typing import List
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models
+from . import schemas
+from .sync import CHANGE_OPS, WriteBatch
+
+# sync.WriteBatch result status -> HTTP status and detail of the operation
+_STATUS_CODES = {"missing": 404, "conflict": 409, "invalid": 422}
+_DETAILS = {"missing": "Not found.", "conflict": "Modified since base_version."}
+_APPLIED_CODES = {"create": 201, "update": 200, "delete": 204}
+# Reported for the operations an atomic batch did not get to.
+NOT_ATTEMPTED = 424
+
+
+class BatchAborted(Exception):
+    """Raised inside the write job to roll an atomic batch back."""
+
+    def __init__(self, results: List[dict]):
+        super().__init__("Batch rolled back.")
+        self.results = results
+
+
+def _sync_write(index: int, operation) -> schemas.SyncWrite:
+    entity, action = operation.op.split(".")
+    data = getattr(operation, "data", None)
+    return schemas.SyncWrite(
+        op_id=getattr(operation, "ref", None) or f"#{index}",
+        entity=entity,
+        action=action,
+        entity_id=getattr(operation, "note_id", None),
+        base_version=getattr(operation, "base_version", None),
+        data=schemas.SyncWriteData(**data.model_dump(exclude_unset=True)) if data is not None else schemas.SyncWriteData(),
+    )
+
+
+async def _add_item(session: AsyncSession, user_id: str, operation: schemas.StackAddItemOperation) -> dict:
+    stack = await session.scalar(
+        select(models.Stack.stack_id).where(models.Stack.stack_id == operation.stack_id, models.Stack.user_id == user_id)
+    )
+    if stack is None:
+        return {"status": 404, "detail": "Stack not found."}
+    item = operation.data
+    await session.execute(insert(models.CollectedItem).values(
+        user_id=user_id, selected_text=item.text, source_url=item.source_url, page_title=item.page_title,
+    ))
+    flashcard_id = (await session.execute(
+        insert(models.Flashcard).values(user_id=user_id, stack_id=operation.stack_id, front_text=item.text)
+        .returning(models.Flashcard.flashcard_id)
+    )).scalar_one()
+    return {"status": 201, "id": flashcard_id}
+
+
+async def run_batch(session: AsyncSession, user_id: str, request: schemas.BatchRequest) -> List[dict]:
+    """
+    Applies the operations in order and returns one result per operation.
+    Every failure is detected before the failing operation writes anything,
+    so with `atomic=False` the others can still be committed. With
+    `atomic=True` the first failure raises BatchAborted.
+    """
+    writes = WriteBatch(session, user_id)
+    results = []
+    for index, operation in enumerate(request.operations):
+        if operation.op == "stack.add_item":
+            result = await _add_item(session, user_id, operation)
+        else:
+            write = _sync_write(index, operation)
+            outcome = await writes.apply_one(write)
+            if outcome["status"] == "applied":
+                writes.known[write.op_id] = outcome  # resolvable as a ref by later operations
+                status = _APPLIED_CODES[write.action]
+            else:
+                status = _STATUS_CODES[outcome["status"]]
+            result = {
+                "status": status,
+                "id": outcome["entity_id"],
+                "version": outcome.get("version"),
+                "detail": outcome.get("detail") or _DETAILS.get(outcome["status"]),
+            }
+        results.append({"index": index, **result})
+        if request.atomic and result["status"] >= 400:
+            results += [
+                {"index": skipped, "status": NOT_ATTEMPTED, "detail": "Not attempted; the batch was rolled back."}
+                for skipped in range(index + 1, len(request.operations))
+            ]
+            raise BatchAborted(results)
+    return results
+
+
+def change_events(request: schemas.BatchRequest, results: List[dict]) -> List[tuple]:
+    """(entity, op, entity_id) change-feed events for the applied operations."""
+    events = []
+    for operation, result in zip(request.operations, results):
+        if result["status"] >= 400:
+            continue
+        if operation.op == "stack.add_item":
+            events.append(("flashcard", "created", result["id"]))
+        else:
+            entity, action = operation.op.split(".")
+            events.append((entity, CHANGE_OPS[action], result["id"]))
+    return events
@@ -0,0 +1,75 @@
+# FILE: Backend1/cache.py
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    A small thread-safe LRU cache where every entry carries its own expiry.
+    Used for in-process caching of hot lookups (auth, translations, etc.).
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None, clock: Callable[[], float] = time.time):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= self._clock():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, expires_at: Optional[float] = None) -> None:
+        """
+        Stores a value. `expires_at` is an absolute timestamp; when omitted the
+        cache-wide `ttl` is used. The earlier of the two always wins.
+        """
+        if self.ttl is not None:
+            default_expiry = self._clock() + self.ttl
+            expires_at = default_expiry if expires_at is None else min(expires_at, default_expiry)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+        return default if entry is _MISSING else entry[0]
+
+    def discard_where(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        """
+        Removes every entry for which predicate(key, value) is true.
+        Returns the number of removed entries.
+        """
+        with self._lock:
+            doomed = [k for k, (v, _) in self._data.items() if predicate(k, v)]
+            for k in doomed:
+                del self._data[k]
+        return len(doomed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
@@ -0,0 +1,386 @@
+# FILE: Backend1/changefeed.py
+"""
+Per-user change feed. Write paths publish an event after their transaction
+commits; /changes streams a user's events over SSE or WebSocket, so clients
+apply incremental changes instead of polling the listing endpoints.
+
+An event looks like
+
+    {"id": "3f9c1a2b-42", "entity": "note", "op": "updated", "entity_id": 7,
+     "data": {"title": "...", "version": 3, ...}, "at": "2026-01-01T12:00:00+00:00"}
+
+`id` is an opaque cursor: a client that reconnects with it (Last-Event-ID or
+?after=) first receives the events it missed. When those are no longer
+available (the cursor is too old, from another broker, or the client fell too
+far behind) it receives a single {"op": "reset"} event instead and should
+reload its state (e.g. GET /workspace), then carry on from the reset's id.
+"""
+
+import asyncio
+import importlib
+from abc import ABC, abstractmethod
+import logging
+import os
+import sqlite3
+import threading
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+import orjson
+
+from .database import BASE_DIR
+
+logger = logging.getLogger(__name__)
+
+# "module:ClassName" of the Broker to use.
+CHANGEFEED_BROKER = os.getenv("CHANGEFEED_BROKER", "Backend1.changefeed:InMemoryBroker")
+# Recent events kept per user so reconnecting clients can resume (in-memory broker).
+CHANGEFEED_BUFFER_SIZE = int(os.getenv("CHANGEFEED_BUFFER_SIZE", "500"))
+# Undelivered events a subscriber may hold before its backlog is replaced by a reset.
+CHANGEFEED_QUEUE_SIZE = int(os.getenv("CHANGEFEED_QUEUE_SIZE", "256"))
+# Idle time after which an SSE stream sends a comment to keep proxies from closing it.
+CHANGEFEED_KEEPALIVE_SECONDS = float(os.getenv("CHANGEFEED_KEEPALIVE_SECONDS", "15"))
+# Shared event table for the SQLite broker, and how often each worker polls it.
+CHANGEFEED_SQLITE_PATH = os.getenv("CHANGEFEED_SQLITE_PATH", os.path.join(BASE_DIR, "changefeed.db"))
+CHANGEFEED_POLL_INTERVAL_MS = float(os.getenv("CHANGEFEED_POLL_INTERVAL_MS", "100"))
+# Rows the SQLite broker keeps in its table (across all users).
+CHANGEFEED_RETENTION = int(os.getenv("CHANGEFEED_RETENTION", "50000"))
+
+RESET = "reset"
+
+
+def make_event(entity: str, op: str, entity_id: Any, data: Optional[dict] = None) -> dict:
+    return {
+        "entity": entity,
+        "op": op,
+        "entity_id": entity_id,
+        "data": data,
+        "at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def encode_event(event: dict) -> bytes:
+    return orjson.dumps(event)
+
+
+def format_sse(event: dict) -> bytes:
+    """One Server-Sent Events message; the cursor doubles as the SSE id."""
+    return b"id: " + event["id"].encode() + b"\ndata: " + encode_event(event) + b"\n\n"
+
+
+# --- Subscriptions ---
+
+class Subscription:
+    """
+    One connected client: the replayed backlog after its cursor, then live
+    events. Events are deduplicated by sequence number, so a live event that
+    also shows up in the backlog is delivered once.
+    """
+
+    def __init__(self, broker: "Broker", user_id: str, maxsize: int):
+        self.broker = broker
+        self.user_id = user_id
+        self.maxsize = maxsize
+        self.last_seq = 0
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self._loop = asyncio.get_running_loop()
+        self._held: Optional[List[Tuple[int, dict]]] = None
+
+    def push(self, seq: int, event: dict):
+        # Publishers on another thread's loop (e.g. a sync worker) hand over safely.
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._push(seq, event)
+        else:
+            try:
+                self._loop.call_soon_threadsafe(self._push, seq, event)
+            except RuntimeError:
+                # The subscriber's event loop is gone; so is the client.
+                self.close()
+
+    def _push(self, seq: int, event: dict):
+        if self._held is not None:
+            self._held.append((seq, event))
+            return
+        if seq <= self.last_seq:
+            return
+        if self.queue.qsize() >= self.maxsize:
+            # Too far behind: drop the backlog and tell the client to reload.
+            self.reset(seq)
+            return
+        self.last_seq = seq
+        self.queue.put_nowait(event)
+
+    def reset(self, seq: int):
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.last_seq = max(self.last_seq, seq)
+        self.queue.put_nowait({"id": self.broker.cursor(self.last_seq), "op": RESET})
+
+    def hold(self):
+        """Buffers live events while the backlog is being loaded."""
+        self._held = []
+
+    def release(self, backlog: List[Tuple[int, dict]] = ()):
+        """Queues the backlog, then the live events held meanwhile."""
+        held, self._held = self._held or [], None
+        for seq, event in [*backlog, *held]:
+            self._push(seq, event)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[dict]:
+        """The next event, or None when nothing arrived within `timeout` seconds."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+# --- Brokers ---
+
+class Broker(ABC):
+    """
+    Assigns sequence numbers to published events and fans them out to this
+    process's subscribers. Subclasses decide where events go between publish
+    and delivery, and how far back a cursor can be resumed.
+    """
+
+    def __init__(self, queue_size: int = CHANGEFEED_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.epoch = uuid.uuid4().hex[:8]
+        self.last_seq = 0
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+
+    @abstractmethod
+    async def publish(self, user_id: Any, entity: str, op: str, entity_id: Any, data: Optional[dict] = None):
+        """Sends an event to `user_id`'s subscribers, in every process."""
+
+    @abstractmethod
+    async def _backlog(self, user_id: str, after: int) -> Optional[List[Tuple[int, dict]]]:
+        """Events for `user_id` after sequence `after`, or None if some are gone."""
+
+    async def close(self):
+        pass
+
+    # Cursors carry the broker's epoch, so a cursor from a restarted in-memory
+    # broker (or a different deployment) is recognised as unusable.
+    def cursor(self, seq: int) -> str:
+        return f"{self.epoch}-{seq}"
+
+    def _parse_cursor(self, cursor: str) -> Optional[int]:
+        epoch, _, seq = cursor.rpartition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        return int(seq)
+
+    async def subscribe(self, user_id: Any, cursor: Optional[str] = None) -> Subscription:
+        """
+        Live events for `user_id`, preceded by those after `cursor` when given.
+        """
+        user_id = str(user_id)
+        subscription = Subscription(self, user_id, self.queue_size)
+        self._subscribers.setdefault(user_id, set()).add(subscription)
+        if not cursor:
+            return subscription
+
+        subscription.hold()
+        backlog = []
+        try:
+            after = self._parse_cursor(cursor)
+            backlog = None if after is None else await self._backlog(user_id, after)
+            if backlog is None:
+                subscription.reset(self.last_seq)
+                backlog = []
+            else:
+                subscription.last_seq = after
+        except BaseException:
+            # Cancelled or failed while reading the backlog: nobody will close it.
+            self.unsubscribe(subscription)
+            raise
+        finally:
+            subscription.release(backlog)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscribers = self._subscribers.get(subscription.user_id)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.user_id]
+
+    def _deliver(self, user_id: str, seq: int, event: dict):
+        self.last_seq = max(self.last_seq, seq)
+        for subscription in list(self._subscribers.get(user_id, ())):
+            subscription.push(seq, event)
+
+
+class InMemoryBroker(Broker):
+    """
+    Single-process broker: delivers on publish and keeps the last
+    `buffer_size` events of every user for resuming.
+    """
+
+    def __init__(self, buffer_size: int = CHANGEFEED_BUFFER_SIZE, queue_size: int = CHANGEFEED_QUEUE_SIZE):
+        super().__init__(queue_size)
+        self.buffer_size = buffer_size
+        self._buffers: Dict[str, Deque[Tuple[int, dict]]] = {}
+        # Highest sequence number that has fallen out of each user's buffer.
+        self._evicted: Dict[str, int] = {}
+
+    async def publish(self, user_id: Any, entity: str, op: str, entity_id: Any, data: Optional[dict] = None):
+        user_id = str(user_id)
+        seq = self.last_seq + 1
+        event = {"id": self.cursor(seq), **make_event(entity, op, entity_id, data)}
+        buffer = self._buffers.setdefault(user_id, deque())
+        buffer.append((seq, event))
+        if len(buffer) > self.buffer_size:
+            self._evicted[user_id] = buffer.popleft()[0]
+        self._deliver(user_id, seq, event)
+
+    async def _backlog(self, user_id: str, after: int) -> Optional[List[Tuple[int, dict]]]:
+        if after > self.last_seq or after < self._evicted.get(user_id, 0):
+            return None
+        return [(seq, event) for seq, event in self._buffers.get(user_id, ()) if seq > after]
+
+
+class SQLiteBroker(Broker):
+    """
+    Stand-in for a real message broker when several workers run on one host.
+    Every worker appends its events to a shared SQLite table and polls it for
+    new rows, which it fans out to its own subscribers; the table's rowid is
+    the sequence number, so cursors are valid on every worker. Delivery lags
+    by up to one poll interval.
+    """
+
+    def __init__(
+        self,
+        path: str = CHANGEFEED_SQLITE_PATH,
+        poll_interval: float = CHANGEFEED_POLL_INTERVAL_MS / 1000,
+        retention: int = CHANGEFEED_RETENTION,
+        queue_size: int = CHANGEFEED_QUEUE_SIZE,
+    ):
+        super().__init__(queue_size)
+        self.path = path
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS change_events (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id TEXT NOT NULL,
+                event BLOB NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS ix_change_events_user_id_seq ON change_events (user_id, seq);
+            CREATE TABLE IF NOT EXISTS change_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+        """)
+        # All workers share the epoch stored with the table.
+        self._conn.execute("INSERT OR IGNORE INTO change_meta VALUES ('epoch', ?)", (self.epoch,))
+        self.epoch = self._conn.execute("SELECT value FROM change_meta WHERE key = 'epoch'").fetchone()[0]
+        self.last_seq = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM change_events").fetchone()[0]
+        self._published = 0
+        self._poller: Optional[asyncio.Task] = None
+
+    def _execute(self, sql: str, parameters=()) -> list:
+        with self._lock:
+            return self._conn.execute(sql, parameters).fetchall()
+
+    def _ensure_polling(self):
+        loop = asyncio.get_running_loop()
+        if self._poller is None or self._poller.done() or self._poller.get_loop() is not loop:
+            self._poller = loop.create_task(self._poll())
+
+    async def publish(self, user_id: Any, entity: str, op: str, entity_id: Any, data: Optional[dict] = None):
+        self._ensure_polling()
+        row = (str(user_id), encode_event(make_event(entity, op, entity_id, data)))
+        try:
+            await asyncio.to_thread(self._execute, "INSERT INTO change_events (user_id, event) VALUES (?, ?)", row)
+            self._published += 1
+            if self._published % 1000 == 0:
+                await asyncio.to_thread(self._prune)
+        except sqlite3.Error:
+            # The write itself has committed; a lost notification only costs a refetch.
+            logger.exception("Could not publish %s %s event", entity, op)
+
+    def _prune(self):
+        with self._lock:
+            cutoff = self._conn.execute("SELECT MAX(seq) FROM change_events").fetchone()[0] - self.retention
+            if cutoff > 0:
+                self._conn.execute("DELETE FROM change_events WHERE seq <= ?", (cutoff,))
+                self._conn.execute(
+                    "INSERT INTO change_meta VALUES ('pruned_through', ?) "
+                    "ON CONFLICT(key) DO UPDATE SET value = MAX(CAST(value AS INTEGER), excluded.value)",
+                    (cutoff,),
+                )
+
+    def _decode(self, seq: int, payload: bytes) -> dict:
+        return {"id": self.cursor(seq), **orjson.loads(payload)}
+
+    async def _poll(self):
+        while True:
+            try:
+                if self._subscribers:
+                    rows = await asyncio.to_thread(
+                        self._execute,
+                        "SELECT seq, user_id, event FROM change_events WHERE seq > ? ORDER BY seq LIMIT 1000",
+                        (self.last_seq,),
+                    )
+                    for seq, user_id, payload in rows:
+                        self._deliver(user_id, seq, self._decode(seq, payload))
+                    if len(rows) == 1000:
+                        continue
+                else:
+                    # Nobody to deliver to; just keep up so new subscribers start live.
+                    rows = await asyncio.to_thread(self._execute, "SELECT COALESCE(MAX(seq), 0) FROM change_events")
+                    self.last_seq = max(self.last_seq, rows[0][0])
+            except sqlite3.Error:
+                logger.exception("Change feed poll failed")
+            await asyncio.sleep(self.poll_interval)
+
+    async def subscribe(self, user_id: Any, cursor: Optional[str] = None) -> Subscription:
+        self._ensure_polling()
+        return await super().subscribe(user_id, cursor)
+
+    async def _backlog(self, user_id: str, after: int) -> Optional[List[Tuple[int, dict]]]:
+        pruned = await asyncio.to_thread(self._execute, "SELECT value FROM change_meta WHERE key = 'pruned_through'")
+        if pruned and after < int(pruned[0][0]):
+            return None
+        rows = await asyncio.to_thread(
+            self._execute,
+            "SELECT seq, event FROM change_events WHERE user_id = ? AND seq > ? ORDER BY seq LIMIT ?",
+            (user_id, after, self.queue_size + 1),
+        )
+        if len(rows) > self.queue_size:
+            return None
+        return [(seq, self._decode(seq, payload)) for seq, payload in rows]
+
+    async def close(self):
+        if self._poller is not None:
+            self._poller.cancel()
+            try:
+                await self._poller
+            except (asyncio.CancelledError, RuntimeError):
+                # RuntimeError: the task belongs to an event loop that has since closed.
+                pass
+            self._poller = None
+
+
+def load_broker(path: str = CHANGEFEED_BROKER) -> Broker:
+    module_name, _, class_name = path.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+change_feed = load_broker()
+
+
+def get_change_feed() -> Broker:
+    return change_feed
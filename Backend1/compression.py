@@ -0,0 +1,65 @@
+# FILE: Backend1/compression.py
+
+import os
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, IdentityResponder
+from starlette.types import Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; without it only gzip is offered.
+    brotli = None
+
+# Responses smaller than this are sent as they are.
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+# On-the-fly levels favour speed; the asset build uses the maximum levels.
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+
+
+def accepts(scope: Scope, encoding: str) -> bool:
+    accept = Headers(scope=scope).get("accept-encoding", "")
+    return any(part.split(";")[0].strip() == encoding for part in accept.split(","))
+
+
+class BrotliResponder(IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app, minimum_size: int, quality: int = BROTLI_QUALITY, **kwargs):
+        super().__init__(app, minimum_size, **kwargs)
+        self.quality = quality
+        self._compressor = None
+
+    async def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        if self._compressor is None:
+            self._compressor = brotli.Compressor(quality=self.quality)
+        if more_body:
+            # Flush every chunk so streamed (NDJSON) responses are not held back.
+            return self._compressor.process(body) + self._compressor.flush()
+        return self._compressor.process(body) + self._compressor.finish()
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Compresses responses of at least `minimum_size` bytes with brotli when the
+    client accepts it (and the brotli package is installed), otherwise gzip.
+    Responses that already carry a Content-Encoding, such as precompressed
+    assets, partial (206) responses and event streams are passed through.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_BYTES, compresslevel: int = GZIP_LEVEL, brotli_quality: int = BROTLI_QUALITY):
+        super().__init__(app, minimum_size=minimum_size, compresslevel=compresslevel)
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and brotli is not None and accepts(scope, "br"):
+            responder = BrotliResponder(
+                self.app,
+                self.minimum_size,
+                quality=self.brotli_quality,
+                exclude_content_types=self.exclude_content_types,
+            )
+            await responder(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
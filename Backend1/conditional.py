@@ -0,0 +1,143 @@
+# FILE: Backend1/conditional.py
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional
+
+from fastapi import Request, Response, status
+from sqlalchemy import DDL, event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models
+from .etags import make_etag, parse_etag_header
+
+# --- Collection Version Triggers ---
+# Each write to a listed table bumps the counter of the listing it belongs to.
+# Living in the database, the counters are shared by every worker process and
+# cover every write path (ORM, bulk inserts, cascades).
+
+_BUMP = """INSERT INTO "CollectionVersions"(scope, version, updated_at) VALUES ({scope}, 1, CURRENT_TIMESTAMP)
+        ON CONFLICT(scope) DO UPDATE SET version = version + 1, updated_at = CURRENT_TIMESTAMP;"""
+
+# table -> expression (in terms of a row alias) naming the listing the row belongs to
+COLLECTION_SCOPES = {
+    "Notes": "'notes:' || {row}.user_id",
+    "Folders": "'folders:' || {row}.user_id",
+    "Stacks": "'stacks:' || {row}.user_id",
+    "Flashcards": "'flashcards:' || coalesce({row}.stack_id, '')",
+}
+
+
+def collection_trigger_ddl(table: str) -> list:
+    scope = COLLECTION_SCOPES[table]
+    name = f"{table.lower()}_collection_version"
+    return [
+        f"""CREATE TRIGGER IF NOT EXISTS {name}_ai AFTER INSERT ON "{table}" BEGIN
+        {_BUMP.format(scope=scope.format(row="new"))}
+    END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {name}_ad AFTER DELETE ON "{table}" BEGIN
+        {_BUMP.format(scope=scope.format(row="old"))}
+    END""",
+        # A row can move between listings (e.g. a card to another stack), so bump both sides.
+        f"""CREATE TRIGGER IF NOT EXISTS {name}_au AFTER UPDATE ON "{table}" BEGIN
+        {_BUMP.format(scope=scope.format(row="old"))}
+        {_BUMP.format(scope=scope.format(row="new"))}
+    END""",
+    ]
+
+
+for _model in (models.Note, models.Folder, models.Stack, models.Flashcard):
+    for _statement in collection_trigger_ddl(_model.__tablename__):
+        event.listen(_model.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+
+# --- Note Version Trigger ---
+# A note's strong ETag is its version, so every change to the row must bump it.
+# Writes that move a note out of a folder without doing so themselves (ON DELETE
+# SET NULL when the folder goes, set-based un-filing) are caught here.
+
+NOTE_VERSION_TRIGGER_DDL = """CREATE TRIGGER IF NOT EXISTS notes_version_folder_au
+    AFTER UPDATE OF folder_id ON "Notes" WHEN new.version = old.version BEGIN
+        UPDATE "Notes" SET version = version + 1, last_modified_date = CURRENT_TIMESTAMP WHERE note_id = new.note_id;
+    END"""
+
+event.listen(models.Note.__table__, "after_create", DDL(NOTE_VERSION_TRIGGER_DDL).execute_if(dialect="sqlite"))
+
+
+# --- Validators ---
+
+class Validators:
+    def __init__(self, etag: str, last_modified: Optional[datetime] = None):
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @property
+    def _last_modified_is_final(self) -> bool:
+        """
+        HTTP dates have one-second resolution. A Last-Modified in the current
+        second could be followed by another write in that same second, so it
+        is only trusted once that second is over (RFC 9110, 8.8.2.2).
+        """
+        if self.last_modified is None:
+            return False
+        return self.last_modified.replace(microsecond=0) < datetime.now(timezone.utc).replace(microsecond=0)
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        # private + no-cache: browsers may keep the body but must revalidate,
+        # and shared caches must not serve one user's data to another.
+        headers = {"ETag": self.etag, "Cache-Control": "private, no-cache"}
+        if self._last_modified_is_final:
+            headers["Last-Modified"] = format_datetime(self.last_modified, usegmt=True)
+        return headers
+
+    def matches(self, request: Request) -> bool:
+        """
+        True when the client's cached copy is current. If-None-Match is
+        decided on the ETag alone; If-Modified-Since is only consulted without
+        it, and never for a resource modified during the current second.
+        """
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = parse_etag_header(if_none_match)
+            return "*" in tags or parse_etag_header(self.etag)[0] in tags
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since and self._last_modified_is_final:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            return self.last_modified.replace(microsecond=0) <= since
+        return False
+
+    def not_modified(self) -> Response:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=self.headers)
+
+    def apply(self, response: Response):
+        response.headers.update(self.headers)
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None:
+        return None
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+async def collection_validators(db: AsyncSession, scope: str, request: Request) -> Validators:
+    """
+    Builds the validators for a listing from its counter row (a primary-key
+    lookup), without touching the listed table. The query string is folded in
+    so each page / projection gets its own ETag.
+    """
+    row = (await db.execute(
+        select(models.CollectionVersion.version, models.CollectionVersion.updated_at)
+        .where(models.CollectionVersion.scope == scope)
+    )).first()
+    version, updated_at = (row.version, row.updated_at) if row else (0, None)
+    variant = hashlib.sha1(f"{scope}?{request.url.query}".encode()).hexdigest()[:16]
+    return Validators(make_etag(f"{version}-{variant}", weak=True), _as_utc(updated_at))
+
+
+def note_validators(version: int, last_modified: Optional[datetime]) -> Validators:
+    # Strong ETag equal to the note version, so it can be sent back as If-Match on PATCH.
+    return Validators(make_etag(version), _as_utc(last_modified))
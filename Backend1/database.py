@@ -1,19 +1,113 @@
 # FILE: Backend1/database.py
 
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import sessionmaker
 
+from .metrics import instrument_engine
+from .write_queue import GroupCommitWriter
+
 # Get the absolute path to the database file from main.py's location
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DATABASE_URL = "sqlite:///" + os.path.join(BASE_DIR, "1project_mvp.db")
+DATABASE_PATH = os.path.join(BASE_DIR, "1project_mvp.db")
+DATABASE_URL = "sqlite:///" + DATABASE_PATH
+ASYNC_DATABASE_URL = "sqlite+aiosqlite:///" + DATABASE_PATH
+
+# Connection pool limits for the async engine used by the API routers.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "40"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", "20"))
+
+# --- SQLite Profiles ---
+# "default" keeps SQLite's stock settings. "production" switches to WAL with
+# tuned pragmas, a separate read-only connection pool and a single group-commit
+# writer for the hot write paths.
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "default")
+SQLITE_PRODUCTION_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 268435456,  # 256 MiB
+    "cache_size": -65536,  # negative means KiB, so 64 MiB
+    "busy_timeout": 5000,  # ms
+    "temp_store": "MEMORY",
+}
+WRITE_QUEUE_MAX_BATCH = int(os.getenv("WRITE_QUEUE_MAX_BATCH", "100"))
+WRITE_QUEUE_MAX_DELAY_MS = float(os.getenv("WRITE_QUEUE_MAX_DELAY_MS", "5"))
+
+def apply_sqlite_profile(sync_engine, profile: str = SQLITE_PROFILE, read_only: bool = False):
+    """
+    Registers a connect listener that applies the profile's pragmas to every new connection.
+    """
+    if profile != "production":
+        return
+
+    @event.listens_for(sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in SQLITE_PRODUCTION_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+def enable_foreign_keys(sync_engine):
+    """
+    SQLite leaves foreign keys unenforced unless every connection turns them
+    on; the stack and folder deletes rely on ON DELETE CASCADE / SET NULL.
+    """
+    @event.listens_for(sync_engine, "connect")
+    def _enable_foreign_keys(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
 
 engine = create_engine(
     DATABASE_URL, connect_args={"check_same_thread": False}
 )
+apply_sqlite_profile(engine)
+enable_foreign_keys(engine)
+instrument_engine(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# The async engine serves the API; the sync engine above is kept for Alembic,
+# scripts and tests.
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+)
+apply_sqlite_profile(async_engine.sync_engine)
+enable_foreign_keys(async_engine.sync_engine)
+instrument_engine(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+# In production, reads get their own pool of query-only connections so that
+# WAL readers never queue behind the writer.
+if SQLITE_PROFILE == "production":
+    async_read_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        pool_size=DB_READ_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+    )
+    apply_sqlite_profile(async_read_engine.sync_engine, read_only=True)
+    enable_foreign_keys(async_read_engine.sync_engine)
+    instrument_engine(async_read_engine.sync_engine)
+else:
+    async_read_engine = async_engine
+AsyncReadSessionLocal = async_sessionmaker(bind=async_read_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+# Single writer for the hot write paths; None means writes commit on the request's session.
+write_queue = GroupCommitWriter(
+    AsyncSessionLocal,
+    max_batch=WRITE_QUEUE_MAX_BATCH,
+    max_delay=WRITE_QUEUE_MAX_DELAY_MS / 1000,
+) if SQLITE_PROFILE == "production" else None
+
 Base = declarative_base()
 
 # Dependency to get a DB session
@@ -22,4 +116,25 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Dependency to get an async DB session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Dependency to get an async DB session for read-only work
+async def get_async_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+async def run_write(db: AsyncSession, job):
+    """
+    Runs `job(session)` and commits it, through the group-commit writer when
+    one is configured, or directly on the request's session otherwise.
+    """
+    if write_queue is not None:
+        return await write_queue.submit(job)
+    result = await job(db)
+    await db.commit()
+    return result
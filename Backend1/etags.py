@@ -0,0 +1,24 @@
+# FILE: Backend1/etags.py
+
+from typing import List, Optional
+
+
+def make_etag(value, weak: bool = False) -> str:
+    return f'W/"{value}"' if weak else f'"{value}"'
+
+
+def parse_etag_header(header: Optional[str]) -> List[str]:
+    """
+    Splits an If-Match / If-None-Match header into bare tag values.
+    Weak validators (W/"...") are treated like strong ones.
+    """
+    if not header:
+        return []
+    tags = []
+    for part in header.split(","):
+        part = part.strip()
+        if part.startswith("W/"):
+            part = part[2:]
+        if part:
+            tags.append(part.strip('"') if part != "*" else "*")
+    return tags
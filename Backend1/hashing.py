@@ -0,0 +1,76 @@
+# FILE: Backend1/hashing.py
+
+import asyncio
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional, Tuple
+
+from passlib.context import CryptContext
+
+# bcrypt releases the GIL while hashing, so a thread pool sized to the number
+# of cores gives real parallelism without the pickling cost of a process pool.
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", os.cpu_count() or 1))
+# How many hashing jobs may wait for a free worker before new ones are rejected.
+HASH_MAX_PENDING = int(os.getenv("HASH_MAX_PENDING", "32"))
+# bcrypt cost factor. Raising it makes existing hashes get upgraded on next login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+
+class HashingBusyError(RuntimeError):
+    """Raised when the hashing queue is full and the job was not accepted."""
+
+
+class PasswordHasher:
+    """
+    Runs passlib hashing on a dedicated, bounded worker pool so that bursts of
+    logins cannot tie up the request threadpool or every CPU core at once.
+    """
+
+    def __init__(self, context: CryptContext, max_workers: int = HASH_WORKERS, max_pending: int = HASH_MAX_PENDING):
+        self.context = context
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hasher")
+        # Admission control: running + queued jobs can never exceed this many.
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+
+    def submit(self, fn: Callable, *args) -> Future:
+        if not self._slots.acquire(blocking=False):
+            raise HashingBusyError("Password hashing queue is full.")
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    # --- Blocking API (for sync code paths) ---
+
+    def hash(self, password: str) -> str:
+        return self.submit(self.context.hash, password).result()
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        return self.submit(self.context.verify, password, hashed_password).result()
+
+    def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verifies a password and, if the stored hash uses outdated settings,
+        also returns a fresh hash that should replace it.
+        """
+        return self.submit(self.context.verify_and_update, password, hashed_password).result()
+
+    # --- Awaitable API (for async code paths) ---
+
+    async def hash_async(self, password: str) -> str:
+        return await asyncio.wrap_future(self.submit(self.context.hash, password))
+
+    async def verify_async(self, password: str, hashed_password: str) -> bool:
+        return await asyncio.wrap_future(self.submit(self.context.verify, password, hashed_password))
+
+    async def verify_and_update_async(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        return await asyncio.wrap_future(self.submit(self.context.verify_and_update, password, hashed_password))
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
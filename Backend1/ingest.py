@@ -0,0 +1,499 @@
+# FILE: Backend1/ingest.py
+
+import asyncio
+import bisect
+import glob
+import json
+import logging
+import os
+import sqlite3
+import threading
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import Table, insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models
+from .database import BASE_DIR, AsyncSessionLocal
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+# Rows held in memory before producers have to wait (and then get a 503).
+INGEST_MAX_PENDING = int(os.getenv("INGEST_MAX_PENDING", "20000"))
+# Rows per INSERT transaction, and how long the writer waits for a batch to fill.
+INGEST_MAX_BATCH = int(os.getenv("INGEST_MAX_BATCH", "500"))
+INGEST_MAX_DELAY_MS = float(os.getenv("INGEST_MAX_DELAY_MS", "50"))
+# How long a producer waits for room in a full queue before giving up.
+INGEST_PUT_TIMEOUT = float(os.getenv("INGEST_PUT_TIMEOUT", "2"))
+# Each worker process journals to its own file next to this path, with its pid
+# in the name (ingest.<pid>.journal).
+INGEST_JOURNAL_PATH = os.getenv("INGEST_JOURNAL_PATH", os.path.join(BASE_DIR, "ingest.journal"))
+# fsync every journal append: survives power loss, not just a process crash.
+INGEST_FSYNC = os.getenv("INGEST_FSYNC", "0") == "1"
+# Journal size that triggers a rewrite holding only the uncommitted records,
+# so the file stays bounded under steady traffic that never lets it empty.
+INGEST_JOURNAL_COMPACT_BYTES = int(os.getenv("INGEST_JOURNAL_COMPACT_BYTES", str(4 * 1024 * 1024)))
+# Attempts at a batch while the database is locked before it is left in the
+# journal for the next start.
+INGEST_MAX_RETRIES = int(os.getenv("INGEST_MAX_RETRIES", "8"))
+
+# Tables events may be ingested into, by name.
+INGEST_TABLES: Dict[str, Table] = {
+    models.TranslationLog.__tablename__: models.TranslationLog.__table__,
+    models.CollectedItem.__tablename__: models.CollectedItem.__table__,
+}
+
+# (sequence number, table name, row)
+Record = Tuple[int, str, dict]
+
+
+class IngestBusyError(RuntimeError):
+    """Raised when the ingest queue stays full for longer than the put timeout."""
+
+
+class JournalLockedError(RuntimeError):
+    """Raised when another live process holds the journal file."""
+
+
+def _try_lock(file) -> bool:
+    """Takes an exclusive, non-blocking lock on `file`, held until it is closed."""
+    try:
+        if fcntl is not None:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            file.seek(0)
+            msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def _is_busy(exc: OperationalError) -> bool:
+    """SQLITE_BUSY / SQLITE_LOCKED: another writer holds the lock, so a retry can succeed."""
+    code = getattr(exc.orig, "sqlite_errorcode", None)
+    if code is not None:
+        return code & 0xFF in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+    return "locked" in str(exc.orig) or "busy" in str(exc.orig)
+
+
+def ingest_busy_exception():
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many events queued, please retry.",
+        headers={"Retry-After": "1"},
+    )
+
+
+def _record_line(record: Record) -> str:
+    seq, table, row = record
+    return json.dumps({"seq": seq, "table": table, "row": row}) + "\n"
+
+
+class IngestJournal:
+    """
+    Append-only JSON-lines write-ahead log. Every accepted record is written
+    here before it is queued; after each committed batch a marker line records
+    the batch's range of sequence numbers. Records no marker covers are
+    replayed on startup. The file is truncated whenever nothing is pending,
+    and compacted down to the pending records when it grows too large.
+
+    The open file is locked exclusively, so two processes never share one
+    journal. With `per_process=True` the file name carries the pid, so every
+    worker gets its own, and journals whose process has died can be adopted.
+
+    Its methods block on file I/O (and fsync), so IngestPipeline calls them
+    through asyncio.to_thread; a thread lock keeps those calls in order.
+    """
+
+    def __init__(self, path: str, fsync: bool = INGEST_FSYNC, per_process: bool = False):
+        self.base_path = path
+        self.fsync = fsync
+        self.per_process = per_process
+        self._file = None
+        self._size = 0
+        self._lock = threading.RLock()
+
+    @property
+    def path(self) -> str:
+        # Resolved late: workers forked after import must not share the parent's pid.
+        if not self.per_process:
+            return self.base_path
+        root, ext = os.path.splitext(self.base_path)
+        return f"{root}.{os.getpid()}{ext}"
+
+    def _open(self):
+        if self._file is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            file = open(self.path, "a+", encoding="utf-8")
+            if not _try_lock(file):
+                file.close()
+                raise JournalLockedError(f"{self.path} is in use by another process.")
+            self._file = file
+            self._size = os.fstat(file.fileno()).st_size
+        return self._file
+
+    def _write(self, lines: List[str]):
+        with self._lock:
+            file = self._open()
+            file.write("".join(lines))
+            file.flush()
+            if self.fsync:
+                os.fsync(file.fileno())
+            self._size = file.tell()
+
+    def append(self, records: List[Record]):
+        self._write([_record_line(record) for record in records])
+
+    def mark_committed(self, first: int, last: int):
+        # A range rather than a high-water mark, so a batch that failed before
+        # it stays uncommitted.
+        self._write([json.dumps({"committed": [first, last]}) + "\n"])
+
+    @property
+    def size(self) -> int:
+        # Tracked on every write, so reading it never waits for the file.
+        return self._size
+
+    def compact(self, records: List[Record]):
+        """
+        Replaces the journal with just `records`, the ones still uncommitted.
+        The new file is locked before it is renamed into place, so no other
+        process can adopt it in between.
+        """
+        with self._lock:
+            temp_path = self.path + ".compact"
+            file = open(temp_path, "w+", encoding="utf-8")
+            if not _try_lock(file):
+                file.close()
+                raise JournalLockedError(f"{temp_path} is in use by another process.")
+            file.write("".join(_record_line(record) for record in records))
+            file.flush()
+            if self.fsync:
+                os.fsync(file.fileno())
+            os.replace(temp_path, self.path)
+            self.close()
+            self._file = file
+            self._size = file.tell()
+
+    def reset(self):
+        # Truncated through the locked handle; closing it would give up the lock.
+        with self._lock:
+            file = self._open()
+            file.seek(0)
+            file.truncate()
+            self._size = 0
+
+    def pending(self) -> Tuple[List[Record], int]:
+        """
+        Returns the uncommitted records and the highest sequence number seen.
+        A torn last line (crash mid-write) is ignored.
+        """
+        records, committed, last_seq = [], [], 0
+        with self._lock:
+            file = self._open()
+            file.seek(0)
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if "committed" in entry:
+                    marker = entry["committed"]
+                    # Journals written before ranges marked everything up to one seq.
+                    committed.append(tuple(marker) if isinstance(marker, list) else (0, marker))
+                else:
+                    records.append((entry["seq"], entry["table"], entry["row"]))
+                    last_seq = max(last_seq, entry["seq"])
+            file.seek(0, os.SEEK_END)
+        committed.sort()
+        starts = [first for first, _ in committed]
+
+        def is_committed(seq: int) -> bool:
+            i = bisect.bisect_right(starts, seq) - 1
+            return i >= 0 and committed[i][1] >= seq
+
+        return [r for r in records if not is_committed(r[0])], last_seq
+
+    def orphans(self) -> List["IngestJournal"]:
+        """
+        Locks and returns the other workers' journals that no live process
+        holds, including a single-file journal from before per-process journals.
+        """
+        if not self.per_process:
+            return []
+        root, ext = os.path.splitext(self.base_path)
+        found = []
+        for path in sorted(glob.glob(f"{glob.escape(root)}.*{ext}")) + [self.base_path]:
+            if path == self.path or not os.path.isfile(path):
+                continue
+            orphan = IngestJournal(path, self.fsync)
+            try:
+                orphan._open()
+            except JournalLockedError:
+                continue
+            found.append(orphan)
+        return found
+
+    def discard(self):
+        """
+        Empties and removes an adopted journal. It is truncated while still
+        locked, so a process that races to adopt it finds nothing to replay.
+        """
+        with self._lock:
+            self.reset()
+            self.close()
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class IngestPipeline:
+    """
+    Buffers high-frequency events (translation logs, history items) and writes
+    them with one multi-row INSERT per table per batch from a background task.
+
+    Handlers only append to the journal and an in-memory queue. The queue is
+    bounded: when it is full, producers wait up to `put_timeout` seconds for
+    the writer to catch up and then get IngestBusyError. While the database
+    is locked the writer retries a batch up to `max_retries` times, so the
+    queue fills and pushes back. A batch that still fails, or fails with any
+    other database error, is left uncommitted in the journal and replayed on
+    the next start, while the queue moves on.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        journal: IngestJournal,
+        max_pending: int = INGEST_MAX_PENDING,
+        max_batch: int = INGEST_MAX_BATCH,
+        max_delay: float = INGEST_MAX_DELAY_MS / 1000,
+        put_timeout: float = INGEST_PUT_TIMEOUT,
+        retry_delay: float = 0.5,
+        max_retries: int = INGEST_MAX_RETRIES,
+        compact_bytes: int = INGEST_JOURNAL_COMPACT_BYTES,
+    ):
+        self.session_factory = session_factory
+        self.journal = journal
+        self.max_pending = max_pending
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.put_timeout = put_timeout
+        self.retry_delay = retry_delay
+        self.max_retries = max_retries
+        self.compact_bytes = compact_bytes
+        self._buffer: Deque[Record] = deque()
+        # Batches the writer gave up on; journaled, uncommitted, replayed on the next start.
+        self._failed: List[Record] = []
+        self._compacted_size = 0
+        self._seq = 0
+        # Journaled records not yet committed; the journal is truncated at zero.
+        self._uncommitted = 0
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._loop is not loop:
+            self._loop = loop
+            self._ready = asyncio.Event()
+            self._full = asyncio.Event()
+            self._space = asyncio.Condition()
+            self._idle = asyncio.Event()
+            self._idle.set()
+            if self._buffer:
+                self._signal()
+            self._task = loop.create_task(self._run())
+
+    def _signal(self):
+        self._idle.clear()
+        self._ready.set()
+        if len(self._buffer) >= self.max_batch:
+            self._full.set()
+
+    async def recover(self) -> int:
+        """
+        Re-queues records a previous process journaled but never committed,
+        in this process's journal or in journals of workers that are gone.
+        """
+        records, last_seq = await asyncio.to_thread(self.journal.pending)
+        self._seq = max(self._seq, last_seq)
+        for orphan in await asyncio.to_thread(self.journal.orphans):
+            # Renumbered into this journal: sequence numbers are per journal.
+            adopted = []
+            for _, table, row in (await asyncio.to_thread(orphan.pending))[0]:
+                self._seq += 1
+                adopted.append((self._seq, table, row))
+            if adopted:
+                logger.warning("Adopting %d ingest records from %s.", len(adopted), orphan.path)
+                await asyncio.to_thread(self.journal.append, adopted)
+                records += adopted
+            await asyncio.to_thread(orphan.discard)
+        if records:
+            logger.warning("Replaying %d journaled ingest records.", len(records))
+            self._buffer.extendleft(reversed(records))
+            self._uncommitted += len(records)
+        self._ensure_started()
+        return len(records)
+
+    async def submit(self, table: str, rows: List[dict]):
+        """
+        Accepts rows for `table` once they are journaled. They are written to
+        the database shortly after, not before this returns.
+        """
+        if table not in INGEST_TABLES:
+            raise KeyError(table)
+        if len(rows) > self.max_pending:
+            raise ValueError(f"At most {self.max_pending} rows per submission.")
+        self._ensure_started()
+        async with self._space:
+            try:
+                await asyncio.wait_for(
+                    self._space.wait_for(lambda: len(self._buffer) + len(rows) <= self.max_pending),
+                    self.put_timeout,
+                )
+            except asyncio.TimeoutError:
+                raise IngestBusyError("Ingest queue is full.")
+            records = []
+            for row in rows:
+                self._seq += 1
+                records.append((self._seq, table, row))
+            await asyncio.to_thread(self.journal.append, records)
+            self._buffer.extend(records)
+            self._uncommitted += len(records)
+            self._signal()
+
+    async def drain(self):
+        """
+        Waits until every accepted record has been written.
+        """
+        if self._task is not None and not self._task.done():
+            await self._idle.wait()
+
+    async def close(self):
+        """
+        Writes what is queued, then stops the writer. Records that still could
+        not be written stay in the journal for the next start.
+        """
+        if self._task is not None and not self._task.done():
+            try:
+                await asyncio.wait_for(self.drain(), timeout=10)
+            except asyncio.TimeoutError:
+                logger.error("Ingest writer did not drain; %d records left in the journal.", self._uncommitted)
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        if self._uncommitted == 0 and self.journal.per_process:
+            # Nothing to replay: don't leave an empty journal behind per worker pid.
+            await asyncio.to_thread(self.journal.discard)
+        else:
+            await asyncio.to_thread(self.journal.close)
+
+    async def _run(self):
+        while True:
+            await self._ready.wait()
+            if len(self._buffer) < self.max_batch:
+                try:
+                    await asyncio.wait_for(self._full.wait(), self.max_delay)
+                except asyncio.TimeoutError:
+                    pass
+            batch = [self._buffer.popleft() for _ in range(min(self.max_batch, len(self._buffer)))]
+            if len(self._buffer) < self.max_batch:
+                self._full.clear()
+            if not self._buffer:
+                self._ready.clear()
+            async with self._space:
+                self._space.notify_all()
+
+            # A batch that could not be written keeps counting as uncommitted,
+            # so the journal holding it is neither truncated nor discarded.
+            if batch:
+                if await self._write_batch(batch):
+                    await asyncio.to_thread(self.journal.mark_committed, batch[0][0], batch[-1][0])
+                    self._uncommitted -= len(batch)
+                else:
+                    self._failed.extend(batch)
+            if self._uncommitted == 0:
+                # Under the producers' lock, so no append can land before the truncation.
+                async with self._space:
+                    if self._uncommitted == 0:
+                        await asyncio.to_thread(self.journal.reset)
+            elif self.journal.size >= max(self.compact_bytes, 2 * self._compacted_size):
+                await self._compact()
+            if not self._buffer:
+                self._idle.set()
+
+    async def _compact(self):
+        # Under the producers' lock, so every journaled record is either
+        # queued or failed; none is in between.
+        async with self._space:
+            pending = sorted([*self._failed, *self._buffer], key=lambda record: record[0])
+            await asyncio.to_thread(self.journal.compact, pending)
+            self._compacted_size = self.journal.size
+
+    async def _write_batch(self, batch: List[Record]) -> bool:
+        """
+        Returns False if the batch could not be written and must stay in the journal.
+        """
+        delay = self.retry_delay
+        for attempt in range(1, self.max_retries + 2):
+            try:
+                await self._insert(batch)
+                return True
+            except OperationalError as exc:
+                # Only a locked database is worth waiting for; "no such table" and
+                # the like will fail the same way every time.
+                if not _is_busy(exc) or attempt > self.max_retries:
+                    logger.error(
+                        "Keeping ingest batch of %d rows (seq %d-%d) in the journal after %d attempt(s); "
+                        "it is replayed on the next start.",
+                        len(batch), batch[0][0], batch[-1][0], attempt, exc_info=True,
+                    )
+                    return False
+                logger.warning("Ingest batch of %d rows hit a locked database, retrying in %.1fs.", len(batch), delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+            except Exception:
+                # Some row is invalid. Write the rest one by one and drop the bad ones.
+                logger.exception("Ingest batch of %d rows failed, writing rows individually.", len(batch))
+                for record in batch:
+                    try:
+                        await self._insert([record])
+                    except Exception:
+                        logger.exception("Dropping ingest record %d for %s.", record[0], record[1])
+                return True
+
+    async def _insert(self, batch: List[Record]):
+        by_table: Dict[str, List[dict]] = {}
+        for _, table, row in batch:
+            by_table.setdefault(table, []).append(row)
+        async with self.session_factory() as session:
+            for table, rows in by_table.items():
+                await session.execute(insert(INGEST_TABLES[table]), rows)
+            await session.commit()
+
+
+ingest = IngestPipeline(AsyncSessionLocal, IngestJournal(INGEST_JOURNAL_PATH, per_process=True))
+
+
+def get_ingest() -> IngestPipeline:
+    return ingest
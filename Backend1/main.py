@@ -1,4 +1,7 @@
-from fastapi import FastAPI, Request
+from contextlib import asynccontextmanager
+from functools import lru_cache
+import hashlib
+from fastapi import FastAPI, Request, Response
 from fastapi.responses import HTMLResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.templating import Jinja2Templates
@@ -13,12 +16,25 @@ from Backend1.api.routers import (
     flashcards, 
     media_search, 
     translation, 
-    history
+    history,
+    search,
+    workspace,
+    changes,
+    sync,
+    batch
 )
 
 # Import database and models for initial table creation
-from Backend1.database import Base, engine
+from Backend1.database import Base, engine, write_queue
 from Backend1 import models
+from Backend1.assets import AssetFiles
+from Backend1.changefeed import change_feed
+from Backend1.compression import CompressionMiddleware
+from Backend1.etags import make_etag, parse_etag_header
+from Backend1.ingest import ingest
+from Backend1.purge import purger
+from Backend1 import metrics
+from Backend1.translation import translator
 
 
 # --- Path Configuration ---
@@ -29,11 +45,34 @@ templates_path = os.path.join(BASE_DIR, "../Frontend1/templates")
 shared_path = os.path.join(BASE_DIR, "../shared") # <-- ADD THIS LINE
 
 
+# --- Application Lifespan ---
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Time serialization on every route; by now all of them are registered,
+    # including the ones declared on `app` below the routers
+    metrics.instrument_routes(app.routes)
+    # Re-queue ingest events a previous run journaled but never wrote
+    await ingest.recover()
+    yield
+    # Write queued translation logs / history items
+    await ingest.close()
+    # Send translation batches still waiting on their timer
+    await translator.close()
+    # Stop background stack/folder deletes; deleting again resumes them
+    await purger.close()
+    # Stop the change feed's poller (SQLite broker only)
+    await change_feed.close()
+    # Stop the group-commit writer (production SQLite profile only)
+    if write_queue is not None:
+        await write_queue.close()
+
+
 # --- FastAPI App Instance ---
 app = FastAPI(
     title="1Project API & Web App",
     description="A modular and secure API for the 1Project application.",
-    version="1.1.0"
+    version="1.1.0",
+    lifespan=lifespan
 )
 
 # --- Middleware ---
@@ -43,12 +82,21 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"], # Keyset pagination cursor for listing endpoints
 )
+# gzip/brotli for API responses and assets above COMPRESSION_MIN_BYTES
+app.add_middleware(CompressionMiddleware)
+# Outermost, so latency includes compression; exposed at /metrics
+if metrics.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
 
 # --- Static Files and Templates ---
-app.mount("/static", StaticFiles(directory=static_path), name="static")
+# Serves content-hashed builds (python -m Backend1.assets) when present
+static_files = AssetFiles(directory=static_path, url_prefix="/static")
+app.mount("/static", static_files, name="static")
 app.mount("/shared", StaticFiles(directory=shared_path), name="shared") # <-- ADD THIS LINE
 templates = Jinja2Templates(directory=templates_path)
+templates.env.globals["asset_url"] = static_files.url
 
 # --- Include All Routers ---
 # The application now delegates all API routes to these router files.
@@ -59,11 +107,31 @@ app.include_router(flashcards.router)
 app.include_router(media_search.router)
 app.include_router(translation.router)
 app.include_router(history.router)
+app.include_router(search.router)
+app.include_router(workspace.router)
+app.include_router(changes.router)
+app.include_router(sync.router)
+app.include_router(batch.router)
+app.include_router(metrics.router)
 
 # --- HTML Page-Serving Endpoint ---
+@lru_cache(maxsize=None)
+def render_home_page():
+    """
+    home.html does not depend on the request, so it is rendered once per process.
+    """
+    body = templates.get_template("home.html").render().encode("utf-8")
+    return body, make_etag(hashlib.sha256(body).hexdigest()[:16])
+
+
 @app.get("/", response_class=HTMLResponse)
 async def home_page(request: Request):
     """
     Serves the main single-page application.
     """
-    return templates.TemplateResponse("home.html", {"request": request})
\ No newline at end of file
+    body, etag = render_home_page()
+    # The page links hashed asset URLs, so it must be revalidated on every load.
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag.strip('"') in parse_etag_header(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+    return HTMLResponse(content=body, headers=headers)
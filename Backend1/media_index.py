@@ -0,0 +1,264 @@
+# FILE: Backend1/media_index.py
+
+import asyncio
+import json
+import os
+import sys
+from typing import AsyncIterator, Dict, List, Optional
+from urllib.parse import quote
+
+from sqlalchemy import DDL, delete, event, func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models
+from .cache import TTLCache
+from .pagination import after_cursor
+from .search import HIGHLIGHT_END, HIGHLIGHT_START, build_match_query
+
+# --- Full-Text Index (SQLite FTS5) ---
+# Same external-content setup as Backend1/search.py: the inverted index maps
+# each term to transcript segments, and every segment carries its timestamp.
+
+MEDIA_FTS_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS media_fts USING fts5(
+        title, author,
+        content='Media', content_rowid='media_id', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS media_fts_ai AFTER INSERT ON "Media" BEGIN
+        INSERT INTO media_fts(rowid, title, author) VALUES (new.media_id, new.title, new.author);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS media_fts_ad AFTER DELETE ON "Media" BEGIN
+        INSERT INTO media_fts(media_fts, rowid, title, author) VALUES ('delete', old.media_id, old.title, old.author);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS media_fts_au AFTER UPDATE OF title, author ON "Media" BEGIN
+        INSERT INTO media_fts(media_fts, rowid, title, author) VALUES ('delete', old.media_id, old.title, old.author);
+        INSERT INTO media_fts(rowid, title, author) VALUES (new.media_id, new.title, new.author);
+    END""",
+]
+
+TRANSCRIPT_FTS_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS transcript_fts USING fts5(
+        text,
+        content='TranscriptSegments', content_rowid='segment_id', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS transcript_fts_ai AFTER INSERT ON "TranscriptSegments" BEGIN
+        INSERT INTO transcript_fts(rowid, text) VALUES (new.segment_id, new.text);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS transcript_fts_ad AFTER DELETE ON "TranscriptSegments" BEGIN
+        INSERT INTO transcript_fts(transcript_fts, rowid, text) VALUES ('delete', old.segment_id, old.text);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS transcript_fts_au AFTER UPDATE OF text ON "TranscriptSegments" BEGIN
+        INSERT INTO transcript_fts(transcript_fts, rowid, text) VALUES ('delete', old.segment_id, old.text);
+        INSERT INTO transcript_fts(rowid, text) VALUES (new.segment_id, new.text);
+    END""",
+]
+
+for statement in MEDIA_FTS_DDL:
+    event.listen(models.Media.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+for statement in TRANSCRIPT_FTS_DDL:
+    event.listen(models.TranscriptSegment.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+event.listen(models.Media.__table__, "after_drop", DDL("DROP TABLE IF EXISTS media_fts").execute_if(dialect="sqlite"))
+event.listen(models.TranscriptSegment.__table__, "after_drop", DDL("DROP TABLE IF EXISTS transcript_fts").execute_if(dialect="sqlite"))
+
+
+# --- Querying ---
+
+# Segment hits ranked per query before they are grouped by media.
+MEDIA_SEGMENT_SCAN = int(os.getenv("MEDIA_SEGMENT_SCAN", "1000"))
+# Matching timestamps returned per media item.
+MEDIA_MAX_MATCHES = int(os.getenv("MEDIA_MAX_MATCHES", "5"))
+MEDIA_SEARCH_CACHE_SIZE = int(os.getenv("MEDIA_SEARCH_CACHE_SIZE", "2048"))
+MEDIA_SEARCH_CACHE_TTL = float(os.getenv("MEDIA_SEARCH_CACHE_TTL", "300"))
+# bm25() weights for media_fts: title, author.
+MEDIA_WEIGHTS = (10.0, 2.0)
+
+# The catalog is shared by all users, so results are cached per query, not per user.
+# Entries are dropped whenever this process changes the catalog, and expire after
+# MEDIA_SEARCH_CACHE_TTL so changes made by other workers show up as well.
+_search_cache = TTLCache(maxsize=MEDIA_SEARCH_CACHE_SIZE, ttl=MEDIA_SEARCH_CACHE_TTL)
+
+_SEGMENTS_SQL = text("""
+    SELECT s.media_id, s.start, s."end",
+           highlight(transcript_fts, 0, :hl_start, :hl_end) AS text,
+           bm25(transcript_fts) AS rank
+    FROM transcript_fts
+    JOIN "TranscriptSegments" s ON s.segment_id = transcript_fts.rowid
+    WHERE transcript_fts MATCH :match
+    ORDER BY rank
+    LIMIT :scan
+""")
+
+_TITLES_SQL = text(f"""
+    SELECT rowid AS media_id, bm25(media_fts, {MEDIA_WEIGHTS[0]}, {MEDIA_WEIGHTS[1]}) AS rank
+    FROM media_fts
+    WHERE media_fts MATCH :match
+    ORDER BY rank
+    LIMIT :scan
+""")
+
+
+def clear_media_search_cache():
+    _search_cache.clear()
+
+
+def transcript_url(external_id: str) -> str:
+    return f"/media-search/{quote(external_id, safe='')}/transcript"
+
+
+def _media_result(media: models.Media) -> dict:
+    return {
+        "id": media.external_id,
+        "media_type": media.media_type,
+        "title": media.title,
+        "author": media.author,
+        "url": media.url,
+        "thumbnail_url": media.thumbnail_url,
+        "duration": media.duration,
+        "segment_count": media.segment_count,
+        "transcript_url": transcript_url(media.external_id),
+    }
+
+
+async def search_media(db: AsyncSession, query: str, limit: int) -> List[dict]:
+    """
+    Returns up to `limit` media items for `query`, best first, each with the
+    timestamps of its best-matching transcript segments (`matches`). The
+    transcript itself is not included; it is streamed from `transcript_url`.
+    Lower bm25 ranks are better; a title/author match adds to the rank of
+    the media's best segment.
+    """
+    match = build_match_query(query)
+    if not match:
+        return []
+    key = (match, limit)
+    cached = _search_cache.get(key)
+    if cached is not None:
+        return cached
+
+    params = {"match": match, "scan": MEDIA_SEGMENT_SCAN, "hl_start": HIGHLIGHT_START, "hl_end": HIGHLIGHT_END}
+    ranks: Dict[int, float] = {}
+    matches: Dict[int, list] = {}
+    for row in (await db.execute(_SEGMENTS_SQL, params)).all():
+        ranks[row.media_id] = min(ranks.get(row.media_id, 0.0), row.rank)
+        found = matches.setdefault(row.media_id, [])
+        if len(found) < MEDIA_MAX_MATCHES:
+            found.append({"start": row.start, "end": row.end, "text": row.text})
+    for row in (await db.execute(_TITLES_SQL, params)).all():
+        ranks[row.media_id] = ranks.get(row.media_id, 0.0) + row.rank
+
+    top = sorted(ranks, key=ranks.get)[:limit]
+    media = {m.media_id: m for m in (await db.scalars(select(models.Media).where(models.Media.media_id.in_(top)))).all()}
+
+    results = [
+        {
+            **_media_result(media[media_id]),
+            "matches": sorted(matches.get(media_id, []), key=lambda m: m["start"]),
+        }
+        for media_id in top
+        if media_id in media
+    ]
+    _search_cache.set(key, results)
+    return results
+
+
+# --- Transcript Delivery ---
+
+# Segments read (and sent as one chunk) per round trip while streaming a transcript.
+TRANSCRIPT_CHUNK_SEGMENTS = int(os.getenv("TRANSCRIPT_CHUNK_SEGMENTS", "200"))
+
+
+async def get_media(db: AsyncSession, external_id: str) -> Optional[models.Media]:
+    return await db.scalar(select(models.Media).where(models.Media.external_id == external_id))
+
+
+async def iter_transcript(
+    db: AsyncSession,
+    media_id: int,
+    start: float = 0.0,
+    end: Optional[float] = None,
+    chunk_size: int = TRANSCRIPT_CHUNK_SEGMENTS,
+) -> AsyncIterator[List[dict]]:
+    """
+    Yields the segments shown between `start` and `end` seconds (inclusive),
+    in order and in chunks of `chunk_size`. The first segment is the one
+    already on screen at `start`. Each chunk is one keyset query on
+    (media_id, start), so a window deep into a long video costs the same as
+    one at the beginning.
+    """
+    segment = models.TranscriptSegment
+    on_screen = await db.scalar(select(func.max(segment.start)).where(segment.media_id == media_id, segment.start <= start))
+    where = [segment.media_id == media_id, segment.start >= (start if on_screen is None else on_screen)]
+    if end is not None:
+        where.append(segment.start <= end)
+    ordering = [(segment.start, False), (segment.segment_id, False)]
+    cursor = None
+    while True:
+        stmt = select(segment.segment_id, segment.start, segment.end, segment.text).where(*where)
+        if cursor is not None:
+            stmt = stmt.where(after_cursor(ordering, cursor))
+        rows = (await db.execute(stmt.order_by(segment.start, segment.segment_id).limit(chunk_size))).all()
+        if rows:
+            yield [{"start": row.start, "end": row.end, "text": row.text} for row in rows]
+        if len(rows) < chunk_size:
+            return
+        cursor = (rows[-1].start, rows[-1].segment_id)
+
+
+# --- Catalog Maintenance ---
+
+async def upsert_media(db: AsyncSession, item: dict) -> int:
+    """
+    Adds one media item, or replaces it (matched on `id`) together with its
+    transcript. `item` has the shape of schemas.MediaSearchResult.
+    The caller commits.
+    """
+    existing = await db.scalar(select(models.Media.media_id).where(models.Media.external_id == item["id"]))
+    if existing is not None:
+        await db.execute(delete(models.TranscriptSegment).where(models.TranscriptSegment.media_id == existing))
+        await db.execute(delete(models.Media).where(models.Media.media_id == existing))
+    segments = sorted(item.get("transcript") or [], key=lambda s: float(s["start"]))
+    media_id = (await db.execute(
+        insert(models.Media).values(
+            external_id=item["id"],
+            media_type=item["media_type"],
+            title=item["title"],
+            author=item.get("author", ""),
+            url=item["url"],
+            thumbnail_url=item.get("thumbnail_url", ""),
+            duration=max((float(s.get("end") or s["start"]) for s in segments), default=None),
+            segment_count=len(segments),
+        ).returning(models.Media.media_id)
+    )).scalar_one()
+    if segments:
+        await db.execute(insert(models.TranscriptSegment.__table__), [
+            {"media_id": media_id, "start": float(s["start"]), "end": s.get("end"), "text": s["text"]}
+            for s in segments
+        ])
+    clear_media_search_cache()
+    return media_id
+
+
+async def load_catalog(db: AsyncSession, lines) -> int:
+    """
+    Upserts every media item of an NDJSON catalog (one MediaSearchResult per line).
+    """
+    count = 0
+    for line in lines:
+        if line.strip():
+            await upsert_media(db, json.loads(line))
+            count += 1
+    await db.commit()
+    clear_media_search_cache()
+    return count
+
+
+if __name__ == "__main__":
+    # python -m Backend1.media_index catalog.ndjson
+    from .database import AsyncSessionLocal
+
+    async def _main(path: str):
+        async with AsyncSessionLocal() as db:
+            with open(path, encoding="utf-8") as file:
+                print(f"Indexed {await load_catalog(db, file)} media items.")
+
+    asyncio.run(_main(sys.argv[1]))
@@ -0,0 +1,416 @@
+# FILE: Backend1/metrics.py
+
+import contextvars
+import functools
+import inspect
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter as _Tally
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from fastapi import APIRouter, HTTPException, Response, status
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+# Set to "0" to keep collecting (Server-Timing, logs) without exposing /metrics.
+METRICS_ENDPOINT_ENABLED = os.getenv("METRICS_ENDPOINT_ENABLED", "1") == "1"
+# Requests slower than this are logged with their timing breakdown.
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "500"))
+# Sampling profiler, switched on per request with the X-Profile header.
+PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", "0") == "1"
+PROFILER_INTERVAL_MS = float(os.getenv("PROFILER_INTERVAL_MS", "5"))
+PROFILER_OUTPUT_DIR = os.getenv("PROFILER_OUTPUT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles"))
+PROFILE_HEADER = "X-Profile"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+# --- Registry (Prometheus text exposition format) ---
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != float("inf") else "+Inf"
+
+
+class Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}", *self._samples()]
+
+    @abstractmethod
+    def _samples(self) -> List[str]:
+        """The exposition lines for this metric's values."""
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, labels: tuple = (), amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, labels: tuple = ()) -> float:
+        return self._values.get(labels, 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labels, key)} {_number(value)}" for key, value in items]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # labels -> [per-bucket counts..., sum]
+        self._values: Dict[tuple, list] = {}
+
+    def observe(self, labels: tuple, value: float):
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [0] * len(self.buckets) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-1] += value
+
+    def count(self, labels: tuple = ()) -> int:
+        series = self._values.get(labels)
+        return sum(series[:-1]) if series else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._values.items())
+        lines = []
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = 'le="%s"' % _number(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_number(series[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self.metrics for line in metric.render()) + "\n"
+
+
+registry = Registry()
+REQUESTS = registry.register(Counter("http_requests_total", "HTTP requests by route and status.", ("method", "route", "status")))
+REQUEST_LATENCY = registry.register(Histogram("http_request_duration_seconds", "Time to the last response byte.", ("method", "route")))
+REQUEST_DB_QUERIES = registry.register(Histogram("http_request_db_queries", "Database queries per request.", ("route",), QUERY_COUNT_BUCKETS))
+REQUEST_DB_TIME = registry.register(Histogram("http_request_db_seconds", "Database time per request.", ("route",)))
+REQUEST_SERIALIZATION_TIME = registry.register(Histogram("http_request_serialization_seconds", "Response validation and JSON encoding time per request.", ("route",)))
+REQUEST_AUTH_TIME = registry.register(Histogram("http_request_auth_seconds", "Token and user lookup time per authenticated request.", ("route",)))
+DB_QUERIES = registry.register(Counter("db_queries_total", "Database queries, including work outside requests."))
+DB_QUERY_TIME = registry.register(Counter("db_query_seconds_total", "Database time, including work outside requests."))
+
+
+# --- Per-Request Timings ---
+
+class RequestTimings:
+    __slots__ = ("started", "db_queries", "db_seconds", "auth_seconds", "serialization_seconds", "endpoint_done")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.auth_seconds = 0.0
+        self.serialization_seconds = 0.0
+        self.endpoint_done: Optional[float] = None
+
+    def server_timing(self, total: Optional[float] = None) -> str:
+        parts = [
+            f'db;dur={self.db_seconds * 1000:.2f};desc="{self.db_queries} queries"',
+            f"auth;dur={self.auth_seconds * 1000:.2f}",
+            f"serialize;dur={self.serialization_seconds * 1000:.2f}",
+        ]
+        if total is not None:
+            parts.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(parts)
+
+
+# A mutable object per request: tasks and threads spawned by the request copy
+# the context, so they all add to the same timings.
+_current: contextvars.ContextVar[Optional[RequestTimings]] = contextvars.ContextVar("request_timings", default=None)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current.get()
+
+
+@contextmanager
+def timed(kind: str) -> Iterator[None]:
+    """
+    Adds the time spent in the block to the current request's `auth` or
+    `serialization` timing. Outside a request it does nothing.
+    """
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        attribute = f"{kind}_seconds"
+        setattr(timings, attribute, getattr(timings, attribute) + time.perf_counter() - started)
+
+
+# --- Database ---
+
+def instrument_engine(sync_engine):
+    """
+    Counts and times every statement run on `sync_engine` (for an AsyncEngine,
+    pass its `.sync_engine`), globally and for the current request.
+    """
+    if getattr(sync_engine, "_metrics_instrumented", False):
+        return
+    sync_engine._metrics_instrumented = True
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        DB_QUERIES.inc()
+        DB_QUERY_TIME.inc(amount=elapsed)
+        timings = _current.get()
+        if timings is not None:
+            timings.db_queries += 1
+            timings.db_seconds += elapsed
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _failed(context):
+        started = context.connection.info.get("query_started") if context.connection is not None else None
+        if started:
+            started.pop()
+
+
+# --- Routes ---
+
+def _route_label(scope: Scope) -> str:
+    # The route template, not the raw path, so IDs do not explode the label set.
+    route = scope.get("route")
+    return getattr(route, "path", None) or "<unmatched>"
+
+
+def _mark_endpoint_done(result):
+    timings = _current.get()
+    if timings is not None:
+        timings.endpoint_done = time.perf_counter()
+    return result
+
+
+def instrument_routes(routes):
+    """
+    Wraps each APIRoute's endpoint to note when it returns; from then until
+    the response starts, FastAPI is validating and serializing the result.
+    Call once every route is registered, e.g. from the app's lifespan.
+    """
+    for route in routes:
+        if not isinstance(route, APIRoute) or getattr(route.dependant.call, "_metrics_wrapped", False):
+            continue
+        call = route.dependant.call
+        if inspect.iscoroutinefunction(call):
+            @functools.wraps(call)
+            async def wrapper(*args, __call=call, **kwargs):
+                return _mark_endpoint_done(await __call(*args, **kwargs))
+        else:
+            @functools.wraps(call)
+            def wrapper(*args, __call=call, **kwargs):
+                return _mark_endpoint_done(__call(*args, **kwargs))
+        wrapper._metrics_wrapped = True
+        route.dependant.call = wrapper
+
+
+# --- Sampling Profiler ---
+
+class SamplingProfiler:
+    """
+    Samples the stack of one thread (the event loop's) every `interval`
+    seconds from a background thread and tallies them in collapsed-stack
+    form ("a;b;c count" lines) for flamegraph tools. Other requests running
+    on the same loop at the time show up in the samples too.
+    """
+
+    def __init__(self, thread_id: int, interval: float = PROFILER_INTERVAL_MS / 1000):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: _Tally = _Tally()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+
+    def start(self) -> "SamplingProfiler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> "SamplingProfiler":
+        self._stop.set()
+        self._thread.join()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+def _profile_path(method: str, path: str) -> str:
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", path).strip("_") or "root"
+    return os.path.join(PROFILER_OUTPUT_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{method}-{slug}-{time.time_ns() % 10**6}.folded")
+
+
+# --- Middleware ---
+
+class MetricsMiddleware:
+    """
+    Records latency, status and the DB / auth / serialization breakdown of
+    every HTTP request, adds a Server-Timing header with that breakdown and
+    logs requests slower than SLOW_REQUEST_MS. With PROFILER_ENABLED, a
+    request sent with `X-Profile: 1` is sampled and the collapsed stacks are
+    written to PROFILER_OUTPUT_DIR (the file name comes back in X-Profile).
+    """
+
+    def __init__(self, app: ASGIApp, profiler_enabled: bool = PROFILER_ENABLED):
+        self.app = app
+        self.profiler_enabled = profiler_enabled
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        profiler, profile_path = None, None
+        if self.profiler_enabled and Headers(scope=scope).get(PROFILE_HEADER) == "1":
+            profiler = SamplingProfiler(threading.get_ident()).start()
+            profile_path = _profile_path(scope["method"], scope["path"])
+        status_code = 500
+        stream_started = None
+
+        async def send_with_timings(message: Message):
+            nonlocal status_code, stream_started
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                now = time.perf_counter()
+                if timings.endpoint_done is not None:
+                    timings.serialization_seconds += now - timings.endpoint_done
+                    timings.endpoint_done = None
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", timings.server_timing(now - timings.started))
+                if headers.get("content-type", "").startswith("text/event-stream"):
+                    # Event streams stay open indefinitely; time them to the first byte.
+                    stream_started = now
+                if profile_path is not None:
+                    headers[PROFILE_HEADER] = os.path.basename(profile_path)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timings)
+        finally:
+            _current.reset(token)
+            elapsed = (stream_started or time.perf_counter()) - timings.started
+            if profiler is not None:
+                self._save_profile(profiler, profile_path)
+            self._record(scope, timings, status_code, elapsed)
+
+    @staticmethod
+    def _record(scope: Scope, timings: RequestTimings, status_code: int, elapsed: float):
+        route = _route_label(scope)
+        REQUESTS.inc((scope["method"], route, str(status_code)))
+        REQUEST_LATENCY.observe((scope["method"], route), elapsed)
+        REQUEST_DB_QUERIES.observe((route,), timings.db_queries)
+        REQUEST_DB_TIME.observe((route,), timings.db_seconds)
+        REQUEST_SERIALIZATION_TIME.observe((route,), timings.serialization_seconds)
+        if timings.auth_seconds:
+            REQUEST_AUTH_TIME.observe((route,), timings.auth_seconds)
+        if elapsed * 1000 >= SLOW_REQUEST_MS:
+            logger.warning(
+                "Slow request %s %s -> %d in %.1fms (%s)",
+                scope["method"], route, status_code, elapsed * 1000, timings.server_timing(),
+            )
+
+    @staticmethod
+    def _save_profile(profiler: SamplingProfiler, path: str):
+        profiler.stop()
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(profiler.collapsed())
+        except OSError:
+            logger.exception("Could not write profile %s", path)
+
+
+# --- Exposition ---
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Prometheus text exposition of the metrics above.
+    """
+    if not METRICS_ENDPOINT_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    return Response(content=registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,6 +1,6 @@
 # FILE: Backend1/models.py
 
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, DateTime, Float, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .database import Base
@@ -11,7 +11,14 @@ class Folder(Base):
     user_id = Column(String, nullable=False)
     folder_name = Column(String, nullable=False)
     creation_date = Column(DateTime(timezone=True), server_default=func.now())
-    notes = relationship("Note", back_populates="folder")
+    # Deleting a folder un-files its notes through ON DELETE SET NULL (see purge.py).
+    notes = relationship("Note", back_populates="folder", passive_deletes=True)
+
+    # Composite indexes below back the user-scoped listing queries in the routers
+    # (filter on the owner, sort on the second column) so they avoid a scan + sort.
+    __table_args__ = (
+        Index("ix_Folders_user_id_folder_name", "user_id", "folder_name"),
+    )
 
 class Note(Base):
     __tablename__ = "Notes"
@@ -20,10 +27,18 @@ class Note(Base):
     title = Column(String, default="Untitled Note")
     content = Column(Text, default="")
     creation_date = Column(DateTime(timezone=True), server_default=func.now())
-    last_modified_date = Column(DateTime(timezone=True), onupdate=func.now())
+    last_modified_date = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     folder_id = Column(Integer, ForeignKey("Folders.folder_id", ondelete="SET NULL"))
+    # Bumped on every write; used for optimistic concurrency (If-Match / ETag).
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     folder = relationship("Folder", back_populates="notes")
 
+    __table_args__ = (
+        Index("ix_Notes_user_id_last_modified_date", "user_id", "last_modified_date"),
+        # Backs ON DELETE SET NULL and the chunked un-filing when a folder is deleted.
+        Index("ix_Notes_folder_id", "folder_id"),
+    )
+
 class Stack(Base):
     __tablename__ = "Stacks"
     stack_id = Column(Integer, primary_key=True, index=True)
@@ -31,7 +46,12 @@ class Stack(Base):
     stack_name = Column(String, nullable=False)
     creation_date = Column(DateTime(timezone=True), server_default=func.now())
     is_default_stack = Column(Boolean, default=False)
-    flashcards = relationship("Flashcard", cascade="all, delete-orphan")
+    # Left to ON DELETE CASCADE in the database instead of loading every card.
+    flashcards = relationship("Flashcard", cascade="all, delete-orphan", passive_deletes=True)
+
+    __table_args__ = (
+        Index("ix_Stacks_user_id_creation_date", "user_id", "creation_date"),
+    )
 
 class Flashcard(Base):
     __tablename__ = "Flashcards"
@@ -44,7 +64,137 @@ class Flashcard(Base):
     # Note: We are simplifying for now. The link to CollectedItems can be added back if needed.
     # collected_item_id = Column(Integer, ForeignKey("CollectedItems.item_id"))
 
-# You would continue to define all other tables like CollectedItems, TranslationLogs etc. here
+    # Spaced-repetition state (see Backend1/scheduler.py). The due date and last
+    # review reuse the legacy next_review_date / last_reviewed_date columns.
+    # New cards are due as soon as they are created.
+    due_at = Column("next_review_date", DateTime(timezone=True), default=func.now())
+    last_reviewed_at = Column("last_reviewed_date", DateTime(timezone=True))
+    interval_days = Column(Float, nullable=False, default=0.0, server_default="0")
+    ease = Column(Float, nullable=False, default=2.5, server_default="2.5")
+    repetitions = Column(Integer, nullable=False, default=0, server_default="0")
+    lapses = Column(Integer, nullable=False, default=0, server_default="0")
+
+    __table_args__ = (
+        Index("ix_Flashcards_stack_id_creation_date", "stack_id", "creation_date"),
+        # "Next N due cards across all my stacks": a range scan, not a sort.
+        Index("ix_Flashcards_user_id_next_review_date", "user_id", "next_review_date"),
+    )
+
+class CollectionVersion(Base):
+    # One counter per listing ("notes:<user_id>", "flashcards:<stack_id>", ...),
+    # bumped by triggers on every write. Listing endpoints derive their ETag and
+    # Last-Modified from this row instead of re-reading the collection.
+    __tablename__ = "CollectionVersions"
+    scope = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class SyncCounter(Base):
+    # Per-user change sequence for the sync API, advanced by triggers on every
+    # write to Notes, Folders, Stacks and Flashcards (see sync.py).
+    __tablename__ = "SyncCounters"
+    user_id = Column(String, primary_key=True)
+    seq = Column(Integer, nullable=False, default=0)
+
+class SyncLogEntry(Base):
+    # The latest change to every synced row, stamped with its owner's sequence
+    # number. Deleted rows stay behind as tombstones.
+    __tablename__ = "SyncLog"
+    entity = Column(String, primary_key=True)  # "note", "folder", "stack" or "flashcard"
+    entity_id = Column(Integer, primary_key=True)
+    user_id = Column(String, nullable=False)
+    seq = Column(Integer, nullable=False)
+    deleted = Column(Boolean, nullable=False, default=False, server_default="0")
+
+    __table_args__ = (
+        Index("ix_SyncLog_user_id_seq", "user_id", "seq"),
+    )
+
+class SyncOperation(Base):
+    # Results of applied offline writes by client operation id, so a push that
+    # is retried after a lost response is not applied twice.
+    __tablename__ = "SyncOperations"
+    user_id = Column(String, primary_key=True)
+    op_id = Column(String, primary_key=True)
+    result = Column(Text, nullable=False)  # JSON
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_SyncOperations_created_at", "created_at"),
+    )
+
+class Media(Base):
+    # Shared (not per-user) catalog of searchable media, e.g. YouTube videos.
+    __tablename__ = "Media"
+    media_id = Column(Integer, primary_key=True, index=True)
+    external_id = Column(String, unique=True, nullable=False)  # e.g. the YouTube video id
+    media_type = Column(String, nullable=False)
+    title = Column(String, nullable=False)
+    author = Column(String, nullable=False, default="")
+    url = Column(String, nullable=False)
+    thumbnail_url = Column(String, nullable=False, default="")
+    # Kept in sync with the transcript on (re)indexing, so hits and Range
+    # requests never have to aggregate over the segments.
+    duration = Column(Float)
+    segment_count = Column(Integer, nullable=False, default=0, server_default="0")
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    segments = relationship("TranscriptSegment", cascade="all, delete-orphan", passive_deletes=True, order_by="TranscriptSegment.start")
+
+class TranscriptSegment(Base):
+    __tablename__ = "TranscriptSegments"
+    segment_id = Column(Integer, primary_key=True, index=True)
+    media_id = Column(Integer, ForeignKey("Media.media_id", ondelete="CASCADE"), nullable=False)
+    start = Column(Float, nullable=False)  # seconds from the beginning of the media
+    end = Column(Float)
+    text = Column(Text, nullable=False)
+
+    __table_args__ = (
+        Index("ix_TranscriptSegments_media_id_start", "media_id", "start"),
+    )
+
+class CollectedItem(Base):
+    __tablename__ = "CollectedItems"
+    item_id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(String, nullable=False)
+    selected_text = Column(Text)
+    source_url = Column(String)
+    page_title = Column(String)
+    is_translation = Column(Boolean, default=False)
+    original_text = Column(Text)
+    translated_text = Column(Text)
+    source_language = Column(String)
+    target_language = Column(String)
+    timestamp_collected = Column(String, nullable=False, default=func.now())
+
+    __table_args__ = (
+        # "Most recent items of this user" for the workspace snapshot.
+        Index("ix_CollectedItems_user_id_item_id", "user_id", "item_id"),
+    )
+
+class TranslationLog(Base):
+    __tablename__ = "TranslationLogs"
+    log_id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(String, nullable=False)
+    original_text = Column(Text, nullable=False)
+    translated_text = Column(Text, nullable=False)
+    source_language = Column(String)
+    target_language = Column(String)
+    source_url = Column(String)
+    timestamp = Column(String, nullable=False)
+
+class TranslationCacheEntry(Base):
+    # Persistent tier of the translation cache, shared by every worker and
+    # surviving restarts. Keyed on a hash of the text so the index stays small.
+    __tablename__ = "TranslationCache"
+    backend = Column(String, primary_key=True)
+    source_lang = Column(String, primary_key=True)
+    target_lang = Column(String, primary_key=True)
+    text_hash = Column(String, primary_key=True)
+    source_text = Column(Text, nullable=False)
+    translated_text = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+# You would continue to define all other tables like CustomLists etc. here
 
 
 # In Backend1/models.py, add this class
@@ -0,0 +1,48 @@
+# FILE: Backend1/ndjson.py
+
+import json
+from typing import Any, AsyncIterator, Tuple
+
+from fastapi import Request
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+NDJSON_MEDIA_TYPES = (NDJSON_MEDIA_TYPE, "application/jsonl", "application/ndjson")
+
+
+def content_type(request: Request) -> str:
+    return request.headers.get("content-type", "").split(";")[0].strip().lower()
+
+
+async def iter_lines(request: Request) -> AsyncIterator[str]:
+    """
+    Yields the decoded lines of a request body as the chunks arrive.
+    """
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8-sig").rstrip("\r")
+    if buffer:
+        yield buffer.decode("utf-8-sig").rstrip("\r")
+
+
+async def iter_json_lines(request: Request) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    Yields (line_number, value) for every non-blank line of an NDJSON body.
+    Raises ValueError naming the line when one is not valid JSON.
+    """
+    line_number = 0
+    async for line in iter_lines(request):
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            value = json.loads(line)
+        except ValueError:
+            raise ValueError(f"Line {line_number} is not valid JSON.")
+        yield line_number, value
+
+
+def encode_line(item: Any) -> bytes:
+    return json.dumps(item, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
@@ -0,0 +1,176 @@
+# FILE: Backend1/pagination.py
+
+import base64
+import json
+from typing import Any, List, Optional, Sequence, Tuple, Type
+
+import orjson
+from fastapi import HTTPException, Query, Response, status
+from pydantic import BaseModel
+from sqlalchemy import DateTime, String, and_, or_, select, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .metrics import timed
+
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# An ordering is a list of (column, descending) pairs that must end with a
+# unique column (the primary key) so every row has a distinct position.
+Ordering = Sequence[Tuple[Any, bool]]
+
+
+class PageParams:
+    """
+    Common query parameters for listing endpoints.
+
+    `limit` turns on keyset pagination (the cursor for the next page comes back
+    in the X-Next-Cursor header); without it the whole list is returned as before.
+    `fields` is a comma-separated projection, e.g. `fields=note_id,title`.
+    """
+
+    def __init__(
+        self,
+        limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; enables keyset pagination."),
+        cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's X-Next-Cursor header."),
+        fields: Optional[str] = Query(None, description="Comma-separated list of fields to return."),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+        self.fields = fields
+
+
+class Page:
+    def __init__(self, items: list, next_cursor: Optional[str], rendered: bool):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.rendered = rendered
+
+    def to_response(self, response: Response, headers: Optional[dict] = None):
+        """
+        ORM objects go through the route's response_model as usual. Plain dicts
+        (projections and the fast path) are encoded with orjson into a ready-made
+        response, skipping per-row Pydantic validation.
+        """
+        headers = dict(headers or {})
+        if self.next_cursor:
+            headers[NEXT_CURSOR_HEADER] = self.next_cursor
+        if self.rendered:
+            return render_json(self.items, headers)
+        response.headers.update(headers)
+        return self.items
+
+
+def render_json(content: Any, headers: Optional[dict] = None) -> Response:
+    # orjson writes datetimes in the same ISO 8601 form Pydantic does.
+    with timed("serialization"):
+        body = orjson.dumps(content)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _bad_request(detail: str):
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(values)).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, ordering: Ordering) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except ValueError:
+        raise _bad_request("Invalid cursor.")
+    if (
+        not isinstance(values, list)
+        or len(values) != len(ordering)
+        or not all(v is None or isinstance(v, (str, int, float)) for v in values)
+    ):
+        raise _bad_request("Invalid cursor.")
+    return values
+
+
+def _sort_key(column):
+    """
+    Timestamps are compared as the raw strings SQLite stores. Rows written by
+    CURRENT_TIMESTAMP and by Python use different string formats, so a
+    round-trip through `datetime` would not compare equal to the stored value.
+    type_coerce adds no SQL, so the composite indexes still apply.
+    """
+    return type_coerce(column, String) if isinstance(column.type, DateTime) else column
+
+
+def parse_fields(fields: Optional[str], schema: Type[BaseModel]) -> Optional[List[str]]:
+    if not fields:
+        return None
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in schema.model_fields]
+    if unknown or not requested:
+        allowed = ", ".join(schema.model_fields)
+        raise _bad_request(f"Unknown field(s): {', '.join(unknown) or fields}. Allowed: {allowed}.")
+    return list(dict.fromkeys(requested))
+
+
+def after_cursor(ordering: Ordering, values: Sequence[Any]):
+    """
+    Builds the keyset predicate "row comes after `values` in `ordering`":
+    (a > x) OR (a = x AND b > y) OR ... with > flipped to < for descending columns.
+    """
+    clauses = []
+    for i, ((column, descending), value) in enumerate(zip(ordering, values)):
+        step = column < value if descending else column > value
+        equal_prefix = [col == val for (col, _), val in zip(ordering[:i], values[:i])]
+        clauses.append(and_(*equal_prefix, step))
+    return or_(*clauses)
+
+
+async def fetch_page(
+    db: AsyncSession,
+    model,
+    where: Sequence[Any],
+    ordering: Ordering,
+    schema: Type[BaseModel],
+    params: PageParams,
+    fast: bool = False,
+) -> Page:
+    """
+    Runs a user-scoped listing query with optional keyset pagination and column
+    projection. With a projection only the requested (plus ordering) columns are
+    read from the database, so large text columns are never loaded.
+
+    `fast=True` opts the endpoint into the serialization fast path: the schema's
+    fields are selected as plain columns (no ORM objects) and rendered straight
+    to JSON. Only use it where every schema field is a column of `model` whose
+    stored values already match the schema's types.
+    """
+    fields = parse_fields(params.fields, schema)
+    if fields is None and fast:
+        fields = list(schema.model_fields)
+    sort_keys = [_sort_key(column) for column, _ in ordering]
+    key_labels = [key.label(f"_sort_key_{i}") for i, key in enumerate(sort_keys)]
+    if fields is None:
+        stmt = select(model, *key_labels)
+    else:
+        stmt = select(*[getattr(model, f) for f in fields], *key_labels)
+
+    stmt = stmt.where(*where)
+    if params.cursor:
+        keyed_ordering = [(key, descending) for key, (_, descending) in zip(sort_keys, ordering)]
+        stmt = stmt.where(after_cursor(keyed_ordering, decode_cursor(params.cursor, ordering)))
+    stmt = stmt.order_by(*[column.desc() if descending else column.asc() for column, descending in ordering])
+    if params.limit is not None:
+        # Fetch one extra row to learn whether another page exists.
+        stmt = stmt.limit(params.limit + 1)
+
+    rows = (await db.execute(stmt)).all()
+    next_cursor = None
+    if params.limit is not None and len(rows) > params.limit:
+        rows = rows[:params.limit]
+        next_cursor = encode_cursor([rows[-1]._mapping[label.name] for label in key_labels])
+
+    if fields is None:
+        items = [row[0] for row in rows]
+    else:
+        items = [dict(zip(fields, row)) for row in rows]
+    return Page(items, next_cursor, rendered=fields is not None)
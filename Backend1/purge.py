@@ -0,0 +1,135 @@
+# FILE: Backend1/purge.py
+
+import asyncio
+import logging
+import os
+from typing import Callable, Dict, Tuple
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models
+from .changefeed import Broker
+from .database import AsyncSessionLocal, run_write
+
+logger = logging.getLogger(__name__)
+
+# Child rows deleted (or un-linked) per transaction, and the pause between
+# chunks that lets other writers take the database lock.
+PURGE_CHUNK_SIZE = int(os.getenv("PURGE_CHUNK_SIZE", "1000"))
+PURGE_CHUNK_PAUSE_MS = float(os.getenv("PURGE_CHUNK_PAUSE_MS", "10"))
+
+
+def _flashcards_chunk(stack_id: int, limit: int):
+    ids = select(models.Flashcard.flashcard_id).where(models.Flashcard.stack_id == stack_id).limit(limit)
+    return delete(models.Flashcard).where(models.Flashcard.flashcard_id.in_(ids))
+
+
+def _notes_chunk(folder_id: int, limit: int):
+    ids = select(models.Note.note_id).where(models.Note.folder_id == folder_id).limit(limit)
+    return (
+        update(models.Note).where(models.Note.note_id.in_(ids))
+        .values(folder_id=None, version=models.Note.version + 1, last_modified_date=func.now())
+        .execution_options(synchronize_session=False)
+    )
+
+
+# entity -> (parent model, primary key, statement for one chunk of its children).
+# Deleting the parent row itself relies on the foreign keys: Flashcards are
+# removed by ON DELETE CASCADE and Notes un-filed by ON DELETE SET NULL.
+PURGE_TARGETS: Dict[str, Tuple[type, object, Callable]] = {
+    "stack": (models.Stack, models.Stack.stack_id, _flashcards_chunk),
+    "folder": (models.Folder, models.Folder.folder_id, _notes_chunk),
+}
+
+
+class Purger:
+    """
+    Deletes stacks and folders with set-based statements instead of loading
+    their flashcards / notes through the ORM cascade.
+
+    The first chunk of children is handled by the request. When that was all
+    of them the parent is deleted in the same transaction; otherwise a
+    background task works through the rest one short transaction per chunk and
+    deletes the parent last, so a 50k-card deck neither blocks the request nor
+    holds the write lock for the whole delete. Until then the parent is still
+    visible; if the process stops midway, deleting it again resumes. Every
+    chunk goes through database.run_write, so in production it is queued
+    behind the group-commit writer instead of competing with it.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        chunk_size: int = PURGE_CHUNK_SIZE,
+        pause: float = PURGE_CHUNK_PAUSE_MS / 1000,
+    ):
+        self.session_factory = session_factory
+        self.chunk_size = chunk_size
+        self.pause = pause
+        self._tasks: Dict[Tuple[str, int], asyncio.Task] = {}
+
+    def pending(self, entity: str, entity_id: int) -> bool:
+        task = self._tasks.get((entity, entity_id))
+        return task is not None and not task.done()
+
+    async def delete(self, db: AsyncSession, entity: str, user_id: str, entity_id: int, feed: Broker) -> bool:
+        """
+        Deletes the user's stack or folder. Returns True if it is gone, False
+        if the rest of the delete was handed to the background.
+        """
+        if self.pending(entity, entity_id):
+            return False
+        if await run_write(db, lambda session: self._step(session, entity, user_id, entity_id)):
+            await feed.publish(user_id, entity, "deleted", entity_id)
+            return True
+        task = asyncio.get_running_loop().create_task(self._run(entity, user_id, entity_id, feed))
+        self._tasks[(entity, entity_id)] = task
+        task.add_done_callback(lambda _: self._tasks.pop((entity, entity_id), None))
+        return False
+
+    async def drain(self):
+        """
+        Waits for the background deletes that are running.
+        """
+        while self._tasks:
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+    async def close(self):
+        """
+        Stops the background deletes; their parents are left in place.
+        """
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def _step(self, session: AsyncSession, entity: str, user_id: str, entity_id: int) -> bool:
+        """
+        Deletes (or un-links) one chunk of children, and the parent too once
+        that was the last of them. Returns True when the parent is gone.
+        """
+        model, key, chunk = PURGE_TARGETS[entity]
+        if (await session.execute(chunk(entity_id, self.chunk_size))).rowcount >= self.chunk_size:
+            return False
+        await session.execute(delete(model).where(key == entity_id, model.user_id == user_id))
+        return True
+
+    async def _run(self, entity: str, user_id: str, entity_id: int, feed: Broker):
+        try:
+            while True:
+                await asyncio.sleep(self.pause)
+                async with self.session_factory() as session:
+                    if await run_write(session, lambda s: self._step(s, entity, user_id, entity_id)):
+                        await feed.publish(user_id, entity, "deleted", entity_id)
+                        return
+        except Exception:
+            logger.exception("Background delete of %s %d failed.", entity, entity_id)
+
+
+purger = Purger(AsyncSessionLocal)
+
+
+def get_purger() -> Purger:
+    return purger
@@ -0,0 +1,51 @@
+# FILE: Backend1/scheduler.py
+
+from datetime import datetime, timedelta
+
+# SM-2 (SuperMemo 2) spaced-repetition scheduling.
+# Grades: 0-2 = forgotten (the card starts over), 3 = hard, 4 = good, 5 = easy.
+PASSING_GRADE = 3
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+FIRST_INTERVAL_DAYS = 1.0
+SECOND_INTERVAL_DAYS = 6.0
+
+
+def next_ease(ease: float, grade: int) -> float:
+    miss = 5 - grade
+    return max(MIN_EASE, ease + 0.1 - miss * (0.08 + miss * 0.02))
+
+
+def schedule_review(card: dict, grade: int, reviewed_at: datetime) -> dict:
+    """
+    Applies one review to a card's scheduling state and returns the new state.
+    `card` holds interval_days, ease, repetitions and lapses (the Flashcard
+    columns of the same names); the result adds due_at and last_reviewed_at.
+    """
+    ease = card.get("ease") or DEFAULT_EASE
+    repetitions = card.get("repetitions") or 0
+    lapses = card.get("lapses") or 0
+    interval = card.get("interval_days") or 0.0
+
+    if grade < PASSING_GRADE:
+        repetitions = 0
+        lapses += 1
+        interval = FIRST_INTERVAL_DAYS
+    else:
+        if repetitions == 0:
+            interval = FIRST_INTERVAL_DAYS
+        elif repetitions == 1:
+            interval = SECOND_INTERVAL_DAYS
+        else:
+            interval = round(interval * ease, 2)
+        repetitions += 1
+    ease = next_ease(ease, grade)
+
+    return {
+        "interval_days": interval,
+        "ease": round(ease, 4),
+        "repetitions": repetitions,
+        "lapses": lapses,
+        "last_reviewed_at": reviewed_at,
+        "due_at": reviewed_at + timedelta(days=interval),
+    }
@@ -1,8 +1,8 @@
 # FILE: src/Backend1/schemas.py
 
 from __future__ import annotations
-from pydantic import BaseModel, ConfigDict
-from typing import Optional, List
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Annotated, Literal, Optional, List, Union
 from datetime import datetime
 
 # Define the new configuration once to be reused across all schemas
@@ -23,6 +23,13 @@ class User(UserBase):
     is_active: bool
     model_config = model_config
 
+class CurrentUser(User):
+    """
+    The authenticated user returned by security.get_current_user. It is cached
+    and shared between requests, so it is frozen and holds no Session state.
+    """
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
 class Token(BaseModel):
     access_token: str
     token_type: str
@@ -58,8 +65,27 @@ class NoteItem(NoteBase):
     user_id: str
     creation_date: datetime
     last_modified_date: datetime
+    version: int = 1
     model_config = model_config
 
+class TextEdit(BaseModel):
+    # Offsets into the base version's content, in UTF-16 code units
+    # (the same as JavaScript string indices). `end` is exclusive.
+    start: int
+    end: int
+    text: str = ""
+
+class NotePatch(BaseModel):
+    base_version: Optional[int] = None  # alternative to an If-Match header
+    edits: List[TextEdit] = []
+    title: Optional[str] = None
+    folder_id: Optional[int] = None
+
+class NoteVersion(BaseModel):
+    note_id: int
+    version: int
+    last_modified_date: datetime
+
 
 # --- Stack (Collection) & Flashcard Schemas ---
 
@@ -83,8 +109,28 @@ class FlashcardBase(BaseModel):
 class FlashcardItem(FlashcardBase):
     flashcard_id: int
     stack_id: int
+    due_at: Optional[datetime] = None
+    interval_days: float = 0.0
+    ease: float = 2.5
+    repetitions: int = 0
     model_config = model_config
 
+class CardReview(BaseModel):
+    flashcard_id: int
+    grade: int = Field(..., ge=0, le=5)  # SM-2: 0-2 forgotten, 3 hard, 4 good, 5 easy
+    reviewed_at: Optional[datetime] = None  # when reviewed offline; defaults to now
+
+class ReviewBatch(BaseModel):
+    reviews: List[CardReview] = Field(..., min_length=1, max_length=1000)
+
+class ReviewResult(BaseModel):
+    flashcard_id: int
+    due_at: datetime
+    interval_days: float
+    ease: float
+    repetitions: int
+    lapses: int
+
 class ItemForDeck(BaseModel):
     text: str
 
@@ -92,9 +138,22 @@ class DeckFromItemsCreate(BaseModel):
     deck_name: str
     items: List[ItemForDeck]
 
+class DeckImportStatus(BaseModel):
+    import_id: str
+    status: str  # "running", "completed" or "failed"
+    received: int = 0  # rows parsed from the upload so far
+    inserted: int
+    stack_id: Optional[int] = None
+    detail: Optional[str] = None
+
 
 # --- Other Feature Schemas ---
 
+class MediaSegmentMatch(BaseModel):
+    start: float
+    end: Optional[float] = None
+    text: str  # matched terms wrapped in <mark> tags
+
 class MediaSearchResult(BaseModel):
     id: str
     media_type: str
@@ -102,14 +161,35 @@ class MediaSearchResult(BaseModel):
     author: str
     url: str
     thumbnail_url: str
-    transcript: Optional[List[dict]] = None
+    duration: Optional[float] = None
+    segment_count: int = 0
+    # Streams the transcript as NDJSON; supports `Range: seconds=<from>-<to>`
+    transcript_url: str
+    matches: List[MediaSegmentMatch] = []
     model_config = model_config
 
+class SearchHit(BaseModel):
+    type: str  # "note" or "flashcard"
+    id: int
+    title: Optional[str] = None
+    snippet: Optional[str] = None
+    rank: float
+
 class TranslateRequest(BaseModel):
     text: str
     source_lang: str = 'auto'
     target_lang: str = 'en'
 
+class TranslationSegment(BaseModel):
+    # Optional client key (e.g. a subtitle cue id) echoed back with the result
+    id: Optional[Union[int, str]] = None
+    text: str
+
+class BatchTranslateRequest(BaseModel):
+    segments: List[Union[str, TranslationSegment]]
+    source_lang: str = 'auto'
+    target_lang: str = 'en'
+
 class TranslationLogCreate(BaseModel):
     originalText: str
     translatedText: str
@@ -134,4 +214,151 @@ class GenericSuccessResponse(BaseModel):
 class TextItemCreate(BaseModel):
     text: str
     source_url: Optional[str] = None
-    page_title: Optional[str] = None
\ No newline at end of file
+    page_title: Optional[str] = None
+
+class TextItemBatch(BaseModel):
+    items: List[TextItemCreate]
+
+
+# --- Workspace Snapshot ---
+
+class NoteSummary(BaseModel):
+    note_id: int
+    title: Optional[str] = None
+    folder_id: Optional[int] = None
+    last_modified_date: datetime
+    version: int = 1
+    model_config = model_config
+
+class WorkspaceFolder(FolderItem):
+    notes: List[NoteSummary] = []
+
+class CardSummary(BaseModel):
+    flashcard_id: int
+    front_text: str
+    back_text: Optional[str] = None
+    due_at: Optional[datetime] = None
+    model_config = model_config
+
+class WorkspaceStack(StackResponseItem):
+    card_count: int = 0
+    due_count: int = 0
+    cards: Optional[List[CardSummary]] = None  # only with ?include_cards=true
+
+class RecentItem(BaseModel):
+    item_id: int
+    selected_text: Optional[str] = None
+    source_url: Optional[str] = None
+    page_title: Optional[str] = None
+    timestamp_collected: Optional[str] = None
+    model_config = model_config
+
+class WorkspaceSnapshot(BaseModel):
+    folders: List[WorkspaceFolder]
+    unfiled_notes: List[NoteSummary]
+    stacks: List[WorkspaceStack]
+    recent_notes: List[NoteSummary]
+    recent_items: List[RecentItem]
+    generated_at: datetime
+
+
+# --- Offline Sync ---
+
+class SyncTombstone(BaseModel):
+    entity: str
+    entity_id: int
+    seq: int
+
+class SyncDelta(BaseModel):
+    seq: int  # send back as ?since= on the next pull
+    has_more: bool  # pull again right away
+    reset: bool = False  # the client is ahead of the server: drop local state and pull from 0
+    notes: List[NoteItem] = []
+    folders: List[FolderItem] = []
+    stacks: List[StackResponseItem] = []
+    flashcards: List[FlashcardItem] = []
+    deleted: List[SyncTombstone] = []
+
+class SyncWriteData(BaseModel):
+    title: Optional[str] = None
+    content: Optional[str] = None
+    folder_id: Optional[Union[int, str]] = None  # an id, or the op_id of a folder created offline
+    folder_name: Optional[str] = None
+
+class SyncWrite(BaseModel):
+    op_id: str = Field(..., min_length=1, max_length=100)  # client-chosen, unique per user
+    entity: Literal["note", "folder"]
+    action: Literal["create", "update", "delete"]
+    entity_id: Optional[Union[int, str]] = None  # an id, or the op_id of an earlier create
+    base_version: Optional[int] = None  # notes: the version the offline change was made on
+    data: SyncWriteData = SyncWriteData()
+
+class SyncPush(BaseModel):
+    writes: List[SyncWrite] = Field(..., min_length=1, max_length=1000)
+
+class SyncWriteResult(BaseModel):
+    op_id: str
+    status: str  # "applied", "conflict", "missing" or "invalid"
+    entity: str
+    entity_id: Optional[int] = None
+    version: Optional[int] = None
+    detail: Optional[str] = None
+    current: Optional[NoteItem] = None  # the server's copy of a conflicting note
+
+class SyncPushResult(BaseModel):
+    seq: int
+    results: List[SyncWriteResult]
+
+
+# --- Batch Mutations ---
+
+class BatchNoteFields(BaseModel):
+    title: Optional[str] = None
+    content: Optional[str] = None
+    folder_id: Optional[Union[int, str]] = None  # an id, or the ref of a folder.create in the batch
+
+class NoteCreateOperation(BaseModel):
+    op: Literal["note.create"]
+    ref: Optional[str] = None  # lets later operations in the batch refer to the new note
+    data: BatchNoteFields = BatchNoteFields()
+
+class NoteUpdateOperation(BaseModel):
+    op: Literal["note.update"]
+    note_id: Union[int, str]  # an id, or the ref of a note.create in the batch
+    base_version: Optional[int] = None  # fail with 409 if the note has moved on
+    data: BatchNoteFields  # only the fields sent are changed
+
+class NoteDeleteOperation(BaseModel):
+    op: Literal["note.delete"]
+    note_id: Union[int, str]
+    base_version: Optional[int] = None
+
+class FolderCreateOperation(BaseModel):
+    op: Literal["folder.create"]
+    ref: Optional[str] = None
+    data: FolderCreate
+
+class StackAddItemOperation(BaseModel):
+    op: Literal["stack.add_item"]
+    stack_id: int
+    data: TextItemCreate
+
+BatchOperation = Annotated[
+    Union[NoteCreateOperation, NoteUpdateOperation, NoteDeleteOperation, FolderCreateOperation, StackAddItemOperation],
+    Field(discriminator="op"),
+]
+
+class BatchRequest(BaseModel):
+    atomic: bool = True  # all or nothing; otherwise failed operations are skipped
+    operations: List[BatchOperation] = Field(..., min_length=1, max_length=1000)
+
+class BatchOperationResult(BaseModel):
+    index: int
+    status: int  # the HTTP status the operation would have had as its own request
+    id: Optional[int] = None
+    version: Optional[int] = None
+    detail: Optional[str] = None
+
+class BatchResult(BaseModel):
+    committed: bool
+    results: List[BatchOperationResult]
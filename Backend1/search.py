@@ -0,0 +1,158 @@
+# FILE: Backend1/search.py
+
+import re
+from typing import List
+
+from sqlalchemy import DDL, event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models
+
+# --- Full-Text Index (SQLite FTS5) ---
+# Both FTS tables are "external content" tables: they store only the inverted
+# index and read the text back from Notes / Flashcards. Triggers keep them in
+# sync with every INSERT, UPDATE and DELETE, whichever code path issues it.
+# user_id is indexed too, so a search is scoped to its user inside the MATCH
+# instead of filtering every user's hits afterwards.
+
+NOTES_FTS_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+        title, content, user_id,
+        content='Notes', content_rowid='note_id', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS notes_fts_ai AFTER INSERT ON "Notes" BEGIN
+        INSERT INTO notes_fts(rowid, title, content, user_id) VALUES (new.note_id, new.title, new.content, new.user_id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS notes_fts_ad AFTER DELETE ON "Notes" BEGIN
+        INSERT INTO notes_fts(notes_fts, rowid, title, content, user_id) VALUES ('delete', old.note_id, old.title, old.content, old.user_id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS notes_fts_au AFTER UPDATE OF title, content, user_id ON "Notes" BEGIN
+        INSERT INTO notes_fts(notes_fts, rowid, title, content, user_id) VALUES ('delete', old.note_id, old.title, old.content, old.user_id);
+        INSERT INTO notes_fts(rowid, title, content, user_id) VALUES (new.note_id, new.title, new.content, new.user_id);
+    END""",
+]
+
+FLASHCARDS_FTS_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS flashcards_fts USING fts5(
+        front_text, back_text, user_id,
+        content='Flashcards', content_rowid='flashcard_id', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS flashcards_fts_ai AFTER INSERT ON "Flashcards" BEGIN
+        INSERT INTO flashcards_fts(rowid, front_text, back_text, user_id) VALUES (new.flashcard_id, new.front_text, new.back_text, new.user_id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS flashcards_fts_ad AFTER DELETE ON "Flashcards" BEGIN
+        INSERT INTO flashcards_fts(flashcards_fts, rowid, front_text, back_text, user_id) VALUES ('delete', old.flashcard_id, old.front_text, old.back_text, old.user_id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS flashcards_fts_au AFTER UPDATE OF front_text, back_text, user_id ON "Flashcards" BEGIN
+        INSERT INTO flashcards_fts(flashcards_fts, rowid, front_text, back_text, user_id) VALUES ('delete', old.flashcard_id, old.front_text, old.back_text, old.user_id);
+        INSERT INTO flashcards_fts(rowid, front_text, back_text, user_id) VALUES (new.flashcard_id, new.front_text, new.back_text, new.user_id);
+    END""",
+]
+
+# Create / drop the FTS tables together with their content tables, so
+# `Base.metadata.create_all()` (used by the tests) gets a working index.
+for statement in NOTES_FTS_DDL:
+    event.listen(models.Note.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+for statement in FLASHCARDS_FTS_DDL:
+    event.listen(models.Flashcard.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+event.listen(models.Note.__table__, "after_drop", DDL("DROP TABLE IF EXISTS notes_fts").execute_if(dialect="sqlite"))
+event.listen(models.Flashcard.__table__, "after_drop", DDL("DROP TABLE IF EXISTS flashcards_fts").execute_if(dialect="sqlite"))
+
+
+# --- Querying ---
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_END = "</mark>"
+SNIPPET_TOKENS = 12
+# bm25() column weights: matches in titles / card fronts count more, and the
+# user_id column (matched by every hit) does not count at all.
+NOTE_WEIGHTS = (10.0, 1.0, 0.0)
+FLASHCARD_WEIGHTS = (5.0, 1.0, 0.0)
+
+_TERM_PATTERN = re.compile(r"[\w']+\*?", re.UNICODE)
+
+
+def build_match_query(query: str) -> str:
+    """
+    Turns free user input into a safe FTS5 MATCH expression. Every term is
+    quoted (so FTS operators in the input are treated as text) and all terms
+    must match. `term*` is a prefix query, and the last term is always treated
+    as a prefix so results update while the user is still typing.
+    """
+    terms = _TERM_PATTERN.findall(query)
+    parts = []
+    for i, term in enumerate(terms):
+        is_prefix = term.endswith("*") or i == len(terms) - 1
+        word = term.rstrip("*").replace('"', '""')
+        if word:
+            parts.append(f'"{word}"' + ("*" if is_prefix else ""))
+    return " ".join(parts)
+
+
+def scope_match_query(match: str, user_id, columns) -> str:
+    """
+    Restricts a build_match_query() expression to the text `columns` of one
+    user's rows. The user id is matched as a phrase at the start of the
+    indexed user_id column, so FTS5 intersects the terms with that user's
+    posting list rather than ranking every user's hits.
+    """
+    user = str(user_id).replace('"', '""')
+    return f'user_id : ^"{user}" AND {{{" ".join(columns)}}} : ({match})'
+
+
+_NOTES_SEARCH_SQL = text(f"""
+    SELECT notes_fts.rowid AS id,
+           highlight(notes_fts, 0, :hl_start, :hl_end) AS title,
+           snippet(notes_fts, 1, :hl_start, :hl_end, '…', {SNIPPET_TOKENS}) AS snippet,
+           bm25(notes_fts, {NOTE_WEIGHTS[0]}, {NOTE_WEIGHTS[1]}, {NOTE_WEIGHTS[2]}) AS rank
+    FROM notes_fts
+    WHERE notes_fts MATCH :match
+      AND notes_fts.user_id = :user_id  -- exact check of the few rows the MATCH already scoped
+    ORDER BY rank
+    LIMIT :limit
+""")
+
+_FLASHCARDS_SEARCH_SQL = text(f"""
+    SELECT flashcards_fts.rowid AS id,
+           highlight(flashcards_fts, 0, :hl_start, :hl_end) AS title,
+           snippet(flashcards_fts, 1, :hl_start, :hl_end, '…', {SNIPPET_TOKENS}) AS snippet,
+           bm25(flashcards_fts, {FLASHCARD_WEIGHTS[0]}, {FLASHCARD_WEIGHTS[1]}, {FLASHCARD_WEIGHTS[2]}) AS rank
+    FROM flashcards_fts
+    WHERE flashcards_fts MATCH :match
+      AND flashcards_fts.user_id = :user_id  -- exact check of the few rows the MATCH already scoped
+    ORDER BY rank
+    LIMIT :limit
+""")
+
+# type -> (query, text columns the terms are matched against).
+SEARCHABLE_TYPES = {
+    "note": (_NOTES_SEARCH_SQL, ("title", "content")),
+    "flashcard": (_FLASHCARDS_SEARCH_SQL, ("front_text", "back_text")),
+}
+
+
+async def search(db: AsyncSession, user_id, query: str, types: List[str], limit: int) -> List[dict]:
+    """
+    Returns up to `limit` hits across the requested types, best match first.
+    Lower bm25 ranks are better; hits from different tables are merged on rank.
+    """
+    match = build_match_query(query)
+    if not match:
+        return []
+    params = {"user_id": str(user_id), "limit": limit, "hl_start": HIGHLIGHT_START, "hl_end": HIGHLIGHT_END}
+    hits = []
+    for result_type in types:
+        statement, columns = SEARCHABLE_TYPES[result_type]
+        scoped = {**params, "match": scope_match_query(match, user_id, columns)}
+        rows = (await db.execute(statement, scoped)).mappings().all()
+        hits.extend({"type": result_type, **row} for row in rows)
+    hits.sort(key=lambda hit: hit["rank"])
+    return hits[:limit]
+
+
+def rebuild_search_index(connection):
+    """
+    Re-reads all content into the FTS tables (after migrations or bulk repairs).
+    """
+    connection.exec_driver_sql("INSERT INTO notes_fts(notes_fts) VALUES ('rebuild')")
+    connection.exec_driver_sql("INSERT INTO flashcards_fts(flashcards_fts) VALUES ('rebuild')")
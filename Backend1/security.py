@@ -4,31 +4,44 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 # Import models and schemas for type checking and database lookups
 from . import models, schemas
-from .database import get_db
+from .cache import TTLCache
+from .hashing import BCRYPT_ROUNDS, PasswordHasher
+from .database import get_async_db
+from .metrics import timed
 
 # NOTE: In a real production app, this MUST be loaded from a secure environment variable.
 SECRET_KEY = "your-super-secret-key-that-is-long-and-random"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# In-process auth caches. Decoded tokens live until their own `exp`; user rows
+# are re-read at least every USER_CACHE_TTL_SECONDS and are dropped as soon as
+# the User row is updated or deleted through the ORM.
+TOKEN_CACHE_MAXSIZE = 4096
+USER_CACHE_MAXSIZE = 1024
+USER_CACHE_TTL_SECONDS = 60
+
 # This tells FastAPI's security system where the client should go to get the token.
 # The path "token" corresponds to the endpoint in your auth.py router.
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 # --- Password Hashing ---
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+# All bcrypt work goes through this bounded pool instead of the request thread.
+password_hasher = PasswordHasher(pwd_context)
 
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_hasher.verify(plain_password, hashed_password)
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return password_hasher.hash(password)
 
 # --- JWT Token Creation ---
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -41,35 +54,90 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+# --- Auth Caches ---
+_token_cache = TTLCache(maxsize=TOKEN_CACHE_MAXSIZE)
+_user_cache = TTLCache(maxsize=USER_CACHE_MAXSIZE, ttl=USER_CACHE_TTL_SECONDS)
+
+def invalidate_user(email: str):
+    """
+    Drops a user (and every cached token that resolves to them) from the auth caches.
+    Call this after bulk `query.update()` writes, which bypass the ORM events below.
+    """
+    _user_cache.pop(email)
+    _token_cache.discard_where(lambda _token, cached_email: cached_email == email)
+
+def clear_auth_cache():
+    _token_cache.clear()
+    _user_cache.clear()
+
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target):
+    emails = {target.email}
+    history = inspect(target).attrs.email.history
+    emails.update(e for e in history.deleted or () if e)
+    for email in emails:
+        invalidate_user(email)
+
+def _decode_token_subject(token: str) -> Optional[str]:
+    """
+    Returns the `sub` claim of a valid token, decoding it at most once per token lifetime.
+    """
+    email = _token_cache.get(token)
+    if email is not None:
+        return email
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    email = payload.get("sub")
+    if email is None:
+        return None
+    _token_cache.set(token, email, expires_at=payload.get("exp"))
+    return email
+
 # --- User Authentication & Dependency ---
-def authenticate_user(db: Session, email: str, password: str):
-    user = db.query(models.User).filter(models.User.email == email).first()
+async def authenticate_user(db: AsyncSession, email: str, password: str):
+    user = await db.scalar(select(models.User).where(models.User.email == email))
     if not user:
         return False
-    if not verify_password(password, user.hashed_password):
+    is_valid, new_hash = await password_hasher.verify_and_update_async(password, user.hashed_password)
+    if not is_valid:
         return False
+    if new_hash:
+        # The stored hash was made with an older cost factor; upgrade it transparently.
+        user.hashed_password = new_hash
+        await db.commit()
     return user
 
-def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)):
+async def get_current_user(db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)) -> schemas.CurrentUser:
+    with timed("auth"):
+        return await _resolve_user(db, token)
+
+async def _resolve_user(db: AsyncSession, token: str) -> schemas.CurrentUser:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-        token_data = schemas.TokenData(email=email)
-    except JWTError:
+    email = _decode_token_subject(token)
+    if email is None:
         raise credentials_exception
-    user = db.query(models.User).filter(models.User.email == token_data.email).first()
+    token_data = schemas.TokenData(email=email)
+
+    cached_user = _user_cache.get(token_data.email)
+    if cached_user is not None:
+        return cached_user
+
+    user = await db.scalar(select(models.User).where(models.User.email == token_data.email))
     if user is None:
         raise credentials_exception
-    return user
+    # An immutable snapshot rather than the row itself, which belongs to this request's Session.
+    cached_user = schemas.CurrentUser.model_validate(user)
+    _user_cache.set(token_data.email, cached_user)
+    return cached_user
 
-def get_current_active_user(current_user: models.User = Depends(get_current_user)):
+async def get_current_active_user(current_user: schemas.CurrentUser = Depends(get_current_user)) -> schemas.CurrentUser:
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
\ No newline at end of file
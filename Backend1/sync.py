@@ -0,0 +1,258 @@
+# FILE: Backend1/sync.py
+"""
+Offline sync. Every write to a synced table advances its owner's counter in
+SyncCounters and stamps the row's SyncLog entry with the new value, so
+"what changed since N" is an index range scan over SyncLog. Deletes leave
+the entry behind as a tombstone. Like the collection versions in
+conditional.py, the bookkeeping is done by triggers, so it covers every write
+path (ORM, bulk inserts, cascades) and every worker process.
+
+SQLite runs one write transaction at a time, so sequence numbers become
+visible in order and a client never skips a change by pulling from the
+highest number it has seen.
+"""
+
+import json
+import os
+from typing import Dict, List, Optional, Tuple, Union
+
+from sqlalchemy import DDL, delete, event, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models
+from . import schemas
+
+# Changes returned by one pull, unless the client asks for fewer.
+SYNC_PAGE_SIZE = int(os.getenv("SYNC_PAGE_SIZE", "500"))
+MAX_SYNC_PAGE_SIZE = 5000
+# How long applied operation ids are remembered for deduplicating retried pushes.
+SYNC_OPERATION_TTL_DAYS = int(os.getenv("SYNC_OPERATION_TTL_DAYS", "30"))
+
+# --- Sequence Triggers ---
+
+# table -> (entity name, primary key column)
+SYNCED_TABLES = {
+    "Notes": ("note", "note_id"),
+    "Folders": ("folder", "folder_id"),
+    "Stacks": ("stack", "stack_id"),
+    "Flashcards": ("flashcard", "flashcard_id"),
+}
+
+_STAMP = """INSERT INTO "SyncCounters"(user_id, seq) VALUES ({row}.user_id, 1)
+        ON CONFLICT(user_id) DO UPDATE SET seq = seq + 1;
+        INSERT INTO "SyncLog"(entity, entity_id, user_id, seq, deleted)
+        VALUES ('{entity}', {row}.{pk}, {row}.user_id, (SELECT seq FROM "SyncCounters" WHERE user_id = {row}.user_id), {deleted})
+        ON CONFLICT(entity, entity_id) DO UPDATE SET user_id = excluded.user_id, seq = excluded.seq, deleted = excluded.deleted;"""
+
+
+def sync_trigger_ddl(table: str) -> list:
+    entity, pk = SYNCED_TABLES[table]
+    name = f"{table.lower()}_sync"
+    return [
+        f"""CREATE TRIGGER IF NOT EXISTS {name}_ai AFTER INSERT ON "{table}" BEGIN
+        {_STAMP.format(row="new", entity=entity, pk=pk, deleted=0)}
+    END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {name}_au AFTER UPDATE ON "{table}" BEGIN
+        {_STAMP.format(row="new", entity=entity, pk=pk, deleted=0)}
+    END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {name}_ad AFTER DELETE ON "{table}" BEGIN
+        {_STAMP.format(row="old", entity=entity, pk=pk, deleted=1)}
+    END""",
+    ]
+
+
+for _model in (models.Note, models.Folder, models.Stack, models.Flashcard):
+    for _statement in sync_trigger_ddl(_model.__tablename__):
+        event.listen(_model.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+
+
+async def current_seq(db: AsyncSession, user_id: str) -> int:
+    return await db.scalar(select(models.SyncCounter.seq).where(models.SyncCounter.user_id == user_id)) or 0
+
+
+# --- Pull ---
+
+_ENTITY_MODELS = {
+    "note": (models.Note, models.Note.note_id),
+    "folder": (models.Folder, models.Folder.folder_id),
+    "stack": (models.Stack, models.Stack.stack_id),
+    "flashcard": (models.Flashcard, models.Flashcard.flashcard_id),
+}
+_DELTA_FIELDS = {"note": "notes", "folder": "folders", "stack": "stacks", "flashcard": "flashcards"}
+
+
+async def fetch_delta(db: AsyncSession, user_id: str, since: int, limit: int = SYNC_PAGE_SIZE) -> dict:
+    """
+    The user's rows changed after sequence `since`, oldest change first, and
+    tombstones for those deleted. At most `limit` changes; `has_more` says
+    whether the client should pull again from the returned `seq`.
+    """
+    seq = await current_seq(db, user_id)
+    if since > seq:
+        return {"seq": seq, "has_more": False, "reset": True}
+
+    entries = (await db.execute(
+        select(models.SyncLogEntry.entity, models.SyncLogEntry.entity_id, models.SyncLogEntry.seq, models.SyncLogEntry.deleted)
+        .where(models.SyncLogEntry.user_id == user_id, models.SyncLogEntry.seq > since)
+        .order_by(models.SyncLogEntry.seq)
+        .limit(limit + 1)
+    )).all()
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    delta = {"seq": entries[-1].seq if has_more else seq, "has_more": has_more, "deleted": []}
+    changed: Dict[str, List[int]] = {}
+    for entry in entries:
+        if entry.deleted:
+            delta["deleted"].append({"entity": entry.entity, "entity_id": entry.entity_id, "seq": entry.seq})
+        else:
+            changed.setdefault(entry.entity, []).append(entry.entity_id)
+    # One SELECT ... IN (...) per entity type, however many rows changed.
+    for entity, ids in changed.items():
+        model, pk = _ENTITY_MODELS[entity]
+        delta[_DELTA_FIELDS[entity]] = (await db.scalars(select(model).where(pk.in_(ids), model.user_id == user_id).order_by(pk))).all()
+    return delta
+
+
+# --- Push ---
+
+# write action -> change-feed op
+CHANGE_OPS = {"create": "created", "update": "updated", "delete": "deleted"}
+
+class InvalidWrite(ValueError):
+    """An offline write that cannot be applied as sent (bad reference or data)."""
+
+
+def _result(write: schemas.SyncWrite, status: str, entity_id: Optional[int] = None, **extra) -> dict:
+    return {"op_id": write.op_id, "status": status, "entity": write.entity, "entity_id": entity_id, **extra}
+
+
+class WriteBatch:
+    """
+    Applies a user's queued offline writes on one session, in order. Writes
+    refer to rows created earlier in the batch (or in an earlier push) by the
+    creating write's op_id. Applied writes are recorded by op_id, so a
+    retried push returns the original results instead of applying them again.
+    """
+
+    def __init__(self, session: AsyncSession, user_id: str):
+        self.session = session
+        self.user_id = user_id
+        self.known: Dict[str, dict] = {}
+        # (write, result) for every write applied by this batch, not replayed
+        self.applied: List[Tuple[schemas.SyncWrite, dict]] = []
+
+    async def apply(self, writes: List[schemas.SyncWrite]) -> List[dict]:
+        refs = {w.op_id for w in writes}
+        refs.update(ref for w in writes for ref in (w.entity_id, w.data.folder_id) if isinstance(ref, str))
+        rows = await self.session.execute(
+            select(models.SyncOperation.op_id, models.SyncOperation.result)
+            .where(models.SyncOperation.user_id == self.user_id, models.SyncOperation.op_id.in_(refs))
+        )
+        self.known = {op_id: json.loads(result) for op_id, result in rows}
+
+        results = []
+        for write in writes:
+            if write.op_id in self.known:
+                results.append(self.known[write.op_id])
+                continue
+            result = await self.apply_one(write)
+            if result["status"] == "applied":
+                self.known[write.op_id] = result
+                self.applied.append((write, result))
+                self.session.add(models.SyncOperation(user_id=self.user_id, op_id=write.op_id, result=json.dumps(result)))
+            results.append(result)
+
+        await self.session.execute(
+            delete(models.SyncOperation)
+            .where(models.SyncOperation.created_at < func.datetime("now", f"-{SYNC_OPERATION_TTL_DAYS} days"))
+        )
+        return results
+
+    async def apply_one(self, write: schemas.SyncWrite) -> dict:
+        """Applies one write without recording it under its op_id."""
+        try:
+            return await self._apply(write)
+        except InvalidWrite as exc:
+            return _result(write, "invalid", detail=str(exc))
+
+    def _resolve(self, ref: Union[int, str, None], what: str) -> Optional[int]:
+        if not isinstance(ref, str):
+            return ref
+        created = self.known.get(ref)
+        if created is None or created["status"] != "applied" or created["entity"] != what:
+            raise InvalidWrite(f"No {what} was created by operation {ref!r}.")
+        return created["entity_id"]
+
+    async def _folder_id(self, ref: Union[int, str, None]) -> Optional[int]:
+        folder_id = self._resolve(ref, "folder")
+        if folder_id is not None and not await self.session.scalar(
+            select(models.Folder.folder_id).where(models.Folder.folder_id == folder_id, models.Folder.user_id == self.user_id)
+        ):
+            raise InvalidWrite(f"Folder {folder_id} not found.")
+        return folder_id
+
+    async def _apply(self, write: schemas.SyncWrite) -> dict:
+        if write.action != "create" and write.entity_id is None:
+            raise InvalidWrite("entity_id is required.")
+        if write.entity == "note":
+            return await self._apply_note(write)
+        return await self._apply_folder(write)
+
+    async def _apply_note(self, write: schemas.SyncWrite) -> dict:
+        values = write.data.model_dump(include={"title", "content"}, exclude_unset=True)
+        if "folder_id" in write.data.model_fields_set:
+            values["folder_id"] = await self._folder_id(write.data.folder_id)
+
+        if write.action == "create":
+            note_id, version = (await self.session.execute(
+                insert(models.Note).values(**values, user_id=self.user_id).returning(models.Note.note_id, models.Note.version)
+            )).one()
+            return _result(write, "applied", note_id, version=version)
+
+        note_id = self._resolve(write.entity_id, "note")
+        note_filter = (models.Note.note_id == note_id, models.Note.user_id == self.user_id)
+        version = await self.session.scalar(select(models.Note.version).where(*note_filter))
+        if version is None:
+            return _result(write, "missing", note_id)
+        if write.base_version is not None and write.base_version != version:
+            # The note moved on while the client was offline; hand back the server copy to merge.
+            current = await self.session.scalar(select(models.Note).where(*note_filter))
+            return _result(write, "conflict", note_id, version=version, current=schemas.NoteItem.model_validate(current).model_dump(mode="json"))
+
+        if write.action == "delete":
+            await self.session.execute(delete(models.Note).where(*note_filter))
+            return _result(write, "applied", note_id)
+        new_version = (await self.session.execute(
+            update(models.Note).where(*note_filter)
+            .values(**values, version=models.Note.version + 1)
+            .returning(models.Note.version)
+            .execution_options(synchronize_session=False)
+        )).scalar_one()
+        return _result(write, "applied", note_id, version=new_version)
+
+    async def _apply_folder(self, write: schemas.SyncWrite) -> dict:
+        if write.action == "create":
+            if not write.data.folder_name:
+                raise InvalidWrite("folder_name is required.")
+            folder_id = (await self.session.execute(
+                insert(models.Folder).values(folder_name=write.data.folder_name, user_id=self.user_id).returning(models.Folder.folder_id)
+            )).scalar_one()
+            return _result(write, "applied", folder_id)
+
+        folder_id = self._resolve(write.entity_id, "folder")
+        folder_filter = (models.Folder.folder_id == folder_id, models.Folder.user_id == self.user_id)
+        if not await self.session.scalar(select(models.Folder.folder_id).where(*folder_filter)):
+            return _result(write, "missing", folder_id)
+
+        if write.action == "delete":
+            # ON DELETE SET NULL un-files the folder's notes.
+            await self.session.execute(delete(models.Folder).where(*folder_filter))
+            return _result(write, "applied", folder_id)
+        if not write.data.folder_name:
+            raise InvalidWrite("folder_name is required.")
+        await self.session.execute(
+            update(models.Folder).where(*folder_filter).values(folder_name=write.data.folder_name)
+            .execution_options(synchronize_session=False)
+        )
+        return _result(write, "applied", folder_id)
@@ -0,0 +1,263 @@
+# FILE: Backend1/translation.py
+
+import asyncio
+import hashlib
+import importlib
+import logging
+import os
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models
+from .cache import TTLCache
+from .database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+# "module:ClassName" of the TranslationBackend to use.
+TRANSLATION_BACKEND = os.getenv("TRANSLATION_BACKEND", "Backend1.translation:MockBackend")
+# Texts sent to the backend in one call, and how long to wait for a batch to fill.
+TRANSLATION_MAX_BATCH = int(os.getenv("TRANSLATION_MAX_BATCH", "64"))
+TRANSLATION_MAX_DELAY_MS = float(os.getenv("TRANSLATION_MAX_DELAY_MS", "10"))
+# Entries kept in the in-process LRU in front of the TranslationCache table.
+TRANSLATION_CACHE_SIZE = int(os.getenv("TRANSLATION_CACHE_SIZE", "10000"))
+
+# (text, source_lang, target_lang)
+CacheKey = Tuple[str, str, str]
+LanguagePair = Tuple[str, str]
+
+
+# --- Backends ---
+
+class TranslationBackend(ABC):
+    """
+    Interface for translation providers. `translate_batch` receives distinct
+    texts for a single language pair and returns translations in the same order.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    async def translate_batch(self, texts: List[str], source_lang: str, target_lang: str) -> List[str]:
+        """Translations of `texts`, in the same order."""
+
+
+class MockBackend(TranslationBackend):
+    """Offline backend that needs no network; returns a marked-up copy of the text."""
+
+    name = "mock"
+
+    async def translate_batch(self, texts: List[str], source_lang: str, target_lang: str) -> List[str]:
+        return [f"[MOCK Translated: {text}]" for text in texts]
+
+
+def load_backend(path: str = TRANSLATION_BACKEND) -> TranslationBackend:
+    module_name, _, class_name = path.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+# --- Persistent Cache ---
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class TranslationStore:
+    """
+    Reads and writes the TranslationCache table. Rows are scoped to the backend
+    that produced them, so switching providers does not serve stale output.
+    """
+
+    def __init__(self, session_factory: Callable[[], AsyncSession], backend_name: str):
+        self.session_factory = session_factory
+        self.backend_name = backend_name
+
+    async def get_many(self, texts: List[str], source_lang: str, target_lang: str) -> Dict[str, str]:
+        entry = models.TranslationCacheEntry
+        hashes = {_text_hash(text): text for text in texts}
+        async with self.session_factory() as session:
+            rows = (await session.execute(
+                select(entry.text_hash, entry.source_text, entry.translated_text).where(
+                    entry.backend == self.backend_name,
+                    entry.source_lang == source_lang,
+                    entry.target_lang == target_lang,
+                    entry.text_hash.in_(list(hashes)),
+                )
+            )).all()
+        return {row.source_text: row.translated_text for row in rows if hashes.get(row.text_hash) == row.source_text}
+
+    async def put_many(self, translations: Dict[str, str], source_lang: str, target_lang: str):
+        rows = [
+            {
+                "backend": self.backend_name,
+                "source_lang": source_lang,
+                "target_lang": target_lang,
+                "text_hash": _text_hash(text),
+                "source_text": text,
+                "translated_text": translated,
+            }
+            for text, translated in translations.items()
+        ]
+        async with self.session_factory() as session:
+            await session.execute(sqlite_insert(models.TranslationCacheEntry.__table__).on_conflict_do_nothing(), rows)
+            await session.commit()
+
+
+# --- Engine ---
+
+class TranslationEngine:
+    """
+    Front door for all translations. Each lookup goes LRU -> in-flight request
+    -> micro-batch. Concurrent callers asking for the same (text, source_lang,
+    target_lang) share one future; distinct texts for the same language pair
+    that arrive within `max_delay` seconds are sent to the backend as one batch,
+    after checking the persistent store.
+    """
+
+    def __init__(
+        self,
+        backend: TranslationBackend,
+        store: Optional[TranslationStore] = None,
+        cache_size: int = TRANSLATION_CACHE_SIZE,
+        max_batch: int = TRANSLATION_MAX_BATCH,
+        max_delay: float = TRANSLATION_MAX_DELAY_MS / 1000,
+    ):
+        self.backend = backend
+        self.store = store
+        self.cache = TTLCache(maxsize=cache_size)
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.stats = {"cache_hits": 0, "store_hits": 0, "coalesced": 0, "backend_calls": 0, "backend_texts": 0}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._reset()
+
+    def _reset(self):
+        self._inflight: Dict[CacheKey, asyncio.Future] = {}
+        self._pending: Dict[LanguagePair, List[str]] = {}
+        self._timers: Dict[LanguagePair, asyncio.TimerHandle] = {}
+        self._flushes: Set[asyncio.Task] = set()
+
+    def _bind_loop(self):
+        # Futures and timers belong to one event loop; start over on a new one.
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._reset()
+
+    async def translate(self, text: str, source_lang: str, target_lang: str) -> str:
+        return (await self.translate_many([text], source_lang, target_lang))[0]
+
+    async def translate_many(self, texts: Iterable[str], source_lang: str, target_lang: str) -> List[str]:
+        """
+        Translates `texts` (in order). Duplicates are looked up only once.
+        """
+        self._bind_loop()
+        texts = list(texts)
+        results: Dict[str, str] = {}
+        waiting: Dict[str, asyncio.Future] = {}
+        for text in dict.fromkeys(texts):
+            key = (text, source_lang, target_lang)
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.stats["cache_hits"] += 1
+                results[text] = cached
+            else:
+                waiting[text] = self._join(key)
+        if waiting:
+            # shield(): one caller going away must not cancel a lookup others wait on.
+            values = await asyncio.gather(*(asyncio.shield(future) for future in waiting.values()))
+            results.update(zip(waiting, values))
+        return [results[text] for text in texts]
+
+    def _join(self, key: CacheKey) -> asyncio.Future:
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats["coalesced"] += 1
+            return future
+        future = self._loop.create_future()
+        self._inflight[key] = future
+        pair = key[1:]
+        pending = self._pending.setdefault(pair, [])
+        pending.append(key[0])
+        if len(pending) >= self.max_batch:
+            self._start_flush(pair)
+        elif pair not in self._timers:
+            self._timers[pair] = self._loop.call_later(self.max_delay, self._start_flush, pair)
+        return future
+
+    def _start_flush(self, pair: LanguagePair):
+        timer = self._timers.pop(pair, None)
+        if timer is not None:
+            timer.cancel()
+        texts = self._pending.pop(pair, None)
+        if texts:
+            task = self._loop.create_task(self._flush(pair, texts))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, pair: LanguagePair, texts: List[str]):
+        source_lang, target_lang = pair
+        found: Dict[str, str] = {}
+        if self.store is not None:
+            try:
+                found = await self.store.get_many(texts, source_lang, target_lang)
+            except Exception:
+                logger.exception("Translation cache lookup failed; falling back to the backend.")
+            self.stats["store_hits"] += len(found)
+
+        misses = [text for text in texts if text not in found]
+        translated: Dict[str, str] = {}
+        if misses:
+            try:
+                self.stats["backend_calls"] += 1
+                self.stats["backend_texts"] += len(misses)
+                values = await self.backend.translate_batch(misses, source_lang, target_lang)
+                if len(values) != len(misses):
+                    raise RuntimeError(f"Backend returned {len(values)} translations for {len(misses)} texts.")
+                translated = dict(zip(misses, values))
+            except Exception as exc:
+                for text in misses:
+                    self._settle((text, source_lang, target_lang), exception=exc)
+        for text, value in {**found, **translated}.items():
+            key = (text, source_lang, target_lang)
+            self.cache.set(key, value)
+            self._settle(key, result=value)
+
+        # Callers already have their answers; persisting only has to happen eventually.
+        if translated and self.store is not None:
+            try:
+                await self.store.put_many(translated, source_lang, target_lang)
+            except Exception:
+                logger.exception("Could not persist %d translations.", len(translated))
+
+    def _settle(self, key: CacheKey, result: Optional[str] = None, exception: Optional[BaseException] = None):
+        future = self._inflight.pop(key, None)
+        if future is None or future.done():
+            return
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+
+    async def close(self):
+        """
+        Sends any batches still waiting for their timer and waits for them to finish.
+        """
+        if self._loop is not asyncio.get_running_loop():
+            return
+        for pair in list(self._pending):
+            self._start_flush(pair)
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+
+_backend = load_backend()
+translator = TranslationEngine(_backend, TranslationStore(AsyncSessionLocal, _backend.name))
+
+
+def get_translator() -> TranslationEngine:
+    return translator
@@ -0,0 +1,146 @@
+# FILE: Backend1/write_queue.py
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Optional, Tuple, TypeVar
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+WriteJob = Callable[[AsyncSession], Awaitable[T]]
+
+
+class WriterStoppedError(RuntimeError):
+    """Set on writes that were still queued when the writer task stopped."""
+
+
+class GroupCommitWriter:
+    """
+    Serializes database writes through a single background task.
+
+    Jobs submitted by concurrent requests are collected into batches (up to
+    `max_batch` jobs, or whatever arrives within `max_delay` seconds) and run
+    in one transaction with a single COMMIT. SQLite only allows one writer at a
+    time, so this turns many competing write transactions (and their
+    `database is locked` retries) into one. Each job runs in its own
+    SAVEPOINT, so a job that raises (a 404, a rolled-back batch, a constraint
+    violation) only undoes its own writes and errors its own caller.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        max_batch: int = 100,
+        max_delay: float = 0.005,
+        max_pending: int = 10000,
+    ):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.max_pending)
+            self._task = loop.create_task(self._run())
+
+    async def submit(self, job: WriteJob) -> T:
+        """
+        Queues `job(session)` and waits until the batch containing it has been committed.
+        Waits for room when the queue is full, which pushes back on callers.
+        """
+        self._ensure_started()
+        future = self._loop.create_future()
+        await self._queue.put((job, future))
+        return await future
+
+    async def close(self):
+        """
+        Waits for already-queued writes to commit, then stops the writer task.
+        """
+        if self._task is not None and not self._task.done():
+            await self._queue.join()
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def _run(self):
+        queue = self._queue
+        batch = []
+        try:
+            while True:
+                batch = [await queue.get()]
+                deadline = self._loop.time() + self.max_delay
+                while len(batch) < self.max_batch:
+                    timeout = deadline - self._loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+                await self._commit_batch(batch)
+                for _ in batch:
+                    queue.task_done()
+                batch = []
+        finally:
+            # Cancelled (or crashed): fail the writes in hand and still queued
+            # so their callers don't wait forever.
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+            for _, future in batch:
+                self._resolve(future, exception=WriterStoppedError("The writer stopped before this write was committed."))
+                queue.task_done()
+
+    async def _commit_batch(self, batch: List[Tuple[WriteJob, asyncio.Future]]):
+        pending = [(job, future) for job, future in batch if not future.cancelled()]
+        if not pending:
+            return
+        try:
+            outcomes = await self._run_in_transaction([job for job, _ in pending])
+        except Exception as exc:
+            # The transaction itself failed (e.g. COMMIT), so nothing was written.
+            logger.warning("Group commit of %d writes failed.", len(pending), exc_info=True)
+            outcomes = [(None, exc)] * len(pending)
+        for (_, future), (result, exception) in zip(pending, outcomes):
+            self._resolve(future, result=result, exception=exception)
+
+    async def _run_in_transaction(self, jobs: List[WriteJob]) -> List[Tuple[object, Optional[Exception]]]:
+        """
+        Runs the jobs in one transaction, each in its own SAVEPOINT, and
+        commits. Returns a (result, exception) pair per job.
+        """
+        outcomes = []
+        async with self.session_factory() as session:
+            # pysqlite only opens a transaction at the first INSERT/UPDATE/DELETE,
+            # and a RELEASE outside one would commit each job on its own. Open it
+            # here, taking the write lock for the whole batch up front.
+            await session.execute(text("BEGIN IMMEDIATE"))
+            for job in jobs:
+                try:
+                    async with session.begin_nested():
+                        outcomes.append((await job(session), None))
+                except Exception as exc:
+                    outcomes.append((None, exc))
+            await session.commit()
+        return outcomes
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, result=None, exception: Optional[BaseException] = None):
+        if future.done():
+            return
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
@@ -0,0 +1,72 @@
+# FILE: benchmarks/bench_deck_import.py
+"""
+Compares creating a deck card-by-card through the ORM (the previous
+decks-from-items loop) with the executemany() bulk path.
+
+    python benchmarks/bench_deck_import.py --items 5000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from Backend1 import models
+from Backend1.api.routers.flashcards import DEFAULT_BACK_TEXT, _bulk_insert_cards
+from Backend1.database import Base
+
+
+async def orm_loop(session: AsyncSession, texts):
+    deck = models.Stack(stack_name="loop", user_id="1")
+    session.add(deck)
+    await session.commit()
+    await session.refresh(deck)
+    for text in texts:
+        session.add(models.Flashcard(front_text=text, back_text=DEFAULT_BACK_TEXT, stack_id=deck.stack_id, user_id="1"))
+    await session.commit()
+
+
+async def bulk_insert(session: AsyncSession, texts):
+    deck = models.Stack(stack_name="bulk", user_id="1")
+    session.add(deck)
+    await session.flush()
+    await _bulk_insert_cards(session, deck.stack_id, "1", texts)
+    await session.commit()
+
+
+async def measure(strategy, items: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'deck.db')}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        Session = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+        texts = [f"word {i}" for i in range(items)]
+        async with Session() as session:
+            started = time.perf_counter()
+            await strategy(session, texts)
+            best = min(best, time.perf_counter() - started)
+        await engine.dispose()
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'strategy':>10} {'seconds':>9} {'cards/s':>10}")
+    for name, strategy in (("orm-loop", orm_loop), ("bulk", bulk_insert)):
+        elapsed = asyncio.run(measure(strategy, args.items, args.repeat))
+        print(f"{name:>10} {elapsed:>9.3f} {args.items / elapsed:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# FILE: benchmarks/bench_media_search.py
+"""
+Measures /media-search latency as the transcript catalog grows.
+
+For each catalog size, builds a SQLite database with the media FTS5 indexes
+(via the same DDL the app uses), then times uncached queries (result cache
+cleared before each one) and repeated queries served from the result cache.
+Exits non-zero when the uncached p99 at any size exceeds --p99-target-ms.
+
+    python benchmarks/bench_media_search.py --sizes 1000,10000,50000 --segments-per-media 200
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from Backend1 import media_index, models
+from Backend1.database import Base
+
+random.seed(11)
+VOCABULARY = [
+    "".join(random.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(random.randint(3, 10)))
+    for _ in range(20000)
+]
+
+
+def build_catalog(path: str, media: int, segments_per_media: int, words_per_segment: int):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    batch = 200
+    with engine.begin() as conn:
+        for start in range(0, media, batch):
+            ids = range(start + 1, min(start + batch, media) + 1)
+            conn.execute(insert(models.Media.__table__), [
+                {
+                    "media_id": i,
+                    "external_id": f"video-{i}",
+                    "media_type": "youtube",
+                    "title": " ".join(random.choices(VOCABULARY, k=5)),
+                    "author": random.choice(VOCABULARY),
+                    "url": f"https://www.youtube.com/watch?v={i}",
+                    "thumbnail_url": "",
+                }
+                for i in ids
+            ])
+            conn.execute(insert(models.TranscriptSegment.__table__), [
+                {"media_id": i, "start": s * 4.0, "end": s * 4.0 + 4.0, "text": " ".join(random.choices(VOCABULARY, k=words_per_segment))}
+                for i in ids
+                for s in range(segments_per_media)
+            ])
+    engine.dispose()
+
+
+async def run_queries(path: str, queries: int, cached: bool) -> list:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    Session = async_sessionmaker(bind=engine, class_=AsyncSession)
+    phrases = [" ".join(random.sample(VOCABULARY, k=random.randint(1, 2))) for _ in range(50)]
+    latencies = []
+    async with Session() as session:
+        if cached:
+            for query in phrases:  # warm the result cache
+                await media_index.search_media(session, query, 10)
+        for i in range(queries):
+            query = phrases[i % len(phrases)]
+            if not cached:
+                media_index.clear_media_search_cache()
+            started = time.perf_counter()
+            await media_index.search_media(session, query, 10)
+            latencies.append((time.perf_counter() - started) * 1000)
+    await engine.dispose()
+    return sorted(latencies)
+
+
+def percentile(latencies: list, fraction: float) -> float:
+    return latencies[max(0, int(len(latencies) * fraction) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="500,2000,8000", help="Comma-separated catalog sizes (media items).")
+    parser.add_argument("--segments-per-media", type=int, default=150)
+    parser.add_argument("--words-per-segment", type=int, default=12)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--p99-target-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'media':>8} {'segments':>10} {'index s':>8} {'p50 ms':>8} {'p99 ms':>8} {'cached p50':>11}")
+    for size in [int(s) for s in args.sizes.split(",")]:
+        path = os.path.join(tempfile.mkdtemp(), "media.db")
+        started = time.perf_counter()
+        build_catalog(path, size, args.segments_per_media, args.words_per_segment)
+        build_seconds = time.perf_counter() - started
+
+        uncached = asyncio.run(run_queries(path, args.queries, cached=False))
+        warm = asyncio.run(run_queries(path, args.queries, cached=True))
+        p99 = percentile(uncached, 0.99)
+        print(
+            f"{size:>8} {size * args.segments_per_media:>10} {build_seconds:>8.1f} "
+            f"{statistics.median(uncached):>8.2f} {p99:>8.2f} {statistics.median(warm):>11.3f}"
+        )
+        failed = failed or p99 > args.p99_target_ms
+        media_index.clear_media_search_cache()
+
+    if failed:
+        print(f"FAIL: uncached p99 exceeds target {args.p99_target_ms}ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
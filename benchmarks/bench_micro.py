@@ -0,0 +1,156 @@
+# FILE: benchmarks/bench_micro.py
+"""
+Microbenchmarks for the per-request hot paths, with the same JSON results and
+baseline comparison as loadtest.py (see results.py).
+
+    auth.cached          security.get_current_user, token and user in the caches
+    auth.uncached        security.get_current_user after clear_auth_cache()
+                         (JWT decode + user lookup)
+    serialize.model      --page-size notes through the NoteItem response model
+    serialize.fast       the same rows as dicts through pagination.render_json
+    insert.orm           --insert-rows notes via session.add_all + commit
+    insert.bulk          the same rows via one executemany INSERT + commit
+
+Each iteration is one call (or one page / one batch); throughput is iterations
+per second.
+
+    python benchmarks/bench_micro.py --save-baseline
+    python benchmarks/bench_micro.py --baseline
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pydantic import TypeAdapter
+from sqlalchemy import delete, insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import results
+from Backend1 import models, schemas, security
+from Backend1.database import Base
+from Backend1.pagination import render_json
+
+NOTES = TypeAdapter(list[schemas.NoteItem])
+
+
+async def measure(iterations: int, call, before=None) -> dict:
+    latencies = []
+    total = 0.0
+    for _ in range(iterations):
+        if before is not None:
+            await before()
+        started = time.perf_counter()
+        await call()
+        elapsed = time.perf_counter() - started
+        total += elapsed
+        latencies.append(elapsed * 1000)
+    return results.summarize(latencies, total)
+
+
+async def bench_auth(Session, iterations: int) -> dict:
+    async with Session() as db:
+        db.add(models.User(email="bench@micro.test", hashed_password="x"))
+        await db.commit()
+    token = security.create_access_token({"sub": "bench@micro.test"})
+
+    async def current_user():
+        async with Session() as db:
+            await security.get_current_user(db, token)
+
+    async def clear():
+        security.clear_auth_cache()
+
+    return {
+        "auth.cached": await measure(iterations, current_user),
+        "auth.uncached": await measure(iterations, current_user, before=clear),
+    }
+
+
+async def bench_serialization(iterations: int, page_size: int, content_bytes: int) -> dict:
+    now = datetime(2026, 1, 1, 12, 0, 0)
+    rows = [
+        {
+            "title": f"Note {i}", "content": "x" * content_bytes, "folder_id": None,
+            "note_id": i, "user_id": "1", "creation_date": now, "last_modified_date": now, "version": 1,
+        }
+        for i in range(page_size)
+    ]
+    objects = [models.Note(**row) for row in rows]
+
+    async def model():
+        NOTES.dump_json(NOTES.validate_python(objects, from_attributes=True))
+
+    async def fast():
+        render_json(rows)
+
+    return {
+        "serialize.model": await measure(iterations, model),
+        "serialize.fast": await measure(iterations, fast),
+    }
+
+
+async def bench_inserts(Session, iterations: int, rows: int) -> dict:
+    def batch():
+        return [{"user_id": "1", "title": f"Note {i}", "content": "body " * 20} for i in range(rows)]
+
+    async def orm():
+        async with Session() as db:
+            db.add_all([models.Note(**row) for row in batch()])
+            await db.commit()
+
+    async def bulk():
+        async with Session() as db:
+            await db.execute(insert(models.Note.__table__), batch())
+            await db.commit()
+
+    async def truncate():
+        async with Session() as db:
+            await db.execute(delete(models.Note))
+            await db.commit()
+
+    return {
+        "insert.orm": await measure(iterations, orm, before=truncate),
+        "insert.bulk": await measure(iterations, bulk, before=truncate),
+    }
+
+
+async def run(args) -> dict:
+    path = os.path.join(tempfile.mkdtemp(), "micro.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    Session = async_sessionmaker(bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+    metrics = {}
+    try:
+        metrics.update(await bench_auth(Session, args.iterations))
+        metrics.update(await bench_serialization(args.iterations, args.page_size, args.content_bytes))
+        metrics.update(await bench_inserts(Session, max(1, args.iterations // 20), args.insert_rows))
+    finally:
+        security.clear_auth_cache()
+        await engine.dispose()
+    return metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--content-bytes", type=int, default=500)
+    parser.add_argument("--insert-rows", type=int, default=1000)
+    results.add_arguments(parser, "micro")
+    args = parser.parse_args()
+
+    metrics = asyncio.run(run(args))
+    config = {key: getattr(args, key) for key in ("iterations", "page_size", "content_bytes", "insert_rows")}
+    results.finish(args, "micro", config, metrics)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# FILE: benchmarks/bench_password_hashing.py
+"""
+Measures login (bcrypt verify) throughput through the bounded PasswordHasher
+pool for increasing worker counts, and reports it per core.
+
+    python benchmarks/bench_password_hashing.py --rounds 10 --logins 200
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from passlib.context import CryptContext
+
+from Backend1.hashing import HashingBusyError, PasswordHasher
+
+
+def run(workers: int, rounds: int, logins: int, clients: int) -> float:
+    context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+    stored_hash = context.hash("benchmark-password")
+    hasher = PasswordHasher(context, max_workers=workers, max_pending=clients)
+
+    def login(_):
+        while True:
+            try:
+                return hasher.verify("benchmark-password", stored_hash)
+            except HashingBusyError:
+                time.sleep(0.001)
+
+    started = time.perf_counter()
+    # `clients` request threads compete for the hashing pool, like a login burst.
+    with ThreadPoolExecutor(max_workers=clients) as request_threads:
+        assert all(request_threads.map(login, range(logins)))
+    elapsed = time.perf_counter() - started
+    hasher.shutdown()
+    return logins / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost factor")
+    parser.add_argument("--logins", type=int, default=100, help="logins per measurement")
+    parser.add_argument("--clients", type=int, default=40, help="concurrent request threads")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    print(f"bcrypt rounds={args.rounds} logins={args.logins} clients={args.clients}")
+    print(f"{'workers':>8} {'logins/s':>10} {'logins/s/core':>14}")
+    workers = 1
+    while workers <= args.max_workers:
+        throughput = run(workers, args.rounds, args.logins, args.clients)
+        print(f"{workers:>8} {throughput:>10.1f} {throughput / workers:>14.1f}")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# FILE: benchmarks/bench_search.py
+"""
+Measures /search query latency on a synthetic note corpus.
+
+Builds a SQLite database with the FTS5 index (via the same DDL the app uses),
+spreads the notes over many users, then times prefix and multi-term queries
+for one user. Exits non-zero when p99 exceeds --p99-target-ms.
+
+    python benchmarks/bench_search.py --notes 1000000 --p99-target-ms 50
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from Backend1 import models
+from Backend1 import search as search_index
+from Backend1.database import Base
+
+random.seed(7)
+VOCABULARY = [
+    "".join(random.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(random.randint(3, 10)))
+    for _ in range(20000)
+]
+
+
+def build_corpus(path: str, notes: int, users: int, words_per_note: int):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    batch = 10000
+    with engine.begin() as conn:
+        for start in range(0, notes, batch):
+            conn.execute(insert(models.Note.__table__), [
+                {
+                    "user_id": str(i % users),
+                    "title": " ".join(random.choices(VOCABULARY, k=4)),
+                    "content": " ".join(random.choices(VOCABULARY, k=words_per_note)),
+                }
+                for i in range(start, min(start + batch, notes))
+            ])
+    engine.dispose()
+
+
+async def run_queries(path: str, queries: int, users: int) -> list:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    Session = async_sessionmaker(bind=engine, class_=AsyncSession)
+    latencies = []
+    async with Session() as session:
+        for _ in range(queries):
+            words = random.sample(VOCABULARY, k=random.randint(1, 2))
+            query = " ".join(words[:-1] + [words[-1][:3]])  # last term as a typed prefix
+            started = time.perf_counter()
+            await search_index.search(session, str(random.randrange(users)), query, ["note"], 20)
+            latencies.append((time.perf_counter() - started) * 1000)
+    await engine.dispose()
+    return sorted(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--notes", type=int, default=100000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--words-per-note", type=int, default=60)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--p99-target-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "search.db")
+    started = time.perf_counter()
+    build_corpus(path, args.notes, args.users, args.words_per_note)
+    print(f"indexed {args.notes} notes in {time.perf_counter() - started:.1f}s")
+
+    latencies = asyncio.run(run_queries(path, args.queries, args.users))
+    p99 = latencies[max(0, int(len(latencies) * 0.99) - 1)]
+    print(f"p50={statistics.median(latencies):.2f}ms p95={latencies[int(len(latencies) * 0.95) - 1]:.2f}ms p99={p99:.2f}ms")
+    if p99 > args.p99_target_ms:
+        print(f"FAIL: p99 {p99:.2f}ms exceeds target {args.p99_target_ms}ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# FILE: benchmarks/bench_serialization.py
+"""
+Compares the two ways a listing endpoint can turn rows into a JSON body.
+
+    model:  SELECT full ORM objects -> Pydantic response_model -> JSON
+            (what FastAPI does for a route returning ORM objects)
+    fast:   SELECT the schema's columns as tuples -> dicts -> orjson
+            (pagination.fetch_page(..., fast=True))
+
+Both paths run the same query against a SQLite database of notes and must
+produce the same JSON; the script checks that before timing anything.
+
+    python benchmarks/bench_serialization.py --rows 100,1000,10000 --content-bytes 2000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from Backend1 import models, schemas
+from Backend1.database import Base
+from Backend1.pagination import PageParams, fetch_page
+
+NOTE_ORDERING = [(models.Note.last_modified_date, True), (models.Note.note_id, True)]
+NOTES = TypeAdapter(list[schemas.NoteItem])
+
+
+def build_notes(path: str, rows: int, content_bytes: int):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(models.Note.__table__), [
+            {"user_id": "1", "title": f"Note {i}", "content": "x" * content_bytes}
+            for i in range(rows)
+        ])
+    engine.dispose()
+
+
+async def render(session: AsyncSession, fast: bool) -> bytes:
+    params = PageParams(limit=None, cursor=None, fields=None)
+    page = await fetch_page(session, models.Note, [models.Note.user_id == "1"], NOTE_ORDERING, schemas.NoteItem, params, fast=fast)
+    if page.rendered:
+        return page.to_response(None).body
+    return NOTES.dump_json(NOTES.validate_python(page.items, from_attributes=True))
+
+
+async def time_paths(path: str, rows: int, repeats: int) -> dict:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    Session = async_sessionmaker(bind=engine, class_=AsyncSession)
+    timings = {"model": [], "fast": []}
+    async with Session() as session:
+        if json.loads(await render(session, False)) != json.loads(await render(session, True)):
+            raise SystemExit("fast path output differs from the response_model output")
+        for _ in range(repeats):
+            for name, fast in (("model", False), ("fast", True)):
+                session.expunge_all()  # no identity-map reuse between runs
+                started = time.perf_counter()
+                await render(session, fast)
+                timings[name].append((time.perf_counter() - started) * 1000)
+    await engine.dispose()
+    return {name: statistics.median(values) for name, values in timings.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", default="100,1000,5000", help="Comma-separated page sizes.")
+    parser.add_argument("--content-bytes", type=int, default=500)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'model ms':>10} {'fast ms':>10} {'speedup':>8}")
+    for rows in [int(r) for r in args.rows.split(",")]:
+        path = os.path.join(tempfile.mkdtemp(), "notes.db")
+        build_notes(path, rows, args.content_bytes)
+        result = asyncio.run(time_paths(path, rows, args.repeats))
+        print(f"{rows:>8} {result['model']:>10.2f} {result['fast']:>10.2f} {result['model'] / result['fast']:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
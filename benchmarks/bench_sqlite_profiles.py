@@ -0,0 +1,112 @@
+# FILE: benchmarks/bench_sqlite_profiles.py
+"""
+Compares the "default" and "production" SQLite profiles under a concurrent
+note-autosave workload (many writers updating notes, some readers listing them).
+
+    python benchmarks/bench_sqlite_profiles.py --clients 50 --seconds 5
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from Backend1 import models
+from Backend1.database import Base, apply_sqlite_profile
+from Backend1.write_queue import GroupCommitWriter
+
+
+async def run_profile(profile: str, clients: int, seconds: float, notes: int, write_ratio: float) -> dict:
+    path = os.path.join(tempfile.mkdtemp(), f"{profile}.db")
+    url = f"sqlite+aiosqlite:///{path}"
+    engine = create_async_engine(url, pool_size=clients, max_overflow=0)
+    apply_sqlite_profile(engine.sync_engine, profile=profile)
+    read_engine = engine
+    if profile == "production":
+        read_engine = create_async_engine(url, pool_size=clients, max_overflow=0)
+        apply_sqlite_profile(read_engine.sync_engine, profile=profile, read_only=True)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    Session = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    ReadSession = async_sessionmaker(bind=read_engine, class_=AsyncSession, expire_on_commit=False)
+    async with Session() as session:
+        session.add_all(models.Note(user_id=str(i % 10), title=f"note {i}", content="x" * 2000) for i in range(notes))
+        await session.commit()
+
+    writer = GroupCommitWriter(Session) if profile == "production" else None
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + seconds
+
+    async def autosave(note_id: int):
+        async def job(session):
+            await session.execute(update(models.Note).where(models.Note.note_id == note_id).values(content="y" * 2000))
+        if writer is not None:
+            await writer.submit(job)
+        else:
+            async with Session() as session:
+                await job(session)
+                await session.commit()
+
+    async def list_notes(user_id: str):
+        async with ReadSession() as session:
+            stmt = select(models.Note).where(models.Note.user_id == user_id).order_by(models.Note.last_modified_date.desc())
+            (await session.scalars(stmt)).all()
+
+    async def client():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                if random.random() < write_ratio:
+                    await autosave(random.randint(1, notes))
+                else:
+                    await list_notes(str(random.randint(0, 9)))
+            except OperationalError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(client() for _ in range(clients)))
+    if writer is not None:
+        await writer.close()
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
+
+    latencies.sort()
+    return {
+        "profile": profile,
+        "ops_per_s": len(latencies) / seconds,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else float("nan"),
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else float("nan"),
+        "locked_errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--notes", type=int, default=2000)
+    parser.add_argument("--write-ratio", type=float, default=0.7)
+    args = parser.parse_args()
+
+    print(f"{'profile':>11} {'ops/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'locked':>7}")
+    for profile in ("default", "production"):
+        r = asyncio.run(run_profile(profile, args.clients, args.seconds, args.notes, args.write_ratio))
+        print(f"{r['profile']:>11} {r['ops_per_s']:>9.1f} {r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['locked_errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
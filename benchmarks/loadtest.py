@@ -0,0 +1,225 @@
+# FILE: benchmarks/loadtest.py
+"""
+Local load generator for the API.
+
+Builds a temporary SQLite database with --users users, each owning --notes-per-user
+notes, plus --stacks stacks of --cards-per-stack flashcards, then runs the real
+FastAPI app in-process (httpx ASGI transport, same dependency overrides as the
+test suite) with --clients concurrent virtual users for --seconds. Each virtual
+user picks its next operation from this mix:
+
+    token             POST /token                          (bcrypt login)
+    notes.list        GET  /notes/?limit=50
+    notes.autosave    PATCH /notes/{id}                    (one small edit)
+    stacks.list       GET  /api/v1/users/default-user/stacks
+    flashcards.list   GET  /api/v1/stacks/{id}/flashcards?limit=100
+    translation.log   POST /translation/logs
+
+Client and server share one event loop, so absolute numbers are lower than a
+deployed server's; compare runs against each other (see results.py).
+
+    python benchmarks/loadtest.py --clients 20 --seconds 10 --save-baseline
+    python benchmarks/loadtest.py --clients 20 --seconds 10 --baseline
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import httpx
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import results
+from Backend1 import metrics, models, security
+from Backend1.database import Base, get_async_db, get_async_read_db
+from Backend1.ingest import IngestJournal, IngestPipeline, get_ingest
+from Backend1.main import app
+
+# operation -> relative weight
+DEFAULT_MIX = {
+    "token": 2,
+    "notes.list": 25,
+    "notes.autosave": 35,
+    "stacks.list": 8,
+    "flashcards.list": 15,
+    "translation.log": 15,
+}
+PASSWORD = "load-test-password"
+
+
+def build_database(path: str, users: int, notes_per_user: int, note_bytes: int, stacks: int, cards_per_stack: int):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    hashed = security.get_password_hash(PASSWORD)  # one hash, shared by every user
+    words = ["lorem", "ipsum", "dolor", "sit", "amet", "consectetur", "adipiscing", "elit"]
+    with engine.begin() as conn:
+        conn.execute(insert(models.User.__table__), [
+            {"email": f"user{u}@load.test", "hashed_password": hashed, "is_active": True} for u in range(users)
+        ])
+        user_ids = conn.execute(select(models.User.id).order_by(models.User.id)).scalars().all()
+        for user_id in user_ids:
+            conn.execute(insert(models.Note.__table__), [
+                {
+                    "user_id": str(user_id),
+                    "title": f"Note {n}",
+                    "content": " ".join(random.choices(words, k=max(1, note_bytes // 6)))[:note_bytes],
+                }
+                for n in range(notes_per_user)
+            ])
+        for s in range(stacks):
+            stack_id = conn.execute(
+                insert(models.Stack).values(user_id="default-user", stack_name=f"Stack {s}").returning(models.Stack.stack_id)
+            ).scalar_one()
+            conn.execute(insert(models.Flashcard.__table__), [
+                {"user_id": "default-user", "stack_id": stack_id, "front_text": random.choice(words), "back_text": random.choice(words)}
+                for _ in range(cards_per_stack)
+            ])
+    engine.dispose()
+
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, email: str, notes: list, stack_ids: list):
+        self.client = client
+        self.email = email
+        self.notes = notes  # [note_id, version]
+        self.stack_ids = stack_ids
+        self.headers = {}
+
+    async def login(self) -> httpx.Response:
+        response = await self.client.post("/token", data={"username": self.email, "password": PASSWORD})
+        if response.status_code == 200:
+            self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        return response
+
+    async def run(self, operation: str) -> httpx.Response:
+        if operation == "token":
+            return await self.login()
+        if operation == "notes.list":
+            return await self.client.get("/notes/", params={"limit": 50}, headers=self.headers)
+        if operation == "notes.autosave":
+            note = random.choice(self.notes)
+            response = await self.client.patch(
+                f"/notes/{note[0]}",
+                json={"base_version": note[1], "edits": [{"start": 0, "end": 0, "text": random.choice("abcdef")}]},
+                headers=self.headers,
+            )
+            if response.status_code == 200:
+                note[1] = response.json()["version"]
+            return response
+        if operation == "stacks.list":
+            return await self.client.get("/api/v1/users/default-user/stacks")
+        if operation == "flashcards.list":
+            return await self.client.get(f"/api/v1/stacks/{random.choice(self.stack_ids)}/flashcards", params={"limit": 100})
+        if operation == "translation.log":
+            return await self.client.post("/translation/logs", headers=self.headers, json={
+                "originalText": "Hallo Welt", "translatedText": "Hello world",
+                "sourceLanguage": "de", "targetLanguage": "en", "timestamp": "2026-01-01T00:00:00Z",
+            })
+        raise ValueError(operation)
+
+
+async def run_load(path: str, args, mix: dict) -> dict:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}", pool_size=args.clients, max_overflow=args.clients)
+    metrics.instrument_engine(engine.sync_engine)  # Server-Timing / slow-request logs count these queries
+    Session = async_sessionmaker(bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with Session() as db:
+            yield db
+
+    pipeline = IngestPipeline(Session, IngestJournal(path + ".journal"))
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_async_read_db] = override_get_async_db
+    app.dependency_overrides[get_ingest] = lambda: pipeline
+    security.clear_auth_cache()
+
+    async with Session() as db:
+        users = (await db.execute(select(models.User.id, models.User.email).order_by(models.User.id))).all()
+        notes = (await db.execute(select(models.Note.user_id, models.Note.note_id, models.Note.version))).all()
+        stack_ids = (await db.scalars(select(models.Stack.stack_id))).all()
+    notes_by_user = {}
+    for user_id, note_id, version in notes:
+        notes_by_user.setdefault(user_id, []).append([note_id, version])
+
+    latencies = {operation: [] for operation in mix}
+    errors = {operation: 0 for operation in mix}
+    operations, weights = list(mix), list(mix.values())
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+        # Virtual users sharing an account edit disjoint notes, so autosaves never conflict.
+        shares = -(-args.clients // len(users))
+        virtual_users = []
+        for i in range(args.clients):
+            user_id, email = users[i % len(users)]
+            virtual_users.append(VirtualUser(client, email, notes_by_user[str(user_id)][i // len(users)::shares], stack_ids))
+        for user in virtual_users:  # logins are measured by the "token" operation, not here
+            await user.login()
+
+        deadline = time.perf_counter() + args.seconds
+
+        async def drive(user: VirtualUser):
+            while time.perf_counter() < deadline:
+                operation = random.choices(operations, weights)[0]
+                started = time.perf_counter()
+                response = await user.run(operation)
+                if response.status_code < 400:
+                    latencies[operation].append((time.perf_counter() - started) * 1000)
+                else:
+                    errors[operation] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(drive(user) for user in virtual_users))
+        elapsed = time.perf_counter() - started
+
+    await pipeline.close()
+    await engine.dispose()
+    app.dependency_overrides.clear()
+    summary = {operation: results.summarize(latencies[operation], elapsed, errors[operation]) for operation in mix}
+    summary["total"] = results.summarize([v for values in latencies.values() for v in values], elapsed, sum(errors.values()))
+    return summary
+
+
+def parse_mix(value: str) -> dict:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"Unknown operation {name!r}; choose from {', '.join(DEFAULT_MIX)}.")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=20, help="Concurrent virtual users.")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--notes-per-user", type=int, default=200)
+    parser.add_argument("--note-bytes", type=int, default=2000)
+    parser.add_argument("--stacks", type=int, default=20)
+    parser.add_argument("--cards-per-stack", type=int, default=500)
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help="e.g. notes.list=3,notes.autosave=1")
+    parser.add_argument("--seed", type=int, default=7)
+    results.add_arguments(parser, "loadtest")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    path = os.path.join(tempfile.mkdtemp(), "loadtest.db")
+    print(f"Building {args.users} users x {args.notes_per_user} notes, {args.stacks} x {args.cards_per_stack} flashcards...")
+    build_database(path, args.users, args.notes_per_user, args.note_bytes, args.stacks, args.cards_per_stack)
+    summary = asyncio.run(run_load(path, args, args.mix))
+
+    config = {key: value for key, value in vars(args).items() if key not in ("output", "save_baseline", "baseline", "max_throughput_drop", "max_p99_increase")}
+    config["bcrypt_rounds"] = security.BCRYPT_ROUNDS
+    results.finish(args, "loadtest", config, summary)
+
+
+if __name__ == "__main__":
+    main()
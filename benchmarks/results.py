@@ -0,0 +1,148 @@
+# FILE: benchmarks/results.py
+"""
+JSON results and baseline comparison shared by loadtest.py and bench_micro.py.
+
+A results file looks like
+
+    {"suite": "loadtest", "config": {...}, "metrics": {
+        "notes.list": {"count": 1200, "errors": 0, "throughput": 240.1, "p50_ms": 3.2, "p99_ms": 11.8},
+        ...}}
+
+A run compared against a baseline fails when any metric's throughput drops,
+or its p99 latency grows, by more than the allowed fraction. Compare two
+saved files directly with
+
+    python benchmarks/results.py benchmarks/baselines/loadtest.json current.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+from typing import Dict, List
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+MAX_THROUGHPUT_DROP = 0.10
+MAX_P99_INCREASE = 0.20
+
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(0, int(len(sorted_values) * fraction + 0.5) - 1)]
+
+
+def summarize(latencies_ms: list, seconds: float, errors: int = 0) -> dict:
+    """
+    One metric: request count, errors, successful operations per second and
+    latency percentiles of the successful ones.
+    """
+    latencies = sorted(latencies_ms)
+    return {
+        "count": len(latencies) + errors,
+        "errors": errors,
+        "throughput": round(len(latencies) / seconds, 2) if seconds > 0 else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+    }
+
+
+def compare(
+    baseline: dict,
+    current: dict,
+    max_throughput_drop: float = MAX_THROUGHPUT_DROP,
+    max_p99_increase: float = MAX_P99_INCREASE,
+) -> List[str]:
+    """
+    Returns one message per regression; metrics missing from either side are skipped.
+    """
+    regressions = []
+    for name, before in sorted(baseline["metrics"].items()):
+        after = current["metrics"].get(name)
+        if after is None:
+            continue
+        if before["throughput"] and after["throughput"] < before["throughput"] * (1 - max_throughput_drop):
+            regressions.append(f"{name}: throughput {before['throughput']:.1f} -> {after['throughput']:.1f} ops/s")
+        if before["p99_ms"] and after["p99_ms"] > before["p99_ms"] * (1 + max_p99_increase):
+            regressions.append(f"{name}: p99 {before['p99_ms']:.2f} -> {after['p99_ms']:.2f} ms")
+        if after["errors"] > before["errors"]:
+            regressions.append(f"{name}: errors {before['errors']} -> {after['errors']}")
+    return regressions
+
+
+def add_arguments(parser: argparse.ArgumentParser, suite: str):
+    default = os.path.join(BASELINE_DIR, f"{suite}.json")
+    parser.add_argument("--output", help="Write this run's results to a JSON file.")
+    parser.add_argument("--save-baseline", nargs="?", const=default, help=f"Store this run as the baseline (default {default}).")
+    parser.add_argument("--baseline", nargs="?", const=default, help=f"Fail if this run regressed against a baseline (default {default}).")
+    parser.add_argument("--max-throughput-drop", type=float, default=MAX_THROUGHPUT_DROP)
+    parser.add_argument("--max-p99-increase", type=float, default=MAX_P99_INCREASE)
+
+
+def _write(path: str, results: dict):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2, sort_keys=True)
+        file.write("\n")
+
+
+def load(path: str) -> dict:
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def print_table(metrics: Dict[str, dict]):
+    print(f"{'metric':<28} {'count':>8} {'errors':>7} {'ops/s':>10} {'p50 ms':>9} {'p99 ms':>9}")
+    for name, m in sorted(metrics.items()):
+        print(f"{name:<28} {m['count']:>8} {m['errors']:>7} {m['throughput']:>10.1f} {m['p50_ms']:>9.3f} {m['p99_ms']:>9.3f}")
+
+
+def finish(args: argparse.Namespace, suite: str, config: dict, metrics: Dict[str, dict]):
+    """
+    Prints, stores and checks a run according to the add_arguments() flags.
+    Exits non-zero when the run regressed against --baseline.
+    """
+    results = {
+        "suite": suite,
+        "config": config,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "metrics": metrics,
+    }
+    print_table(metrics)
+    if args.output:
+        _write(args.output, results)
+    if args.save_baseline:
+        _write(args.save_baseline, results)
+        print(f"Saved baseline {args.save_baseline}")
+    if args.baseline:
+        baseline = load(args.baseline)
+        if baseline.get("config") != config:
+            print("WARNING: baseline was recorded with a different configuration.")
+        regressions = compare(baseline, results, args.max_throughput_drop, args.max_p99_increase)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.baseline}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--max-throughput-drop", type=float, default=MAX_THROUGHPUT_DROP)
+    parser.add_argument("--max-p99-increase", type=float, default=MAX_P99_INCREASE)
+    args = parser.parse_args()
+
+    current = load(args.current)
+    print_table(current["metrics"])
+    regressions = compare(load(args.baseline), current, args.max_throughput_drop, args.max_p99_increase)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,52 @@
 
 import apiFetch from './apiService.js';
 
+// --- Workspace ---
+
+// Folders with note summaries, stacks with card counts and recent items in one
+// request, instead of one request per folder and per deck on load.
+export function fetchWorkspace({ includeCards = false, recent = 10 } = {}) {
+  return apiFetch(`/workspace?include_cards=${includeCards}&recent=${recent}`);
+}
+
+// Pushes note/folder/stack/flashcard changes instead of re-fetching listings.
+// EventSource reconnects by itself and resumes with Last-Event-ID; on a
+// {op: "reset"} event reload with fetchWorkspace(). Returns a close function.
+export function subscribeToChanges(onChange) {
+  const baseUrl = import.meta.env.VITE_API_BASE_URL;
+  const token = localStorage.getItem('accessToken');
+  const source = new EventSource(`${baseUrl}/changes/stream?access_token=${encodeURIComponent(token)}`);
+  source.onmessage = (message) => onChange(JSON.parse(message.data));
+  return () => source.close();
+}
+
+// --- Offline Sync ---
+
+// Changes since the `seq` of the previous pull (0 downloads everything).
+// Pull again from the returned seq while `has_more` is true.
+export function pullChanges(since = 0) {
+  return apiFetch(`/sync?since=${since}`);
+}
+
+// Writes queued while offline: [{op_id, entity, action, entity_id, base_version, data}].
+export function pushOfflineWrites(writes) {
+  return apiFetch('/sync', {
+    method: 'POST',
+    body: JSON.stringify({ writes }),
+  });
+}
+
+// --- Batch Writes ---
+
+// Several note/folder/stack writes in one request: [{op: "note.update", note_id, data}, ...].
+// With atomic=true nothing is saved unless every operation succeeds.
+export function runBatch(operations, atomic = true) {
+  return apiFetch('/batch', {
+    method: 'POST',
+    body: JSON.stringify({ atomic, operations }),
+  });
+}
+
 // --- Note Functions ---
 
 export function fetchFolders() {
@@ -1,13 +1,22 @@
 # FILE: tests/conftest.py (Corrected for Cleanup)
 
+import asyncio
+
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 import os
 
 from Backend1.main import app
-from Backend1.database import Base, get_db
+from Backend1.database import Base, apply_sqlite_profile, enable_foreign_keys, get_db, get_async_db, get_async_read_db
+from Backend1 import media_index, metrics, security
+from Backend1.changefeed import InMemoryBroker, get_change_feed
+from Backend1.ingest import IngestJournal, IngestPipeline, get_ingest
+from Backend1.purge import Purger, get_purger
+from Backend1.translation import MockBackend, TranslationEngine, TranslationStore, get_translator
 
 # --- Test Database Setup ---
 TEST_DATABASE_URL = "sqlite:///./test.db"
@@ -17,6 +26,14 @@ engine = create_engine(
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# The API routers use async sessions. NullPool keeps aiosqlite connections from
+# outliving the TestClient event loop they were opened on.
+TEST_ASYNC_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
+async_engine = create_async_engine(TEST_ASYNC_DATABASE_URL, poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+metrics.instrument_engine(async_engine.sync_engine)
+enable_foreign_keys(async_engine.sync_engine)
+
 # --- Pytest Fixtures ---
 
 @pytest.fixture(scope="function")
@@ -30,22 +47,50 @@ def db_session():
         db.close()
         # Drop all tables after each test to ensure isolation
         Base.metadata.drop_all(bind=engine)
+        # Cached users would otherwise leak between tests that reuse emails
+        security.clear_auth_cache()
+        media_index.clear_media_search_cache()
 
 
 @pytest.fixture(scope="function")
-def test_client(db_session):
+def test_client(db_session, tmp_path):
     def override_get_db():
         try:
             yield db_session
         finally:
             db_session.close()
 
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as db:
+            yield db
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_async_read_db] = override_get_async_db
+    # A fresh engine per test: empty LRU, persistent cache in the test database
+    test_translator = TranslationEngine(MockBackend(), TranslationStore(TestingAsyncSessionLocal, MockBackend.name))
+    app.dependency_overrides[get_translator] = lambda: test_translator
+    test_ingest = IngestPipeline(TestingAsyncSessionLocal, IngestJournal(str(tmp_path / "ingest.journal")), max_delay=0.01)
+    app.dependency_overrides[get_ingest] = lambda: test_ingest
+    test_feed = InMemoryBroker()
+    app.dependency_overrides[get_change_feed] = lambda: test_feed
+    test_purger = Purger(TestingAsyncSessionLocal, pause=0)
+    app.dependency_overrides[get_purger] = lambda: test_purger
     
     with TestClient(app) as client:
         yield client
+        # The writer task lives on the client's event loop
+        client.portal.call(test_ingest.close)
+        client.portal.call(test_translator.close)
+        client.portal.call(test_purger.close)
     
     del app.dependency_overrides[get_db]
+    del app.dependency_overrides[get_async_db]
+    del app.dependency_overrides[get_async_read_db]
+    del app.dependency_overrides[get_translator]
+    del app.dependency_overrides[get_ingest]
+    del app.dependency_overrides[get_change_feed]
+    del app.dependency_overrides[get_purger]
 
 @pytest.fixture(scope="function")
 def authenticated_client(test_client):
@@ -67,4 +112,42 @@ def authenticated_client(test_client):
     # Set the authentication header for the client
     test_client.headers["Authorization"] = f"Bearer {token}"
 
-    yield test_client
\ No newline at end of file
+    yield test_client
+
+@pytest.fixture(scope="function")
+def captured_sql():
+    """
+    Records every (statement, parameters) pair the API sends to the test database.
+    """
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+@pytest.fixture(scope="function")
+def run_with_temp_db(tmp_path):
+    """
+    Runs `scenario(session_factory)` on a fresh event loop against its own
+    SQLite file with every table created, and returns what it returns.
+    `profile` applies a database.apply_sqlite_profile() profile first.
+    """
+    def run(scenario, profile=None):
+        async def main():
+            engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'scenario.db'}")
+            if profile is not None:
+                apply_sqlite_profile(engine.sync_engine, profile=profile)
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            session_factory = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+            try:
+                return await scenario(session_factory)
+            finally:
+                await engine.dispose()
+
+        return asyncio.run(main())
+
+    return run
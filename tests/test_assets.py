@@ -0,0 +1,72 @@
+# FILE: tests/test_assets.py
+
+import gzip
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from Backend1.assets import IMMUTABLE_CACHE_CONTROL, AssetFiles, build_assets
+
+
+def _source(tmp_path):
+    source = tmp_path / "static"
+    (source / "js" / "modules").mkdir(parents=True)
+    (source / "js" / "modules" / "notes.js").write_text("export const notes = 1;\n" + "// padding\n" * 100)
+    (source / "js" / "app.js").write_text("import { notes } from './modules/notes.js';\nconsole.log(notes);\n")
+    return source
+
+
+def test_build_hashes_names_and_rewrites_module_imports(tmp_path):
+    build = tmp_path / "build"
+    manifest = build_assets(str(_source(tmp_path)), str(build))
+
+    notes = manifest["js/modules/notes.js"]
+    assert notes.startswith("js/modules/notes.") and notes.endswith(".js") and notes != "js/modules/notes.js"
+    # app.js must import the same hashed module URL the page links to.
+    assert f"from './modules/{notes.rsplit('/', 1)[1]}'" in (build / manifest["js/app.js"]).read_text()
+    assert gzip.decompress((build / (notes + ".gz")).read_bytes()) == (build / notes).read_bytes()
+
+    # Changing a dependency changes the importer's hash as well.
+    (tmp_path / "static" / "js" / "modules" / "notes.js").write_text("export const notes = 2;\n")
+    rebuilt = build_assets(str(tmp_path / "static"), str(build))
+    assert rebuilt["js/modules/notes.js"] != notes
+    assert rebuilt["js/app.js"] != manifest["js/app.js"]
+
+
+def test_hashed_assets_are_immutable_and_precompressed(tmp_path):
+    build = tmp_path / "build"
+    manifest = build_assets(str(_source(tmp_path)), str(build))
+    app = FastAPI()
+    files = AssetFiles(directory=str(tmp_path / "static"), build_directory=str(build))
+    app.mount("/static", files)
+    client = TestClient(app)
+
+    url = files.url("js/modules/notes.js")
+    response = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-type"].startswith("text/javascript")
+    assert response.content == (build / manifest["js/modules/notes.js"]).read_bytes()
+
+    plain = client.get("/static/js/modules/notes.js")
+    assert plain.status_code == 200 and plain.headers["cache-control"] == "no-cache"
+    assert client.get("/static/js/app.js", headers={"If-None-Match": plain.headers["etag"]}).status_code == 200
+    assert client.get("/static/js/modules/notes.js", headers={"If-None-Match": plain.headers["etag"]}).status_code == 304
+
+
+def test_home_page_is_cached_and_revalidated(test_client: TestClient):
+    response = test_client.get("/")
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "no-cache"
+    assert test_client.get("/", headers={"If-None-Match": response.headers["etag"]}).status_code == 304
+
+
+def test_large_api_responses_are_compressed(authenticated_client: TestClient):
+    for i in range(20):
+        authenticated_client.post("/notes/", json={"title": f"Note {i}", "content": "word " * 50})
+
+    response = authenticated_client.get("/notes/", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()) == 20
+    small = authenticated_client.get("/notes/folders", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
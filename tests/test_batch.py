@@ -0,0 +1,80 @@
+# FILE: tests/test_batch.py
+
+from fastapi.testclient import TestClient
+
+
+def _batch(client: TestClient, operations, atomic=True) -> dict:
+    response = client.post("/batch", json={"atomic": atomic, "operations": operations})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_moves_notes_between_folders_in_one_request(authenticated_client: TestClient):
+    body = _batch(authenticated_client, [{"op": "folder.create", "ref": "archive", "data": {"folder_name": "Archive"}}] + [
+        {"op": "note.create", "data": {"title": f"Note {i}"}} for i in range(20)
+    ])
+    assert body["committed"] is True
+    folder_id = body["results"][0]["id"]
+    note_ids = [result["id"] for result in body["results"][1:]]
+    assert all(result["status"] == 201 for result in body["results"])
+
+    body = _batch(authenticated_client, [
+        {"op": "note.update", "note_id": note_id, "data": {"folder_id": folder_id}} for note_id in note_ids
+    ])
+    assert [result["status"] for result in body["results"]] == [200] * 20
+
+    notes = authenticated_client.get("/notes/").json()
+    assert {note["folder_id"] for note in notes} == {folder_id}
+    assert {note["version"] for note in notes} == {2}
+
+
+def test_refs_link_operations_in_the_same_batch(authenticated_client: TestClient):
+    body = _batch(authenticated_client, [
+        {"op": "folder.create", "ref": "f", "data": {"folder_name": "Trip"}},
+        {"op": "note.create", "ref": "n", "data": {"title": "Packing", "folder_id": "f"}},
+        {"op": "note.update", "note_id": "n", "base_version": 1, "data": {"content": "socks"}},
+    ])
+    folder_id, note_id = body["results"][0]["id"], body["results"][1]["id"]
+    note = authenticated_client.get(f"/notes/{note_id}").json()
+    assert (note["folder_id"], note["content"], note["version"]) == (folder_id, "socks", 2)
+
+
+def test_atomic_batch_rolls_back_on_the_first_failure(authenticated_client: TestClient):
+    note_id = authenticated_client.post("/notes/", json={"title": "Keep"}).json()["note_id"]
+    body = _batch(authenticated_client, [
+        {"op": "note.delete", "note_id": note_id},
+        {"op": "note.update", "note_id": 9999, "data": {"title": "x"}},
+        {"op": "note.create", "data": {"title": "Never"}},
+    ])
+    assert body["committed"] is False
+    assert [result["status"] for result in body["results"]] == [204, 404, 424]
+    assert [note["title"] for note in authenticated_client.get("/notes/").json()] == ["Keep"]
+
+
+def test_non_atomic_batch_skips_failed_operations(authenticated_client: TestClient):
+    note = authenticated_client.post("/notes/", json={"title": "A"}).json()
+    authenticated_client.put(f"/notes/{note['note_id']}", json={"title": "B"})
+    body = _batch(authenticated_client, [
+        {"op": "note.delete", "note_id": note["note_id"], "base_version": 1},
+        {"op": "note.create", "data": {"folder_id": "missing-ref"}},
+        {"op": "note.create", "data": {"title": "C"}},
+    ], atomic=False)
+    assert body["committed"] is True
+    assert [result["status"] for result in body["results"]] == [409, 422, 201]
+    assert body["results"][0]["version"] == 2
+    assert sorted(n["title"] for n in authenticated_client.get("/notes/").json()) == ["B", "C"]
+
+
+def test_adds_items_to_the_users_stacks(authenticated_client: TestClient):
+    stack = authenticated_client.post("/flashcards/decks-from-items", json={"deck_name": "German", "items": []}).json()
+    body = _batch(authenticated_client, [
+        {"op": "stack.add_item", "stack_id": stack["stack_id"], "data": {"text": f"Wort {i}"}} for i in range(3)
+    ] + [{"op": "stack.add_item", "stack_id": 9999, "data": {"text": "nowhere"}}], atomic=False)
+    assert [result["status"] for result in body["results"]] == [201, 201, 201, 404]
+    (workspace_stack,) = authenticated_client.get("/workspace", params={"include_cards": True}).json()["stacks"]
+    assert sorted(card["front_text"] for card in workspace_stack["cards"]) == ["Wort 0", "Wort 1", "Wort 2"]
+
+
+def test_rejects_unknown_operations(authenticated_client: TestClient):
+    response = authenticated_client.post("/batch", json={"operations": [{"op": "note.explode", "note_id": 1}]})
+    assert response.status_code == 422
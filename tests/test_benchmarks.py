@@ -0,0 +1,30 @@
+# FILE: tests/test_benchmarks.py
+
+import json
+import os
+import subprocess
+import sys
+
+BENCHMARKS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks")
+
+
+def test_loadtest_runs_with_a_tiny_config(tmp_path):
+    """
+    Smoke test: the load generator starts, drives every operation and writes
+    its results. It runs in its own process, as it would from the command line.
+    """
+    output = tmp_path / "loadtest.json"
+    completed = subprocess.run(
+        [
+            sys.executable, os.path.join(BENCHMARKS_DIR, "loadtest.py"),
+            "--clients", "2", "--seconds", "0.5", "--users", "2", "--notes-per-user", "5",
+            "--stacks", "1", "--cards-per-stack", "5", "--output", str(output),
+        ],
+        capture_output=True, text=True, timeout=120,
+        env={**os.environ, "BCRYPT_ROUNDS": "4"},
+    )
+    assert completed.returncode == 0, completed.stderr
+
+    metrics = json.loads(output.read_text())["metrics"]
+    assert metrics["total"]["count"] > 0
+    assert metrics["total"]["errors"] == 0
@@ -0,0 +1,170 @@
+# FILE: tests/test_changefeed.py
+
+import asyncio
+
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from Backend1.api.routers import changes
+from Backend1.changefeed import Broker, InMemoryBroker, SQLiteBroker, format_sse, get_change_feed
+from Backend1.main import app
+
+
+async def _drain(subscription, timeout=0.05):
+    events = []
+    while (event := await subscription.get(timeout=timeout)) is not None:
+        events.append(event)
+    return events
+
+
+def test_events_fan_out_per_user_and_resume_from_a_cursor():
+    async def main():
+        broker = InMemoryBroker()
+        live = await broker.subscribe(1)
+        await broker.publish(1, "note", "created", 10)
+        await broker.publish(2, "note", "created", 20)
+        await broker.publish(1, "note", "updated", 10, {"version": 2})
+
+        events = await _drain(live)
+        assert [(e["entity_id"], e["op"]) for e in events] == [(10, "created"), (10, "updated")]
+
+        resumed = await broker.subscribe("1", events[0]["id"])
+        assert [e["id"] for e in await _drain(resumed)] == [events[1]["id"]]
+        live.close()
+        resumed.close()
+        assert broker._subscribers == {}
+
+    asyncio.run(main())
+
+
+def test_sse_subscription_lives_and_dies_with_the_stream():
+    """
+    Tests that a stream the client abandons before it starts never subscribes,
+    and that one closed mid-way unsubscribes.
+    """
+    async def main():
+        broker = InMemoryBroker()
+        await changes._event_stream(broker, 1, None, 0.01).aclose()
+        assert broker._subscribers == {}
+
+        stream = changes._event_stream(broker, 1, None, 0.01)
+        assert (await stream.__anext__()).startswith(b"retry:")
+        assert set(broker._subscribers) == {"1"}
+        await stream.aclose()
+        assert broker._subscribers == {}
+
+    asyncio.run(main())
+
+
+def test_incomplete_brokers_fail_when_created():
+    class NoBacklog(Broker):
+        async def publish(self, user_id, entity, op, entity_id, data=None):
+            pass
+
+    with pytest.raises(TypeError):
+        NoBacklog()
+
+
+def test_unusable_cursors_get_a_reset():
+    async def main():
+        broker = InMemoryBroker(buffer_size=2)
+        for note_id in range(4):
+            await broker.publish(1, "note", "created", note_id)
+
+        too_old = await broker.subscribe(1, broker.cursor(1))
+        assert [e["op"] for e in await _drain(too_old)] == ["reset"]
+        foreign = await broker.subscribe(1, "otherbroker-3")
+        (reset,) = await _drain(foreign)
+        assert reset == {"id": broker.cursor(4), "op": "reset"}
+
+        # Resuming from the reset's cursor picks up exactly what came after it.
+        await broker.publish(1, "note", "deleted", 0)
+        resumed = await broker.subscribe(1, reset["id"])
+        assert [e["op"] for e in await _drain(resumed)] == ["deleted"]
+
+    asyncio.run(main())
+
+
+def test_slow_subscriber_is_reset_instead_of_buffering_forever():
+    async def main():
+        broker = InMemoryBroker(queue_size=3)
+        slow = await broker.subscribe(1)
+        for note_id in range(5):
+            await broker.publish(1, "note", "created", note_id)
+        events = await _drain(slow)
+        assert [e["op"] for e in events] == ["reset", "created"]
+        assert events[0]["id"] == broker.cursor(4)
+
+    asyncio.run(main())
+
+
+def test_sqlite_broker_delivers_across_workers(tmp_path):
+    path = str(tmp_path / "changefeed.db")
+
+    async def main():
+        writer = SQLiteBroker(path, poll_interval=0.01)
+        reader = SQLiteBroker(path, poll_interval=0.01)
+        try:
+            live = await reader.subscribe(1)
+            await writer.publish(1, "stack", "created", 5, {"stack_name": "German"})
+            await writer.publish(2, "stack", "created", 6)
+            (event,) = await _drain(live, timeout=0.5)
+            assert event["entity_id"] == 5 and event["data"] == {"stack_name": "German"}
+
+            # Cursors from one worker resume on another.
+            await writer.publish(1, "stack", "deleted", 5)
+            resumed = await writer.subscribe(1, event["id"])
+            assert [e["op"] for e in await _drain(resumed, timeout=0.5)] == ["deleted"]
+        finally:
+            await writer.close()
+            await reader.close()
+
+    asyncio.run(main())
+
+
+def test_sse_message_format():
+    message = format_sse({"id": "abc-3", "entity": "note", "op": "deleted", "entity_id": 1, "data": None})
+    assert message.startswith(b"id: abc-3\ndata: {")
+    assert message.endswith(b"}\n\n")
+
+
+def _token(client):
+    return client.headers["Authorization"].split(" ", 1)[1]
+
+
+def test_websocket_receives_note_changes(authenticated_client):
+    token = _token(authenticated_client)
+    with authenticated_client.websocket_connect(f"/changes/ws?access_token={token}") as ws:
+        note_id = authenticated_client.post("/notes/", json={"title": "Hi", "content": "x"}).json()["note_id"]
+        created = ws.receive_json()
+        assert (created["entity"], created["op"], created["entity_id"]) == ("note", "created", note_id)
+        assert created["data"]["title"] == "Hi"
+
+        authenticated_client.delete(f"/notes/{note_id}")
+        deleted = ws.receive_json()
+        assert (deleted["op"], deleted["entity_id"]) == ("deleted", note_id)
+
+    # Reconnecting from the first cursor replays only the delete.
+    with authenticated_client.websocket_connect(f"/changes/ws?access_token={token}&after={created['id']}") as ws:
+        assert ws.receive_json()["id"] == deleted["id"]
+
+
+def test_websocket_requires_a_token(test_client):
+    with pytest.raises(WebSocketDisconnect) as exc:
+        with test_client.websocket_connect("/changes/ws?access_token=bogus"):
+            pass
+    assert exc.value.code == 1008
+
+
+def test_sse_stream_requires_a_token(test_client):
+    assert test_client.get("/changes/stream").status_code == 401
+
+
+def test_events_are_only_published_after_a_successful_write(authenticated_client):
+    async def subscribe():
+        return await app.dependency_overrides[get_change_feed]().subscribe("1")
+
+    subscription = authenticated_client.portal.call(subscribe)
+    assert authenticated_client.put("/notes/999", json={"title": "x", "content": "y"}).status_code == 404
+    authenticated_client.post("/notes/", json={"title": "Hi", "content": "x"})
+    assert [e["op"] for e in authenticated_client.portal.call(_drain, subscription)] == ["created"]
@@ -34,4 +34,19 @@ def test_create_stack_success(authenticated_client: TestClient):
     # Verify the stack was actually created
     get_response = authenticated_client.get("/collections/stacks")
     assert len(get_response.json()) == 1
-    assert get_response.json()[0]["stack_name"] == "My First Collection"
\ No newline at end of file
+    assert get_response.json()[0]["stack_name"] == "My First Collection"
+
+
+def test_add_item_and_delete_stack(authenticated_client: TestClient):
+    """
+    Tests the /api/v1 stack writes: create a stack, add an item to it, delete it.
+    """
+    stack = authenticated_client.post("/api/v1/stacks", json={"stack_name": "Vocab"}).json()
+    response = authenticated_client.post(f"/api/v1/stacks/{stack['stack_id']}/items", json={"text": "der Hund"})
+    assert response.status_code == 200
+    cards = authenticated_client.get(f"/api/v1/stacks/{stack['stack_id']}/flashcards").json()
+    assert [card["front_text"] for card in cards] == ["der Hund"]
+    assert authenticated_client.post("/api/v1/stacks/9999/items", json={"text": "x"}).status_code == 404
+
+    assert authenticated_client.delete(f"/api/v1/stacks/{stack['stack_id']}").status_code == 204
+    assert authenticated_client.get(f"/api/v1/stacks/{stack['stack_id']}/flashcards").status_code == 404
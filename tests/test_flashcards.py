@@ -0,0 +1,146 @@
+# FILE: tests/test_flashcards.py
+
+from fastapi.testclient import TestClient
+
+from Backend1 import models
+
+
+def test_create_deck_from_items(authenticated_client: TestClient, db_session):
+    response = authenticated_client.post("/flashcards/decks-from-items", json={
+        "deck_name": "Vocabulary",
+        "items": [{"text": "hola"}, {"text": "adiós"}, {"text": "gracias"}],
+    })
+    assert response.status_code == 200
+    stack_id = response.json()["stack_id"]
+
+    cards = db_session.query(models.Flashcard).filter(models.Flashcard.stack_id == stack_id).all()
+    assert sorted(card.front_text for card in cards) == ["adiós", "gracias", "hola"]
+
+
+def test_import_deck_from_ndjson(authenticated_client: TestClient, db_session):
+    """
+    Tests a streamed NDJSON import that spans several insert chunks.
+    """
+    body = "\n".join('{"text": "word %d"}' % i for i in range(2500)) + "\n"
+    response = authenticated_client.post(
+        "/flashcards/decks/import",
+        params={"deck_name": "Big deck", "import_id": "ndjson-1"},
+        content=body.encode(),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 201
+    assert response.json()["status"] == "completed"
+    assert response.json()["inserted"] == 2500
+
+    stack_id = response.json()["stack_id"]
+    assert db_session.query(models.Flashcard).filter(models.Flashcard.stack_id == stack_id).count() == 2500
+    progress = authenticated_client.get("/flashcards/imports/ndjson-1").json()
+    assert (progress["received"], progress["inserted"]) == (2500, 2500)
+
+
+def test_import_deck_from_csv(authenticated_client: TestClient, db_session):
+    body = 'lang,text\nes,perro\nes,"gato, negro"\nes,"multi\nline"\n'
+    response = authenticated_client.post(
+        "/flashcards/decks/import",
+        params={"deck_name": "CSV deck"},
+        content=body.encode(),
+        headers={"Content-Type": "text/csv"},
+    )
+    assert response.status_code == 201
+    stack_id = response.json()["stack_id"]
+    cards = db_session.query(models.Flashcard).filter(models.Flashcard.stack_id == stack_id).all()
+    assert sorted(card.front_text for card in cards) == ["gato, negro", "multi\nline", "perro"]
+
+
+def test_failed_import_rolls_back(authenticated_client: TestClient, db_session):
+    response = authenticated_client.post(
+        "/flashcards/decks/import",
+        params={"deck_name": "Broken", "import_id": "broken-1"},
+        content=b'{"text": "ok"}\nnot json\n',
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 400
+    assert "Line 2" in response.json()["detail"]
+    assert db_session.query(models.Stack).filter(models.Stack.stack_name == "Broken").count() == 0
+    assert authenticated_client.get("/flashcards/imports/broken-1").json()["status"] == "failed"
+
+
+def test_import_progress_is_per_user(authenticated_client: TestClient):
+    """
+    Tests that import ids are scoped to the user: another user reusing an id
+    neither overwrites nor sees someone else's progress.
+    """
+    def run_import(name):
+        return authenticated_client.post(
+            "/flashcards/decks/import",
+            params={"deck_name": name, "import_id": "shared-id"},
+            content=b'{"text": "ok"}\n',
+            headers={"Content-Type": "application/x-ndjson"},
+        ).json()
+
+    mine = run_import("Mine")
+    authenticated_client.post("/users/", json={"email": "other@example.com", "password": "otherpassword"})
+    token = authenticated_client.post("/token", data={"username": "other@example.com", "password": "otherpassword"}).json()["access_token"]
+    own_token = authenticated_client.headers["Authorization"]
+    authenticated_client.headers["Authorization"] = f"Bearer {token}"
+    assert authenticated_client.get("/flashcards/imports/shared-id").status_code == 404
+    theirs = run_import("Theirs")
+    assert theirs["stack_id"] != mine["stack_id"]
+
+    authenticated_client.headers["Authorization"] = own_token
+    assert authenticated_client.get("/flashcards/imports/shared-id").json()["stack_id"] == mine["stack_id"]
+
+
+def _create_deck(client: TestClient, words):
+    stack_id = client.post("/flashcards/decks-from-items", json={"deck_name": "SRS", "items": [{"text": w} for w in words]}).json()["stack_id"]
+    return stack_id
+
+
+def test_new_cards_are_due_and_reviews_reschedule_them(authenticated_client: TestClient, db_session):
+    """
+    Tests that a batch of reviews reschedules cards with SM-2 and takes them out of the due queue.
+    """
+    _create_deck(authenticated_client, ["uno", "dos", "tres"])
+    due = authenticated_client.get("/flashcards/due", params={"limit": 10}).json()
+    assert len(due) == 3
+    ids = [card["flashcard_id"] for card in due]
+
+    response = authenticated_client.post("/flashcards/reviews", json={"reviews": [
+        {"flashcard_id": ids[0], "grade": 5},
+        {"flashcard_id": ids[1], "grade": 1},
+    ]})
+    assert response.status_code == 200
+    results = {r["flashcard_id"]: r for r in response.json()}
+    assert results[ids[0]]["interval_days"] == 1.0 and results[ids[0]]["ease"] == 2.6
+    assert results[ids[1]]["lapses"] == 1 and results[ids[1]]["ease"] < 2.5
+
+    assert [card["flashcard_id"] for card in authenticated_client.get("/flashcards/due").json()] == [ids[2]]
+    card = db_session.get(models.Flashcard, ids[0])
+    assert card.repetitions == 1 and card.last_reviewed_at is not None
+
+
+def test_repeated_reviews_in_one_batch_apply_in_order(authenticated_client: TestClient):
+    _create_deck(authenticated_client, ["cuatro"])
+    card_id = authenticated_client.get("/flashcards/due").json()[0]["flashcard_id"]
+
+    response = authenticated_client.post("/flashcards/reviews", json={"reviews": [
+        {"flashcard_id": card_id, "grade": 4, "reviewed_at": "2026-01-02T09:00:00Z"},
+        {"flashcard_id": card_id, "grade": 4, "reviewed_at": "2026-01-01T09:00:00+00:00"},
+    ]})
+    (result,) = response.json()
+    # Second successful review in a row: SM-2 jumps to 6 days after the later review.
+    assert result["repetitions"] == 2 and result["interval_days"] == 6.0
+    assert result["due_at"].startswith("2026-01-08T09:00:00")
+
+
+def test_reviews_of_unknown_cards_are_rejected_atomically(authenticated_client: TestClient, db_session):
+    _create_deck(authenticated_client, ["cinco"])
+    card_id = authenticated_client.get("/flashcards/due").json()[0]["flashcard_id"]
+
+    response = authenticated_client.post("/flashcards/reviews", json={"reviews": [
+        {"flashcard_id": card_id, "grade": 4},
+        {"flashcard_id": 999999, "grade": 4},
+    ]})
+    assert response.status_code == 404
+    assert db_session.get(models.Flashcard, card_id).repetitions == 0
+    assert authenticated_client.post("/flashcards/reviews", json={"reviews": [{"flashcard_id": card_id, "grade": 6}]}).status_code == 422
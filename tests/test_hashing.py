@@ -0,0 +1,55 @@
+# FILE: tests/test_hashing.py
+
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from passlib.context import CryptContext
+
+from Backend1 import models, security
+from Backend1.hashing import HashingBusyError, PasswordHasher
+
+
+def test_hasher_rejects_work_beyond_queue_limit():
+    """
+    Tests that once running + pending jobs hit the cap, new jobs are refused instead of queued.
+    """
+    hasher = PasswordHasher(CryptContext(schemes=["bcrypt"], bcrypt__rounds=4), max_workers=1, max_pending=1)
+    release = threading.Event()
+    try:
+        hasher.submit(release.wait)
+        hasher.submit(release.wait)
+        with pytest.raises(HashingBusyError):
+            hasher.submit(release.wait)
+    finally:
+        release.set()
+        hasher.shutdown()
+
+
+def test_login_rehashes_outdated_password_hash(test_client: TestClient, db_session):
+    """
+    Tests that logging in with a hash made at a lower cost factor upgrades the stored hash.
+    """
+    weak_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4)
+    db_session.add(models.User(email="rehash@example.com", hashed_password=weak_context.hash("password123")))
+    db_session.commit()
+
+    response = test_client.post("/token", data={"username": "rehash@example.com", "password": "password123"})
+    assert response.status_code == 200
+
+    db_session.expire_all()
+    user = db_session.query(models.User).filter(models.User.email == "rehash@example.com").first()
+    assert not security.pwd_context.needs_update(user.hashed_password)
+    assert security.pwd_context.verify("password123", user.hashed_password)
+
+
+def test_login_returns_503_when_hashing_is_saturated(test_client: TestClient, monkeypatch):
+    test_client.post("/users/", json={"email": "busy@example.com", "password": "password123"})
+
+    def saturated(*args):
+        raise HashingBusyError("Password hashing queue is full.")
+
+    monkeypatch.setattr(security.password_hasher, "submit", saturated)
+    response = test_client.post("/token", data={"username": "busy@example.com", "password": "password123"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
@@ -0,0 +1,259 @@
+# FILE: tests/test_ingest.py
+
+import asyncio
+import os
+import sqlite3
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select, text
+from sqlalchemy.exc import OperationalError
+
+from Backend1 import ingest as ingest_module
+from Backend1 import models
+from Backend1.ingest import IngestBusyError, IngestJournal, IngestPipeline, get_ingest
+from Backend1.main import app
+
+HISTORY = models.CollectedItem.__tablename__
+
+
+def _row(i):
+    return {"user_id": "1", "selected_text": f"item {i}", "timestamp_collected": "2026-01-01T00:00:00"}
+
+
+async def _count(session_factory) -> int:
+    async with session_factory() as session:
+        return await session.scalar(select(func.count()).select_from(models.CollectedItem))
+
+
+def test_events_are_written_in_batches(tmp_path, run_with_temp_db):
+    """
+    Tests that many small submissions end up in a few multi-row transactions.
+    """
+    inserts = []
+
+    async def scenario(session_factory):
+        pipeline = IngestPipeline(session_factory, IngestJournal(str(tmp_path / "j")), max_batch=100, max_delay=0.05)
+        original = pipeline._insert
+
+        async def recording(batch):
+            inserts.append(len(batch))
+            await original(batch)
+
+        pipeline._insert = recording
+        await asyncio.gather(*(pipeline.submit(HISTORY, [_row(i)]) for i in range(250)))
+        await pipeline.drain()
+        await pipeline.close()
+        return await _count(session_factory)
+
+    assert run_with_temp_db(scenario) == 250
+    assert sum(inserts) == 250
+    assert len(inserts) <= 4
+    # Everything committed, so the journal was truncated.
+    assert (tmp_path / "j").read_text() == ""
+
+
+def test_full_queue_pushes_back(tmp_path, run_with_temp_db):
+    async def scenario(session_factory):
+        pipeline = IngestPipeline(session_factory, IngestJournal(str(tmp_path / "j")), max_pending=5, put_timeout=0.05)
+        stalled = asyncio.Event()
+
+        async def stuck(batch):
+            await stalled.wait()
+
+        pipeline._insert = stuck
+        await pipeline.submit(HISTORY, [_row(i) for i in range(5)])
+        await asyncio.sleep(0.1)  # the writer takes those five and stalls
+        await pipeline.submit(HISTORY, [_row(i) for i in range(5)])
+        with pytest.raises(IngestBusyError):
+            await pipeline.submit(HISTORY, [_row(99)])
+        stalled.set()
+        await pipeline.close()
+
+    run_with_temp_db(scenario)
+
+
+def test_journaled_events_survive_a_crash(tmp_path, run_with_temp_db):
+    """
+    Tests that records journaled by a process that died before writing them are replayed on startup.
+    """
+    journal_path = str(tmp_path / "j")
+
+    async def scenario(session_factory):
+        crashed = IngestJournal(journal_path)
+        crashed.append([(1, HISTORY, _row(1)), (2, HISTORY, _row(2))])
+        crashed.mark_committed(1, 1)
+        crashed.append([(3, HISTORY, _row(3))])
+        crashed.close()
+        with open(journal_path, "a") as file:
+            file.write('{"seq": 4, "tab')  # torn write
+
+        pipeline = IngestPipeline(session_factory, IngestJournal(journal_path), max_delay=0.01)
+        replayed = await pipeline.recover()
+        await pipeline.submit(HISTORY, [_row(4)])
+        await pipeline.close()
+        async with session_factory() as session:
+            texts = (await session.scalars(select(models.CollectedItem.selected_text).order_by(models.CollectedItem.item_id))).all()
+        return replayed, texts
+
+    replayed, texts = run_with_temp_db(scenario)
+    assert replayed == 2
+    assert texts == ["item 2", "item 3", "item 4"]
+
+
+def test_journals_of_dead_workers_are_adopted(tmp_path, run_with_temp_db):
+    """
+    Tests that each worker journals to its own file and that a new worker
+    replays the journals no live process holds, leaving the others alone.
+    """
+    base = str(tmp_path / "ingest.journal")
+    dead = IngestJournal(str(tmp_path / "ingest.999999.journal"))
+    dead.append([(1, HISTORY, _row(1)), (2, HISTORY, _row(2))])
+    dead.mark_committed(1, 1)
+    dead.close()
+    legacy = IngestJournal(base)
+    legacy.append([(1, HISTORY, _row(3))])
+    legacy.close()
+    live = IngestJournal(str(tmp_path / "ingest.888888.journal"))
+    live.append([(1, HISTORY, _row(4))])
+
+    async def scenario(session_factory):
+        pipeline = IngestPipeline(session_factory, IngestJournal(base, per_process=True), max_delay=0.01)
+        replayed = await pipeline.recover()
+        assert pipeline.journal.path == str(tmp_path / f"ingest.{os.getpid()}.journal")
+        await pipeline.close()
+        async with session_factory() as session:
+            return replayed, (await session.scalars(select(models.CollectedItem.selected_text))).all()
+
+    replayed, texts = run_with_temp_db(scenario)
+    live.close()
+    assert replayed == 2
+    assert sorted(texts) == ["item 2", "item 3"]
+    assert sorted(os.listdir(tmp_path)) == ["ingest.888888.journal", "scenario.db"]
+
+
+def test_only_a_locked_database_is_retried(tmp_path, run_with_temp_db, caplog):
+    """
+    Tests that a batch failing for good is given up at once, a batch that keeps
+    hitting a locked database after max_retries, and the queue moves on. Both
+    stay uncommitted in the journal and are written on the next start.
+    """
+    attempts = []
+    journal_path = str(tmp_path / "j")
+
+    async def scenario(session_factory):
+        pipeline = IngestPipeline(session_factory, IngestJournal(journal_path), max_delay=0.01, retry_delay=0.001, max_retries=3)
+        original = pipeline._insert
+
+        async def flaky(batch):
+            text_ = batch[0][2]["selected_text"]
+            attempts.append(text_)
+            if text_ == "item 1":
+                raise OperationalError("INSERT", {}, sqlite3.OperationalError("database is locked"))
+            await original(batch)
+
+        pipeline._insert = flaky
+        await pipeline.submit(HISTORY, [_row(1)])
+        await pipeline.drain()
+        async with session_factory() as session:
+            await session.execute(text('ALTER TABLE "CollectedItems" RENAME TO "Moved"'))
+            await session.commit()
+        await pipeline.submit(HISTORY, [_row(2)])
+        await pipeline.drain()
+        async with session_factory() as session:
+            await session.execute(text('ALTER TABLE "Moved" RENAME TO "CollectedItems"'))
+            await session.commit()
+        await pipeline.submit(HISTORY, [_row(3)])
+        await pipeline.close()
+        async with session_factory() as session:
+            written = (await session.scalars(select(models.CollectedItem.selected_text))).all()
+
+        restarted = IngestPipeline(session_factory, IngestJournal(journal_path), max_delay=0.01)
+        replayed = await restarted.recover()
+        await restarted.close()
+        async with session_factory() as session:
+            return written, replayed, (await session.scalars(select(models.CollectedItem.selected_text))).all()
+
+    written, replayed, after_restart = run_with_temp_db(scenario)
+    assert written == ["item 3"]
+    assert attempts == ["item 1"] * 4 + ["item 2", "item 3"]
+    assert sum("Keeping ingest batch" in r.message for r in caplog.records) == 2
+    assert replayed == 2
+    assert sorted(after_restart) == ["item 1", "item 2", "item 3"]
+
+
+def test_journal_is_compacted_while_records_stay_pending(tmp_path, run_with_temp_db):
+    """
+    Tests that a journal that never empties (here, because one batch failed)
+    is rewritten down to its uncommitted records instead of growing forever.
+    """
+    journal_path = str(tmp_path / "j")
+    sizes = []
+
+    async def scenario(session_factory):
+        pipeline = IngestPipeline(session_factory, IngestJournal(journal_path), max_batch=10, max_delay=0.001, compact_bytes=4000)
+        original = pipeline._insert
+
+        async def failing_once(batch):
+            if batch[0][2]["selected_text"] == "item 0":
+                raise OperationalError("INSERT", {}, sqlite3.OperationalError("no such table"))
+            await original(batch)
+            sizes.append(os.path.getsize(journal_path))
+
+        pipeline._insert = failing_once
+        await pipeline.submit(HISTORY, [_row(0)])
+        await pipeline.drain()
+        for start in range(1, 500, 10):
+            await pipeline.submit(HISTORY, [_row(i) for i in range(start, start + 10)])
+            await pipeline.drain()
+        await pipeline.close()
+
+        restarted = IngestPipeline(session_factory, IngestJournal(journal_path), max_delay=0.001)
+        replayed = await restarted.recover()
+        await restarted.close()
+        return replayed, await _count(session_factory)
+
+    replayed, written = run_with_temp_db(scenario)
+    assert (replayed, written) == (1, 501)
+    # 500 journaled rows come to well over 40KB without compaction.
+    assert max(sizes) < 8000
+
+
+def test_journal_fsync_does_not_block_the_event_loop(tmp_path, run_with_temp_db, monkeypatch):
+    """
+    Tests that a slow fsync of the journal runs off the event loop, so other
+    coroutines keep running while a submission waits for it.
+    """
+    monkeypatch.setattr(ingest_module.os, "fsync", lambda fd: time.sleep(0.2))
+
+    async def scenario(session_factory):
+        pipeline = IngestPipeline(session_factory, IngestJournal(str(tmp_path / "j"), fsync=True), max_delay=0.01)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.ensure_future(ticker())
+        await pipeline.submit(HISTORY, [_row(1)])
+        task.cancel()
+        await pipeline.close()
+        return ticks
+
+    assert run_with_temp_db(scenario) >= 5
+
+
+def test_history_batch_endpoint(authenticated_client: TestClient, db_session):
+    items = [{"text": f"word {i}", "source_url": "https://example.com"} for i in range(3)]
+    response = authenticated_client.post("/history/log/batch", json={"items": items})
+    assert response.status_code == 202
+    assert authenticated_client.post("/history/log", json={"text": "single"}).status_code == 202
+    log = {"originalText": "Hallo", "translatedText": "Hello", "sourceLanguage": "de", "targetLanguage": "en", "timestamp": "2026-01-01T00:00:00Z"}
+    assert authenticated_client.post("/translation/logs", json=log).status_code == 202
+
+    authenticated_client.portal.call(app.dependency_overrides[get_ingest]().drain)
+    assert sorted(item.selected_text for item in db_session.query(models.CollectedItem)) == ["single", "word 0", "word 1", "word 2"]
+    assert [log.translated_text for log in db_session.query(models.TranslationLog)] == ["Hello"]
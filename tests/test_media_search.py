@@ -0,0 +1,133 @@
+# FILE: tests/test_media_search.py
+
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from Backend1 import media_index
+
+CATALOG = [
+    {
+        "id": "Tk35942nI3o",
+        "media_type": "youtube",
+        "title": "The new FastAPI framework",
+        "author": "Sebastián Ramírez (tiangolo)",
+        "url": "https://www.youtube.com/watch?v=Tk35942nI3o",
+        "thumbnail_url": "https://i.ytimg.com/vi/Tk35942nI3o/hqdefault.jpg",
+        "transcript": [
+            {"start": 5.2, "text": "Hi everyone. Thank you for coming."},
+            {"start": 7.1, "text": "My name is Sebastián Ramírez, I'm the creator of FastAPI."},
+            {"start": 13.0, "text": "So FastAPI is a modern web framework for building APIs."},
+        ],
+    },
+    {
+        "id": "abc123",
+        "media_type": "youtube",
+        "title": "Spanish for beginners",
+        "author": "Profe",
+        "url": "https://www.youtube.com/watch?v=abc123",
+        "transcript": [
+            {"start": 1.0, "text": "Hola, bienvenidos."},
+            {"start": 60.5, "text": "Today we learn the word framework in Spanish: marco."},
+        ],
+    },
+]
+
+
+def _load_catalog(items):
+    async def main():
+        engine = create_async_engine("sqlite+aiosqlite:///./test.db")
+        try:
+            async with async_sessionmaker(bind=engine, class_=AsyncSession)() as db:
+                for item in items:
+                    await media_index.upsert_media(db, item)
+                await db.commit()
+        finally:
+            await engine.dispose()
+
+    asyncio.run(main())
+
+
+def test_media_search_returns_matching_timestamps(authenticated_client: TestClient):
+    """
+    Tests that hits come back best first with the timestamps of the matching segments.
+    """
+    fillers = [
+        {"id": f"filler{i}", "media_type": "youtube", "title": f"Cooking show {i}", "author": "Chef", "url": f"https://example.com/{i}",
+         "transcript": [{"start": 0.0, "text": "Today we cook pasta."}]}
+        for i in range(3)
+    ]
+    _load_catalog(CATALOG + fillers)
+
+    response = authenticated_client.get("/media-search/", params={"query": "framework"})
+    assert response.status_code == 200
+    hits = response.json()
+    # The title match ranks the FastAPI talk first.
+    assert [hit["id"] for hit in hits] == ["Tk35942nI3o", "abc123"]
+    assert [m["start"] for m in hits[0]["matches"]] == [13.0]
+    assert "<mark>framework</mark>" in hits[0]["matches"][0]["text"]
+    assert [m["start"] for m in hits[1]["matches"]] == [60.5]
+
+    assert authenticated_client.get("/media-search/", params={"query": "ramirez"}).json()[0]["id"] == "Tk35942nI3o"
+    assert authenticated_client.get("/media-search/", params={"query": "zzzz"}).json() == []
+    assert authenticated_client.get("/media-search/").json() == []
+
+
+def test_media_search_cache_is_invalidated_by_catalog_changes(authenticated_client: TestClient):
+    _load_catalog(CATALOG[:1])
+    assert len(authenticated_client.get("/media-search/", params={"query": "framework"}).json()) == 1
+
+    _load_catalog(CATALOG[1:])
+    assert len(authenticated_client.get("/media-search/", params={"query": "framework"}).json()) == 2
+
+    # Re-indexing an item replaces its transcript.
+    _load_catalog([{**CATALOG[1], "transcript": [{"start": 2.0, "text": "Nothing to see here."}]}])
+    assert [hit["id"] for hit in authenticated_client.get("/media-search/", params={"query": "framework"}).json()] == ["Tk35942nI3o"]
+
+
+def _lines(response):
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+def test_search_hits_carry_a_transcript_handle_instead_of_the_transcript(authenticated_client: TestClient):
+    _load_catalog(CATALOG)
+    (hit,) = authenticated_client.get("/media-search/", params={"query": "creator"}).json()
+    assert "transcript" not in hit
+    assert hit["transcript_url"] == "/media-search/Tk35942nI3o/transcript"
+    assert hit["segment_count"] == 3 and hit["duration"] == 13.0
+
+    response = authenticated_client.get(hit["transcript_url"])
+    assert response.status_code == 200
+    assert response.headers["accept-ranges"] == "seconds"
+    assert [segment["start"] for segment in _lines(response)] == [5.2, 7.1, 13.0]
+    assert authenticated_client.get("/media-search/nope/transcript").status_code == 404
+
+
+def test_transcript_range_requests(authenticated_client: TestClient):
+    """
+    Tests that a seconds Range returns only the segments on screen in that window, with 206.
+    """
+    transcript = [{"start": i * 2.0, "end": i * 2.0 + 2.0, "text": f"line {i}"} for i in range(500)]
+    _load_catalog([{**CATALOG[0], "id": "long", "transcript": transcript}])
+    url = "/media-search/long/transcript"
+
+    # 101s falls inside the segment starting at 100s, which is included.
+    window = authenticated_client.get(url, headers={"Range": "seconds=101-110"})
+    assert window.status_code == 206
+    assert window.headers["content-range"] == "seconds 101-110/1000"
+    assert [s["start"] for s in _lines(window)] == [100.0, 102.0, 104.0, 106.0, 108.0, 110.0]
+
+    tail = authenticated_client.get(url, headers={"Range": "seconds=-5"})
+    assert [s["start"] for s in _lines(tail)] == [994.0, 996.0, 998.0]
+
+    # Spans several streamed chunks.
+    assert len(_lines(authenticated_client.get(url, headers={"Range": "seconds=0-"}))) == 500
+    assert len(_lines(authenticated_client.get(url, params={"start": 990}))) == 5
+
+    unsatisfiable = authenticated_client.get(url, headers={"Range": "seconds=2000-2100"})
+    assert unsatisfiable.status_code == 416
+    assert unsatisfiable.headers["content-range"] == "seconds */1000"
+    # Units we do not serve are ignored.
+    assert authenticated_client.get(url, headers={"Range": "bytes=0-10"}).status_code == 200
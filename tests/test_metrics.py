@@ -0,0 +1,84 @@
+# FILE: tests/test_metrics.py
+
+import re
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+
+from Backend1 import metrics
+
+
+def _timing(response, name: str) -> re.Match:
+    return re.search(rf'{name};dur=([\d.]+)(?:;desc="(\d+) queries")?', response.headers["server-timing"])
+
+
+def test_server_timing_breaks_down_each_request(authenticated_client: TestClient):
+    authenticated_client.post("/notes/", json={"title": "Timed"})
+
+    response = authenticated_client.get("/notes/")
+    assert response.status_code == 200
+    assert int(_timing(response, "db").group(2)) >= 1
+    assert float(_timing(response, "auth").group(1)) > 0
+    assert float(_timing(response, "serialize").group(1)) > 0
+
+
+def test_every_route_is_instrumented_including_ones_declared_on_the_app(test_client: TestClient):
+    unwrapped = [
+        route.path for route in test_client.app.routes
+        if isinstance(route, APIRoute) and not getattr(route.dependant.call, "_metrics_wrapped", False)
+    ]
+    assert unwrapped == []
+
+
+def test_metrics_endpoint_exposes_route_histograms(authenticated_client: TestClient):
+    authenticated_client.get("/notes/folders")
+    authenticated_client.get("/notes/folders")
+
+    body = authenticated_client.get("/metrics").text
+    assert 'http_requests_total{method="GET",route="/notes/folders",status="200"}' in body
+    count = re.search(r'http_request_duration_seconds_count\{method="GET",route="/notes/folders"\} (\d+)', body)
+    assert int(count.group(1)) >= 2
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/notes/folders",le="+Inf"}' in body
+    assert "# TYPE http_request_auth_seconds histogram" in body
+
+
+def test_incomplete_metrics_fail_when_created():
+    class NoSamples(metrics.Metric):
+        kind = "gauge"
+
+    with pytest.raises(TypeError):
+        NoSamples("t", "Test.")
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = metrics.Histogram("t_seconds", "Test.", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(("/x",), value)
+    lines = histogram.render()
+    assert 't_seconds_bucket{route="/x",le="0.1"} 1' in lines
+    assert 't_seconds_bucket{route="/x",le="1.0"} 3' in lines
+    assert 't_seconds_bucket{route="/x",le="+Inf"} 4' in lines
+    assert 't_seconds_count{route="/x"} 4' in lines
+
+
+def test_profiler_samples_requests_that_ask_for_it(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, "PROFILER_OUTPUT_DIR", str(tmp_path))
+    profiled = FastAPI()
+
+    @profiled.get("/busy")
+    async def busy():
+        deadline = time.perf_counter() + 0.1
+        while time.perf_counter() < deadline:
+            pass
+        return {}
+
+    profiled.add_middleware(metrics.MetricsMiddleware, profiler_enabled=True)
+    client = TestClient(profiled)
+
+    assert "x-profile" not in client.get("/busy").headers
+    response = client.get("/busy", headers={"X-Profile": "1"})
+    profile = (tmp_path / response.headers["x-profile"]).read_text()
+    assert "busy (test_metrics.py" in profile
@@ -0,0 +1,51 @@
+# FILE: tests/test_migrations.py
+
+import os
+import shutil
+import sqlite3
+
+from alembic import command
+from alembic.config import Config
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Backend1")
+
+
+def _upgrade(path: str):
+    # No ini file: alembic.ini's logging setup would reconfigure pytest's loggers.
+    config = Config()
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    config.set_main_option("sqlalchemy.url", f"sqlite:///{path}")
+    command.upgrade(config, "head")
+
+
+def test_upgrades_the_shipped_database(tmp_path):
+    path = str(tmp_path / "shipped.db")
+    shutil.copy(os.path.join(BACKEND_DIR, "1project_mvp.db"), path)
+    _upgrade(path)
+
+    db = sqlite3.connect(path)
+    db.execute("PRAGMA foreign_keys=ON")
+    foreign_keys = {
+        (table, row[3]): row[6]
+        for table in ("Notes", "Flashcards")
+        for row in db.execute(f'PRAGMA foreign_key_list("{table}")')
+    }
+    assert foreign_keys[("Notes", "folder_id")] == "SET NULL"
+    assert foreign_keys[("Flashcards", "stack_id")] == "CASCADE"
+    nullable = {row[1]: not row[3] for row in db.execute('PRAGMA table_info("Flashcards")')}
+    assert nullable["collected_item_id"]
+
+    # The rebuild keeps the triggers: a cascaded delete still leaves sync tombstones.
+    stack_id, cards = db.execute('SELECT stack_id, COUNT(*) FROM "Flashcards" GROUP BY stack_id ORDER BY 2 DESC').fetchone()
+    db.execute('DELETE FROM "Stacks" WHERE stack_id = ?', (stack_id,))
+    assert db.execute('SELECT COUNT(*) FROM "Flashcards" WHERE stack_id = ?', (stack_id,)).fetchone() == (0,)
+    assert db.execute("""SELECT COUNT(*) FROM "SyncLog" WHERE entity = 'flashcard' AND deleted""").fetchone() == (cards,)
+
+    # The search index is rebuilt with an indexed user_id column.
+    user_id, flashcard_id = db.execute('SELECT user_id, flashcard_id FROM "Flashcards" ORDER BY flashcard_id').fetchone()
+    hits = db.execute("SELECT rowid FROM flashcards_fts WHERE flashcards_fts MATCH ?", (f'user_id : ^"{user_id}"',)).fetchall()
+    assert (flashcard_id,) in hits
+
+    triggers = {row[0] for row in db.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'Notes'")}
+    assert "notes_version_folder_au" in triggers
+    db.close()
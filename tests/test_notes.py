@@ -0,0 +1,207 @@
+# FILE: tests/test_notes.py
+
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+from fastapi import Request
+from fastapi.testclient import TestClient
+
+from Backend1.conditional import Validators
+
+
+def test_create_and_list_folders(authenticated_client: TestClient):
+    """
+    Tests that folders created by a user come back sorted by name.
+    """
+    for name in ["Spanish", "French"]:
+        response = authenticated_client.post("/notes/folders", json={"folder_name": name})
+        assert response.status_code == 201
+
+    response = authenticated_client.get("/notes/folders")
+    assert response.status_code == 200
+    assert [f["folder_name"] for f in response.json()] == ["French", "Spanish"]
+
+
+def test_delete_folder(authenticated_client: TestClient):
+    folder_id = authenticated_client.post("/notes/folders", json={"folder_name": "Temp"}).json()["folder_id"]
+
+    assert authenticated_client.delete(f"/notes/folders/{folder_id}").status_code == 204
+    assert authenticated_client.get("/notes/folders").json() == []
+    assert authenticated_client.delete(f"/notes/folders/{folder_id}").status_code == 404
+
+
+def test_notes_reject_unknown_folders(authenticated_client: TestClient):
+    """
+    Tests that a folder_id that is not one of the user's folders is a 422, not a foreign-key 500.
+    """
+    assert authenticated_client.post("/notes/", json={"title": "A", "folder_id": 9999}).status_code == 422
+    note = authenticated_client.post("/notes/", json={"title": "A"}).json()
+    assert authenticated_client.put(f"/notes/{note['note_id']}", json={"title": "A", "folder_id": 9999}).status_code == 422
+    response = authenticated_client.patch(f"/notes/{note['note_id']}", json={"base_version": 1, "folder_id": 9999})
+    assert response.status_code == 422
+
+    folder_id = authenticated_client.post("/notes/folders", json={"folder_name": "Real"}).json()["folder_id"]
+    response = authenticated_client.patch(f"/notes/{note['note_id']}", json={"base_version": 1, "folder_id": folder_id})
+    assert response.status_code == 200
+    assert authenticated_client.get(f"/notes/{note['note_id']}").json()["folder_id"] == folder_id
+
+
+def test_notes_keyset_pagination_walks_every_note_once(authenticated_client: TestClient):
+    """
+    Tests that following X-Next-Cursor returns every note exactly once, newest first.
+    """
+    created = [authenticated_client.post("/notes/", json={"title": f"Note {i}", "content": "body"}).json()["note_id"] for i in range(5)]
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = authenticated_client.get("/notes/", params=params)
+        assert response.status_code == 200
+        assert len(response.json()) <= 2
+        seen.extend(note["note_id"] for note in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    # All notes share a timestamp, so the note_id tie-breaker decides the order.
+    assert seen == sorted(created, reverse=True)
+
+
+def test_notes_field_projection(authenticated_client: TestClient):
+    authenticated_client.post("/notes/", json={"title": "Projected", "content": "long body " * 100})
+
+    response = authenticated_client.get("/notes/", params={"fields": "note_id,title"})
+    assert response.status_code == 200
+    assert [set(note) for note in response.json()] == [{"note_id", "title"}]
+    assert response.json()[0]["title"] == "Projected"
+
+
+def test_fast_listing_matches_response_model(authenticated_client: TestClient):
+    """
+    Tests that the orjson-rendered listing is identical to the response_model output.
+    """
+    folder_id = authenticated_client.post("/notes/folders", json={"folder_name": "Fast"}).json()["folder_id"]
+    authenticated_client.post("/notes/", json={"title": "Ünïcode ✓", "content": "a\nb", "folder_id": folder_id})
+    authenticated_client.post("/notes/", json={"title": None})
+
+    listed = authenticated_client.get("/notes/").json()
+    assert listed == [authenticated_client.get(f"/notes/{note['note_id']}").json() for note in listed]
+
+
+def test_listing_rejects_bad_cursor_and_fields(authenticated_client: TestClient):
+    assert authenticated_client.get("/notes/", params={"limit": 2, "cursor": "!!!"}).status_code == 400
+    assert authenticated_client.get("/notes/folders", params={"fields": "folder_name,hashed_password"}).status_code == 400
+
+
+def test_patch_note_applies_edits_and_bumps_version(authenticated_client: TestClient):
+    """
+    Tests that a delta autosave splices the content and returns only the new version.
+    """
+    note = authenticated_client.post("/notes/", json={"title": "Draft", "content": "Hola 👋 mundo"}).json()
+    assert note["version"] == 1
+
+    response = authenticated_client.patch(f"/notes/{note['note_id']}", headers={"If-Match": '"1"'}, json={
+        # "mundo" starts at UTF-16 offset 8 because the emoji is a surrogate pair
+        "edits": [{"start": 0, "end": 4, "text": "Adiós"}, {"start": 8, "end": 13, "text": "amigos"}],
+    })
+    assert response.status_code == 200
+    assert set(response.json()) == {"note_id", "version", "last_modified_date"}
+    assert response.json()["version"] == 2
+    assert response.headers["ETag"] == '"2"'
+
+    saved = authenticated_client.get(f"/notes/{note['note_id']}").json()
+    assert saved["content"] == "Adiós 👋 amigos"
+    assert saved["title"] == "Draft"
+
+
+def test_patch_note_rejects_stale_version(authenticated_client: TestClient):
+    note = authenticated_client.post("/notes/", json={"title": "Draft", "content": "abc"}).json()
+    authenticated_client.put(f"/notes/{note['note_id']}", json={"title": "Draft", "content": "abcd"})
+
+    stale = authenticated_client.patch(f"/notes/{note['note_id']}", headers={"If-Match": '"1"'}, json={"edits": [{"start": 0, "end": 0, "text": "x"}]})
+    assert stale.status_code == 412
+    assert stale.headers["ETag"] == '"2"'
+
+    conflict = authenticated_client.patch(f"/notes/{note['note_id']}", json={"base_version": 1, "title": "New"})
+    assert conflict.status_code == 409
+    missing_precondition = authenticated_client.patch(f"/notes/{note['note_id']}", json={"title": "New"})
+    assert missing_precondition.status_code == 428
+    out_of_range = authenticated_client.patch(f"/notes/{note['note_id']}", json={"base_version": 2, "edits": [{"start": 3, "end": 9, "text": ""}]})
+    assert out_of_range.status_code == 422
+    assert authenticated_client.get(f"/notes/{note['note_id']}").json()["content"] == "abcd"
+
+
+def test_conditional_get_returns_304_until_the_list_changes(authenticated_client: TestClient):
+    """
+    Tests that a listing answers 304 to its own ETag and gets a new ETag after a write.
+    """
+    authenticated_client.post("/notes/", json={"title": "Cached", "content": "body"})
+    first = authenticated_client.get("/notes/")
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+    revalidated = authenticated_client.get("/notes/", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+
+    # Different query strings are different representations.
+    assert authenticated_client.get("/notes/", params={"fields": "title"}).headers["ETag"] != etag
+
+    authenticated_client.post("/notes/", json={"title": "Another", "content": "body"})
+    changed = authenticated_client.get("/notes/", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert len(changed.json()) == 2
+
+
+def test_conditional_get_single_note_uses_version_etag(authenticated_client: TestClient):
+    note_id = authenticated_client.post("/notes/", json={"title": "One", "content": "body"}).json()["note_id"]
+
+    response = authenticated_client.get(f"/notes/{note_id}")
+    assert response.headers["ETag"] == '"1"'
+    # Written during the current second, so its date is not a safe validator yet.
+    assert "Last-Modified" not in response.headers
+    assert authenticated_client.get(f"/notes/{note_id}", headers={"If-None-Match": '"1"'}).status_code == 304
+
+    authenticated_client.put(f"/notes/{note_id}", json={"title": "One", "content": "edited"})
+    response = authenticated_client.get(f"/notes/{note_id}", headers={"If-None-Match": '"1"'})
+    assert response.status_code == 200
+    assert response.headers["ETag"] == '"2"'
+
+
+def _request(**headers) -> Request:
+    return Request({"type": "http", "headers": [(k.replace("_", "-").encode(), v.encode()) for k, v in headers.items()]})
+
+
+def test_if_modified_since_is_not_trusted_within_the_same_second():
+    """
+    Tests that a write in the second the client's copy is dated never yields a
+    stale 304, and that If-None-Match alone decides when it is sent.
+    """
+    now = datetime.now(timezone.utc)
+    since = format_datetime(now, usegmt=True)
+    assert not Validators('"2"', now).matches(_request(if_modified_since=since))
+    assert "Last-Modified" not in Validators('"2"', now).headers
+
+    earlier = now - timedelta(seconds=5)
+    validators = Validators('"2"', earlier)
+    assert validators.headers["Last-Modified"] == format_datetime(earlier, usegmt=True)
+    assert validators.matches(_request(if_modified_since=since))
+    # A stale ETag wins over a current date.
+    assert not validators.matches(_request(if_none_match='"1"', if_modified_since=since))
+
+
+def test_deleting_a_folder_changes_its_notes_etag(authenticated_client: TestClient):
+    """
+    Tests that un-filing a note through ON DELETE SET NULL bumps its version,
+    so a client revalidating its copy does not keep the deleted folder.
+    """
+    folder_id = authenticated_client.post("/notes/folders", json={"folder_name": "Gone"}).json()["folder_id"]
+    note_id = authenticated_client.post("/notes/", json={"title": "Filed", "folder_id": folder_id}).json()["note_id"]
+    etag = authenticated_client.get(f"/notes/{note_id}").headers["ETag"]
+
+    assert authenticated_client.delete(f"/notes/folders/{folder_id}").status_code == 204
+    response = authenticated_client.get(f"/notes/{note_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()["folder_id"] is None
@@ -0,0 +1,85 @@
+# FILE: tests/test_purge.py
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from Backend1 import models
+from Backend1.main import app
+from Backend1.purge import get_purger
+
+
+def _purger(client: TestClient, chunk_size: int):
+    purger = app.dependency_overrides[get_purger]()
+    purger.chunk_size = chunk_size
+    return purger
+
+
+def _stack_with_cards(db_session, count: int) -> int:
+    stack = models.Stack(stack_name="Big deck", user_id="default-user")
+    db_session.add(stack)
+    db_session.flush()
+    db_session.add_all([models.Flashcard(user_id="default-user", stack_id=stack.stack_id, front_text=f"Card {i}") for i in range(count)])
+    db_session.commit()
+    return stack.stack_id
+
+
+def test_small_stack_is_deleted_with_its_cards_at_once(authenticated_client: TestClient, db_session):
+    _purger(authenticated_client, 10)
+    stack_id = _stack_with_cards(db_session, 3)
+    assert authenticated_client.delete(f"/api/v1/stacks/{stack_id}").status_code == 204
+    assert db_session.scalars(select(models.Flashcard)).all() == []
+    assert authenticated_client.delete(f"/api/v1/stacks/{stack_id}").status_code == 404
+
+
+def test_large_stack_is_deleted_in_the_background(authenticated_client: TestClient, db_session):
+    purger = _purger(authenticated_client, 5)
+    stack_id = _stack_with_cards(db_session, 12)
+    other_id = _stack_with_cards(db_session, 2)
+    assert authenticated_client.delete(f"/api/v1/stacks/{stack_id}").status_code == 202
+    authenticated_client.portal.call(purger.drain)
+
+    db_session.expire_all()
+    assert db_session.get(models.Stack, stack_id) is None
+    assert {card.stack_id for card in db_session.scalars(select(models.Flashcard))} == {other_id}
+    # The sync triggers fire for rows removed by the chunks and the cascade alike.
+    tombstones = db_session.scalars(select(models.SyncLogEntry).where(models.SyncLogEntry.deleted.is_(True))).all()
+    assert len(tombstones) == 13
+
+
+def test_deleting_a_folder_unfiles_its_notes(authenticated_client: TestClient):
+    _purger(authenticated_client, 10)
+    folder_id = authenticated_client.post("/notes/folders", json={"folder_name": "Old"}).json()["folder_id"]
+    note_id = authenticated_client.post("/notes/", json={"title": "Kept", "folder_id": folder_id}).json()["note_id"]
+    since = authenticated_client.get("/sync", params={"since": 0}).json()["seq"]
+
+    assert authenticated_client.delete(f"/notes/folders/{folder_id}").status_code == 204
+    assert authenticated_client.get(f"/notes/{note_id}").json()["folder_id"] is None
+    delta = authenticated_client.get("/sync", params={"since": since}).json()
+    assert [note["note_id"] for note in delta["notes"]] == [note_id]
+    assert [(t["entity"], t["entity_id"]) for t in delta["deleted"]] == [("folder", folder_id)]
+
+
+def test_large_folder_is_emptied_in_the_background(authenticated_client: TestClient):
+    purger = _purger(authenticated_client, 2)
+    folder_id = authenticated_client.post("/notes/folders", json={"folder_name": "Inbox"}).json()["folder_id"]
+    for i in range(5):
+        authenticated_client.post("/notes/", json={"title": f"N{i}", "folder_id": folder_id})
+
+    assert authenticated_client.delete(f"/notes/folders/{folder_id}").status_code == 202
+    authenticated_client.portal.call(purger.drain)
+    assert authenticated_client.get("/notes/folders").json() == []
+    notes = authenticated_client.get("/notes/").json()
+    assert {note["folder_id"] for note in notes} == {None}
+    assert {note["version"] for note in notes} == {2}
+
+
+def test_foreign_keys_unfile_notes_of_folders_deleted_through_sync(authenticated_client: TestClient):
+    body = authenticated_client.post("/sync", json={"writes": [
+        {"op_id": "f", "entity": "folder", "action": "create", "data": {"folder_name": "Trip"}},
+        {"op_id": "n", "entity": "note", "action": "create", "data": {"title": "Packing", "folder_id": "f"}},
+        {"op_id": "d", "entity": "folder", "action": "delete", "entity_id": "f"},
+    ]}).json()
+    assert [result["status"] for result in body["results"]] == ["applied"] * 3
+    note = authenticated_client.get(f"/notes/{body['results'][1]['entity_id']}").json()
+    # ON DELETE SET NULL is a write to the note too: its version (the ETag) moves on.
+    assert (note["folder_id"], note["version"]) == (None, 2)
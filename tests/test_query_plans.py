@@ -0,0 +1,36 @@
+# FILE: tests/test_query_plans.py
+
+import pytest
+from fastapi.testclient import TestClient
+
+# Each listing endpoint must be served by its composite index: no full table
+# scan and no temporary B-tree to sort the result.
+LISTING_ENDPOINTS = [
+    ("/notes/", "Notes", "ix_Notes_user_id_last_modified_date"),
+    ("/notes/folders", "Folders", "ix_Folders_user_id_folder_name"),
+    ("/api/v1/users/default-user/stacks", "Stacks", "ix_Stacks_user_id_creation_date"),
+    ("/api/v1/stacks/{stack_id}/flashcards", "Flashcards", "ix_Flashcards_stack_id_creation_date"),
+    ("/flashcards/due", "Flashcards", "ix_Flashcards_user_id_next_review_date"),
+    ("/workspace", "CollectedItems", "ix_CollectedItems_user_id_item_id"),
+    ("/sync?since=0", "SyncLog", "ix_SyncLog_user_id_seq"),
+]
+
+
+def _query_plan(db_session, statement, parameters):
+    rows = db_session.connection().exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+    return [row[-1] for row in rows]
+
+
+@pytest.mark.parametrize("path, table, index_name", LISTING_ENDPOINTS)
+def test_listing_endpoint_uses_index(authenticated_client: TestClient, db_session, captured_sql, path, table, index_name):
+    stack_id = authenticated_client.post("/api/v1/stacks", json={"stack_name": "Deck"}).json()["stack_id"]
+    captured_sql.clear()
+
+    response = authenticated_client.get(path.format(stack_id=stack_id))
+    assert response.status_code == 200
+
+    listing = [(sql, params) for sql, params in captured_sql if sql.lstrip().upper().startswith("SELECT") and f'FROM "{table}"' in sql]
+    assert listing, f"no SELECT against {table} was issued by {path}"
+    plan = _query_plan(db_session, *listing[-1])
+    assert any(index_name in step for step in plan), plan
+    assert not any("USE TEMP B-TREE" in step for step in plan), plan
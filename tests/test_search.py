@@ -0,0 +1,70 @@
+# FILE: tests/test_search.py
+
+from fastapi.testclient import TestClient
+
+from Backend1 import models
+from Backend1.search import build_match_query, scope_match_query
+
+
+def test_build_match_query_quotes_terms_and_adds_prefix():
+    assert build_match_query("spanish verb") == '"spanish" "verb"*'
+    assert build_match_query('conj* OR "NEAR(x)"') == '"conj"* "OR" "NEAR" "x"*'
+    assert build_match_query("  ") == ""
+
+
+def test_scope_match_query_matches_the_user_inside_the_match():
+    assert scope_match_query('"verb"*', 7, ("title", "content")) == 'user_id : ^"7" AND {title content} : ("verb"*)'
+    assert scope_match_query('"x"', 'a"b', ("front_text",)) == 'user_id : ^"a""b" AND {front_text} : ("x")'
+
+
+def test_search_follows_note_lifecycle(authenticated_client: TestClient):
+    """
+    Tests that the index picks up created, updated and deleted notes.
+    """
+    note = authenticated_client.post("/notes/", json={"title": "Irregular verbs", "content": "ser, estar and ir are irregular"}).json()
+    authenticated_client.post("/notes/", json={"title": "Groceries", "content": "milk and bread"})
+
+    hits = authenticated_client.get("/search/", params={"q": "irreg"}).json()
+    assert [(hit["type"], hit["id"]) for hit in hits] == [("note", note["note_id"])]
+    assert "<mark>Irregular</mark>" in hits[0]["title"]
+    assert "<mark>irregular</mark>" in hits[0]["snippet"]
+
+    authenticated_client.put(f"/notes/{note['note_id']}", json={"title": "Verbs", "content": "subjunctive mood"})
+    assert authenticated_client.get("/search/", params={"q": "irregular"}).json() == []
+    assert len(authenticated_client.get("/search/", params={"q": "subjunct"}).json()) == 1
+
+    authenticated_client.delete(f"/notes/{note['note_id']}")
+    assert authenticated_client.get("/search/", params={"q": "subjunctive"}).json() == []
+
+
+def test_search_ranks_title_matches_first_and_covers_flashcards(authenticated_client: TestClient):
+    authenticated_client.post("/notes/", json={"title": "Misc", "content": "a note that mentions gato once"})
+    title_hit = authenticated_client.post("/notes/", json={"title": "Gato", "content": "cat in Spanish"}).json()
+    authenticated_client.post("/flashcards/decks-from-items", json={"deck_name": "Animals", "items": [{"text": "gato"}]})
+
+    hits = authenticated_client.get("/search/", params={"q": "gato"}).json()
+    assert {hit["type"] for hit in hits} == {"note", "flashcard"}
+    notes = [hit for hit in hits if hit["type"] == "note"]
+    assert notes[0]["id"] == title_hit["note_id"]
+
+    only_cards = authenticated_client.get("/search/", params={"q": "gato", "types": "flashcard"}).json()
+    assert [hit["type"] for hit in only_cards] == ["flashcard"]
+    assert authenticated_client.get("/search/", params={"q": "gato", "types": "users"}).status_code == 400
+
+
+def test_search_only_returns_the_users_own_rows(authenticated_client: TestClient, db_session):
+    """
+    Tests that hits are scoped to the user, including users whose ids share a
+    prefix, and that the user id itself is not searchable text.
+    """
+    own = authenticated_client.post("/notes/", json={"title": "Pretérito", "content": "shared word"}).json()
+    user_id = db_session.get(models.Note, own["note_id"]).user_id
+    db_session.add_all([
+        models.Note(user_id=f"{user_id}2", title="Pretérito", content="shared word"),
+        models.Note(user_id="someone-else", title="Pretérito", content="shared word"),
+    ])
+    db_session.commit()
+
+    hits = authenticated_client.get("/search/", params={"q": "shared pret"}).json()
+    assert [hit["id"] for hit in hits] == [own["note_id"]]
+    assert authenticated_client.get("/search/", params={"q": str(user_id)}).json() == []
@@ -0,0 +1,58 @@
+# FILE: tests/test_security.py
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from Backend1 import models, schemas, security
+
+
+def _login(client: TestClient, email: str, password: str) -> str:
+    client.post("/users/", json={"email": email, "password": password})
+    response = client.post("/token", data={"username": email, "password": password})
+    return response.json()["access_token"]
+
+
+def test_current_user_is_cached_between_requests(test_client: TestClient, db_session):
+    """
+    Tests that a second authenticated request resolves the user without re-reading the row.
+    """
+    token = _login(test_client, "cache@example.com", "password123")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    assert test_client.get("/notes/", headers=headers).status_code == 200
+    assert security._token_cache.get(token) == "cache@example.com"
+    cached_user = security._user_cache.get("cache@example.com")
+    assert cached_user is not None
+
+    assert test_client.get("/notes/", headers=headers).status_code == 200
+    assert security._user_cache.get("cache@example.com") is cached_user
+    # The shared copy is a frozen snapshot, not a row some request's Session could touch.
+    assert isinstance(cached_user, schemas.CurrentUser)
+    with pytest.raises(ValidationError):
+        cached_user.is_active = False
+
+
+def test_deactivated_user_is_evicted_from_cache(test_client: TestClient, db_session):
+    """
+    Tests that updating a user through the ORM drops the cached copy immediately.
+    """
+    token = _login(test_client, "deactivate@example.com", "password123")
+    headers = {"Authorization": f"Bearer {token}"}
+    assert test_client.get("/notes/", headers=headers).status_code == 200
+
+    user = db_session.query(models.User).filter(models.User.email == "deactivate@example.com").first()
+    user.is_active = False
+    db_session.commit()
+
+    assert security._user_cache.get("deactivate@example.com") is None
+    assert security._token_cache.get(token) is None
+    response = test_client.get("/notes/", headers=headers)
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Inactive user"}
+
+
+def test_invalid_token_is_not_cached(test_client: TestClient):
+    response = test_client.get("/notes/", headers={"Authorization": "Bearer not-a-jwt"})
+    assert response.status_code == 401
+    assert security._token_cache.get("not-a-jwt") is None
@@ -0,0 +1,100 @@
+# FILE: tests/test_sync.py
+
+from fastapi.testclient import TestClient
+
+
+def _pull(client: TestClient, since: int, **params) -> dict:
+    response = client.get("/sync", params={"since": since, **params})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_pull_returns_only_changes_since_the_last_seq(authenticated_client: TestClient):
+    folder = authenticated_client.post("/notes/folders", json={"folder_name": "Inbox"}).json()
+    note = authenticated_client.post("/notes/", json={"title": "A", "content": "x", "folder_id": folder["folder_id"]}).json()
+    first = _pull(authenticated_client, 0)
+    assert [n["note_id"] for n in first["notes"]] == [note["note_id"]]
+    assert [f["folder_id"] for f in first["folders"]] == [folder["folder_id"]]
+    assert first["has_more"] is False and first["deleted"] == []
+
+    assert _pull(authenticated_client, first["seq"])["notes"] == []
+
+    authenticated_client.put(f"/notes/{note['note_id']}", json={"title": "B", "content": "y"})
+    authenticated_client.delete(f"/notes/folders/{folder['folder_id']}")
+    second = _pull(authenticated_client, first["seq"])
+    assert [(n["title"], n["version"]) for n in second["notes"]] == [("B", 2)]
+    assert second["folders"] == []
+    assert [(t["entity"], t["entity_id"]) for t in second["deleted"]] == [("folder", folder["folder_id"])]
+    assert second["seq"] > first["seq"]
+
+
+def test_pull_pages_through_changes_in_order(authenticated_client: TestClient):
+    ids = [authenticated_client.post("/notes/", json={"title": f"N{i}"}).json()["note_id"] for i in range(5)]
+    seen, since = [], 0
+    while True:
+        page = _pull(authenticated_client, since, limit=2)
+        seen += [n["note_id"] for n in page["notes"]]
+        since = page["seq"]
+        if not page["has_more"]:
+            break
+    assert seen == ids
+
+
+def test_pull_only_sees_the_users_own_rows(authenticated_client: TestClient):
+    authenticated_client.post("/api/v1/stacks", json={"stack_name": "Someone else's"})
+    assert _pull(authenticated_client, 0)["stacks"] == []
+
+
+def test_a_cursor_ahead_of_the_server_asks_for_a_reset(authenticated_client: TestClient):
+    assert _pull(authenticated_client, 10**6)["reset"] is True
+
+
+def test_push_applies_offline_writes_in_one_request(authenticated_client: TestClient):
+    response = authenticated_client.post("/sync", json={"writes": [
+        {"op_id": "f1", "entity": "folder", "action": "create", "data": {"folder_name": "Trip"}},
+        {"op_id": "n1", "entity": "note", "action": "create", "data": {"title": "Packing", "folder_id": "f1"}},
+        {"op_id": "n2", "entity": "note", "action": "update", "entity_id": "n1", "base_version": 1, "data": {"content": "socks"}},
+    ]})
+    assert response.status_code == 200
+    body = response.json()
+    assert [r["status"] for r in body["results"]] == ["applied"] * 3
+    folder_id, note_id = body["results"][0]["entity_id"], body["results"][1]["entity_id"]
+
+    note = authenticated_client.get(f"/notes/{note_id}").json()
+    assert (note["folder_id"], note["content"], note["version"]) == (folder_id, "socks", 2)
+    # The pusher can resume pulling from the returned seq without refetching its own writes.
+    assert _pull(authenticated_client, body["seq"])["notes"] == []
+
+
+def test_push_reports_conflicts_and_applies_the_rest(authenticated_client: TestClient):
+    note = authenticated_client.post("/notes/", json={"title": "Shared", "content": "v1"}).json()
+    authenticated_client.put(f"/notes/{note['note_id']}", json={"title": "Shared", "content": "v2 from another device"})
+
+    body = authenticated_client.post("/sync", json={"writes": [
+        {"op_id": "stale", "entity": "note", "action": "update", "entity_id": note["note_id"], "base_version": 1, "data": {"content": "offline"}},
+        {"op_id": "gone", "entity": "note", "action": "delete", "entity_id": 9999},
+        {"op_id": "bad", "entity": "note", "action": "create", "data": {"folder_id": "no-such-op"}},
+        {"op_id": "ok", "entity": "note", "action": "create", "data": {"title": "Fresh"}},
+    ]}).json()
+    conflict, missing, invalid, applied = body["results"]
+    assert conflict["status"] == "conflict" and conflict["version"] == 2
+    assert conflict["current"]["content"] == "v2 from another device"
+    assert missing["status"] == "missing"
+    assert invalid["status"] == "invalid" and "no-such-op" in invalid["detail"]
+    assert applied["status"] == "applied"
+    assert authenticated_client.get(f"/notes/{note['note_id']}").json()["content"] == "v2 from another device"
+
+
+def test_retried_push_is_not_applied_twice(authenticated_client: TestClient):
+    writes = {"writes": [{"op_id": "create-1", "entity": "note", "action": "create", "data": {"title": "Once"}}]}
+    first = authenticated_client.post("/sync", json=writes).json()
+    again = authenticated_client.post("/sync", json=writes).json()
+    assert again["results"] == first["results"]
+    assert [n["title"] for n in authenticated_client.get("/notes/").json()] == ["Once"]
+
+    # Later pushes may refer to a note created by an earlier one.
+    body = authenticated_client.post("/sync", json={"writes": [
+        {"op_id": "delete-1", "entity": "note", "action": "delete", "entity_id": "create-1"},
+    ]}).json()
+    assert body["results"][0]["status"] == "applied"
+    assert authenticated_client.get("/notes/").json() == []
@@ -0,0 +1,156 @@
+# FILE: tests/test_translation.py
+
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from Backend1.translation import MockBackend, TranslationBackend, TranslationEngine, TranslationStore
+
+
+class RecordingBackend(MockBackend):
+    def __init__(self):
+        self.batches = []
+
+    async def translate_batch(self, texts, source_lang, target_lang):
+        self.batches.append((list(texts), source_lang, target_lang))
+        await asyncio.sleep(0.01)
+        return await super().translate_batch(texts, source_lang, target_lang)
+
+
+def test_concurrent_requests_are_batched_and_deduplicated():
+    """
+    Tests that concurrent callers share one backend call and identical texts are translated once.
+    """
+    backend = RecordingBackend()
+
+    async def main():
+        engine = TranslationEngine(backend, max_delay=0.02)
+        texts = ["hola", "adiós", "hola", "gracias", "hola"]
+        results = await asyncio.gather(*(engine.translate(text, "es", "en") for text in texts))
+        return engine, results
+
+    engine, results = asyncio.run(main())
+    assert results[0] == results[2] == results[4] == "[MOCK Translated: hola]"
+    assert backend.batches == [(["hola", "adiós", "gracias"], "es", "en")]
+    assert engine.stats["coalesced"] == 2
+
+
+def test_language_pairs_are_batched_separately_and_cached():
+    backend = RecordingBackend()
+
+    async def main():
+        engine = TranslationEngine(backend, max_delay=0.01)
+        await asyncio.gather(engine.translate("hola", "es", "en"), engine.translate("hola", "es", "fr"))
+        await engine.translate_many(["hola", "hola"], "es", "en")
+        return engine
+
+    engine = asyncio.run(main())
+    assert sorted(batch[2] for batch in backend.batches) == ["en", "fr"]
+    assert engine.stats["cache_hits"] == 1
+
+
+def test_max_batch_flushes_without_waiting_for_the_timer():
+    backend = RecordingBackend()
+
+    async def main():
+        engine = TranslationEngine(backend, max_batch=2, max_delay=60)
+        return await asyncio.wait_for(engine.translate_many(["a", "b", "c", "d"], "en", "de"), timeout=5)
+
+    assert asyncio.run(main()) == [f"[MOCK Translated: {t}]" for t in "abcd"]
+    assert [batch[0] for batch in backend.batches] == [["a", "b"], ["c", "d"]]
+
+
+def test_backend_errors_reach_every_waiting_caller():
+    class FailingBackend(MockBackend):
+        async def translate_batch(self, texts, source_lang, target_lang):
+            raise ConnectionError("provider down")
+
+    async def main():
+        engine = TranslationEngine(FailingBackend(), max_delay=0.01)
+        results = await asyncio.gather(engine.translate("x", "en", "de"), engine.translate("x", "en", "de"), return_exceptions=True)
+        return engine, results
+
+    engine, results = asyncio.run(main())
+    assert all(isinstance(r, ConnectionError) for r in results)
+    assert len(engine.cache) == 0
+
+
+def test_persistent_cache_survives_a_new_engine(run_with_temp_db):
+    """
+    Tests that a fresh engine (empty LRU, e.g. after a restart) reads earlier translations from the database.
+    """
+    async def scenario(session_factory):
+        first, second = RecordingBackend(), RecordingBackend()
+        await TranslationEngine(first, TranslationStore(session_factory, "mock"), max_delay=0.01).translate("hello", "en", "es")
+        warm = TranslationEngine(second, TranslationStore(session_factory, "mock"), max_delay=0.01)
+        result = await warm.translate("hello", "en", "es")
+        # Rows written by another backend are not reused.
+        other = TranslationEngine(RecordingBackend(), TranslationStore(session_factory, "other"), max_delay=0.01)
+        await other.translate("hello", "en", "es")
+        return first, second, warm, other, result
+
+    first, second, warm, other, result = run_with_temp_db(scenario)
+    assert result == "[MOCK Translated: hello]"
+    assert len(first.batches) == 1 and second.batches == []
+    assert warm.stats["store_hits"] == 1
+    assert other.stats["backend_calls"] == 1
+
+
+def test_translate_endpoint(authenticated_client: TestClient):
+    payload = {"text": "Guten Tag", "source_lang": "de", "target_lang": "en"}
+    first = authenticated_client.post("/translation/translate", json=payload)
+    assert first.status_code == 200
+    assert first.json() == {"original_text": "Guten Tag", "translated_text": "[MOCK Translated: Guten Tag]"}
+    assert authenticated_client.post("/translation/translate", json=payload).json() == first.json()
+
+
+def _ndjson_lines(response):
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+def test_batch_translate_json_deduplicates_and_streams(authenticated_client: TestClient):
+    """
+    Tests that every segment gets a result line and repeated segments are translated once.
+    """
+    payload = {"segments": ["Hallo", {"id": "cue-2", "text": "Welt"}, "Hallo"], "source_lang": "de", "target_lang": "en"}
+    response = authenticated_client.post("/translation/translate/batch", json=payload)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = sorted(_ndjson_lines(response), key=lambda line: line["index"])
+    assert lines == [
+        {"index": 0, "id": None, "translated_text": "[MOCK Translated: Hallo]"},
+        {"index": 1, "id": "cue-2", "translated_text": "[MOCK Translated: Welt]"},
+        {"index": 2, "id": None, "translated_text": "[MOCK Translated: Hallo]"},
+    ]
+
+
+def test_batch_translate_ndjson_body(authenticated_client: TestClient):
+    body = '{"id": 1, "text": "uno"}\n"dos"\n\n{"id": 3, "text": "uno"}\n'
+    response = authenticated_client.post(
+        "/translation/translate/batch",
+        params={"source_lang": "es", "target_lang": "en"},
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    by_index = {line["index"]: line for line in _ndjson_lines(response)}
+    assert [by_index[i]["id"] for i in range(3)] == [1, None, 3]
+    assert by_index[2]["translated_text"] == "[MOCK Translated: uno]"
+
+
+def test_batch_translate_rejects_bad_bodies(authenticated_client: TestClient):
+    url = "/translation/translate/batch"
+    assert authenticated_client.post(url, content='{"text": 5}\n', headers={"Content-Type": "application/x-ndjson"}).status_code == 400
+    assert authenticated_client.post(url, json={"segments": [1]}).status_code == 422
+    assert authenticated_client.post(url, content="a,b", headers={"Content-Type": "text/csv"}).status_code == 415
+
+
+def test_incomplete_backends_fail_when_created():
+    class NoTranslate(TranslationBackend):
+        name = "broken"
+
+    with pytest.raises(TypeError):
+        NoTranslate()
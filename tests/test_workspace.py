@@ -0,0 +1,46 @@
+# FILE: tests/test_workspace.py
+
+from fastapi.testclient import TestClient
+
+from Backend1.ingest import get_ingest
+from Backend1.main import app
+
+
+def _build_workspace(client: TestClient, folders: int, decks: int):
+    for f in range(folders):
+        folder_id = client.post("/notes/folders", json={"folder_name": f"Folder {f}"}).json()["folder_id"]
+        for n in range(2):
+            client.post("/notes/", json={"title": f"F{f} note {n}", "content": "body", "folder_id": folder_id})
+    client.post("/notes/", json={"title": "Loose", "content": "no folder"})
+    for d in range(decks):
+        client.post("/flashcards/decks-from-items", json={"deck_name": f"Deck {d}", "items": [{"text": f"word {i}"} for i in range(d + 1)]})
+    client.post("/history/log", json={"text": "recently collected"})
+
+
+def test_workspace_snapshot_contents(authenticated_client: TestClient):
+    _build_workspace(authenticated_client, folders=2, decks=2)
+    authenticated_client.portal.call(app.dependency_overrides[get_ingest]().drain)
+
+    snapshot = authenticated_client.get("/workspace").json()
+    assert [f["folder_name"] for f in snapshot["folders"]] == ["Folder 0", "Folder 1"]
+    assert [n["title"] for n in snapshot["folders"][0]["notes"]] == ["F0 note 1", "F0 note 0"]
+    assert "content" not in snapshot["folders"][0]["notes"][0]
+    assert [n["title"] for n in snapshot["unfiled_notes"]] == ["Loose"]
+    assert [(s["stack_name"], s["card_count"], s["due_count"], s["cards"]) for s in snapshot["stacks"]] == [("Deck 0", 1, 1, None), ("Deck 1", 2, 2, None)]
+    assert snapshot["recent_notes"][0]["title"] == "Loose"
+    assert [i["selected_text"] for i in snapshot["recent_items"]] == ["recently collected"]
+
+    with_cards = authenticated_client.get("/workspace", params={"include_cards": True}).json()
+    assert sorted(c["front_text"] for c in with_cards["stacks"][1]["cards"]) == ["word 0", "word 1"]
+
+
+def test_workspace_query_count_does_not_grow_with_the_account(authenticated_client: TestClient, captured_sql):
+    def snapshot_queries():
+        captured_sql.clear()
+        assert authenticated_client.get("/workspace", params={"include_cards": True}).status_code == 200
+        return sum(1 for sql, _ in captured_sql if sql.lstrip().upper().startswith("SELECT"))
+
+    _build_workspace(authenticated_client, folders=1, decks=1)
+    small = snapshot_queries()
+    _build_workspace(authenticated_client, folders=6, decks=6)
+    assert snapshot_queries() == small
@@ -0,0 +1,118 @@
+# FILE: tests/test_write_queue.py
+
+import asyncio
+
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+
+from Backend1 import models
+from Backend1.write_queue import GroupCommitWriter, WriterStoppedError
+
+
+def _with_writer(scenario):
+    """Adapts `scenario(writer, session_factory)` for run_with_temp_db, stopping the writer afterwards."""
+    async def run(session_factory):
+        writer = GroupCommitWriter(session_factory, max_batch=50, max_delay=0.05)
+        try:
+            return await scenario(writer, session_factory)
+        finally:
+            await writer.close()
+
+    return run
+
+
+def test_concurrent_writes_are_group_committed(run_with_temp_db):
+    """
+    Tests that concurrent submissions share transactions and every write is committed.
+    """
+    commits = []
+
+    async def scenario(writer, session_factory):
+        original = writer._run_in_transaction
+
+        async def counting(jobs):
+            commits.append(len(jobs))
+            return await original(jobs)
+
+        writer._run_in_transaction = counting
+
+        def make_job(i):
+            async def job(session):
+                session.add(models.Folder(user_id="1", folder_name=f"folder-{i}"))
+                return i
+            return job
+
+        results = await asyncio.gather(*(writer.submit(make_job(i)) for i in range(40)))
+        async with session_factory() as session:
+            count = await session.scalar(select(func.count()).select_from(models.Folder))
+        return results, count
+
+    results, count = run_with_temp_db(_with_writer(scenario), profile="production")
+    assert results == list(range(40))
+    assert count == 40
+    assert len(commits) < 40
+
+
+def test_failing_write_does_not_fail_its_batch(run_with_temp_db):
+    """
+    Tests that a job that raises only rolls back its own writes (its SAVEPOINT)
+    and the rest of the batch still commits in the same transaction.
+    """
+    transactions = []
+
+    async def scenario(writer, session_factory):
+        original = writer._run_in_transaction
+
+        async def counting(jobs):
+            transactions.append(len(jobs))
+            return await original(jobs)
+
+        writer._run_in_transaction = counting
+
+        async def good(session):
+            session.add(models.Folder(user_id="1", folder_name="kept"))
+            await session.flush()
+            return "ok"
+
+        async def bad(session):
+            session.add(models.Folder(user_id="1", folder_name=None))
+            await session.flush()
+
+        async def refused(session):
+            session.add(models.Folder(user_id="1", folder_name="undone"))
+            await session.flush()
+            raise HTTPException(status_code=404)
+
+        outcomes = await asyncio.gather(
+            writer.submit(good), writer.submit(bad), writer.submit(refused), writer.submit(good), return_exceptions=True,
+        )
+        async with session_factory() as session:
+            names = (await session.scalars(select(models.Folder.folder_name))).all()
+        return outcomes, names
+
+    outcomes, names = run_with_temp_db(_with_writer(scenario), profile="production")
+    assert outcomes[0] == "ok" and outcomes[3] == "ok"
+    assert isinstance(outcomes[1], IntegrityError)
+    assert isinstance(outcomes[2], HTTPException)
+    assert names == ["kept", "kept"]
+    assert transactions == [4]
+
+
+def test_stopping_the_writer_fails_waiting_callers(run_with_temp_db):
+    async def scenario(writer, session_factory):
+        started = asyncio.Event()
+
+        async def slow(session):
+            started.set()
+            await asyncio.sleep(10)
+
+        running = asyncio.ensure_future(writer.submit(slow))
+        await started.wait()
+        queued = asyncio.ensure_future(writer.submit(slow))
+        await asyncio.sleep(0)
+        writer._task.cancel()
+        return await asyncio.gather(running, queued, return_exceptions=True)
+
+    outcomes = run_with_temp_db(_with_writer(scenario), profile="production")
+    assert all(isinstance(outcome, WriterStoppedError) for outcome in outcomes)